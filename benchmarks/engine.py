@@ -0,0 +1,219 @@
+"""
+Benchmarks of the engine on the test machines, over input sizes from
+a few bits to thousands of bits, with and without history recording.
+
+Run with `nox -s benchmarks` or `python -m benchmarks.engine`. Results are
+printed and saved as JSON, and `--compare` checks them against the results
+of a previous run.
+"""
+
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import (
+    Path,
+)
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+)
+
+from tests.machines import (
+    ADD_TWO_BINARY_NUMBERS,
+    BINARY_MULTIPLICATION,
+    DOUBLE_1,
+)
+from turingtoy import (
+    CompiledMachine,
+    compile_machine,
+    run_machine,
+)
+from turingtoy.engine import (
+    HistoryMode,
+)
+
+SEED = 0
+
+# Machine, input builder from a number of bits and a random generator, and
+# input sizes in bits
+Workload = Tuple[Dict, Callable[[int, random.Random], str], List[int]]
+
+WORKLOADS: Dict[str, Workload] = {
+    "double_1": (DOUBLE_1, lambda bits, _: "1" * bits, [4, 64, 512, 2048]),
+    "add_two_binary_numbers": (
+        ADD_TWO_BINARY_NUMBERS,
+        lambda bits, rng: f"{_number(bits, rng)}+{_number(bits, rng)}",
+        [4, 64, 512, 4096],
+    ),
+    "binary_multiplication": (
+        BINARY_MULTIPLICATION,
+        lambda bits, rng: f"{_number(bits, rng)}*{_number(bits, rng)}",
+        [4, 16, 64, 256],
+    ),
+}
+
+# History modes benchmarked, and the maximum number of steps of the runs that
+# record them, as full histories hold a copy of the tape at each step
+HISTORIES: Dict[HistoryMode, int] = {
+    "none": sys.maxsize,
+    "deltas": 1 << 20,
+    "full": 1 << 16,
+}
+
+Result = Dict[str, Any]
+
+
+def _number(bits: int, rng: random.Random) -> str:
+    return "1" + "".join(rng.choice("01") for _ in range(bits - 1))
+
+
+def run_benchmarks(sizes: Optional[int] = None, repeat: int = 3) -> List[Result]:
+    """
+    Run each workload with each history mode on its first `sizes` input
+    sizes (all by default), returning a result dict for each run.
+    """
+    results = []
+    for name, (machine, make_input, all_sizes) in WORKLOADS.items():
+        compiled = compile_machine(machine)
+        # Inputs only need to be reproducible, not secure
+        rng = random.Random(SEED)  # noqa: S311
+        for bits in all_sizes[:sizes]:
+            input_ = make_input(bits, rng)
+            steps = None
+            for history, max_steps in HISTORIES.items():
+                if steps is not None and steps > max_steps:
+                    continue
+                result = _measure(compiled, input_, history, repeat)
+                steps = result["steps"]
+                results.append({"machine": name, "bits": bits, **result})
+    return results
+
+
+def _measure(
+    machine: CompiledMachine, input_: str, history: HistoryMode, repeat: int
+) -> Result:
+    # run_machine() is what run_turing_machine() runs, and it counts steps
+    seconds = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        steps = run_machine(machine, input_, history=history).steps
+        seconds = min(seconds, time.perf_counter() - start)
+
+    # Memory is measured on a separate run, as tracing slows it down
+    tracemalloc.start()
+    run_machine(machine, input_, history=history)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # The peak spread over the steps, which shows how the memory of a history
+    # grows with the run, and not the bytes allocated at each step
+    return {
+        "history": history,
+        "steps": steps,
+        "seconds": seconds,
+        "steps_per_second": steps / seconds if seconds else 0.0,
+        "peak_bytes": peak,
+        "peak_bytes_per_step": peak / steps if steps else 0.0,
+    }
+
+
+def _key(result: Result) -> Tuple[str, int, str]:
+    return result["machine"], result["bits"], result["history"]
+
+
+def compare(
+    results: List[Result], baseline: List[Result], tolerance: float
+) -> List[str]:
+    """
+    Return a message for each run of `results` that is more than `tolerance`
+    (a fraction) slower, or uses more than `tolerance` more memory, than the
+    same run in `baseline`.
+    """
+    baseline_by_key = {_key(result): result for result in baseline}
+    regressions = []
+    for result in results:
+        base = baseline_by_key.get(_key(result))
+        if base is None:
+            continue
+        for metric, worse in [
+            ("steps_per_second", lambda new, old: new < old * (1 - tolerance)),
+            ("peak_bytes", lambda new, old: new > old * (1 + tolerance)),
+        ]:
+            if worse(result[metric], base[metric]):
+                regressions.append(
+                    f"{_key(result)}: {metric} went from {base[metric]:.4g} "
+                    f"to {result[metric]:.4g}"
+                )
+    return regressions
+
+
+def _commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--output", type=Path, help="JSON file to save results to")
+    parser.add_argument("--compare", type=Path, help="JSON results to compare to")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="fraction of slowdown or memory increase reported as a regression",
+    )
+    parser.add_argument(
+        "--sizes", type=int, help="number of input sizes run for each machine"
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per case")
+    args = parser.parse_args(argv)
+    # Read before running, as the output may overwrite it
+    baseline = (
+        None
+        if args.compare is None
+        else json.loads(args.compare.read_text())["results"]
+    )
+
+    results = run_benchmarks(args.sizes, args.repeat)
+    for result in results:
+        print(
+            f"{result['machine']:>24} {result['bits']:>5} bits "
+            f"{result['history']:>6}: {result['steps']:>10} steps "
+            f"{result['steps_per_second']:>12.0f} steps/s "
+            f"{result['peak_bytes']:>11} B peak "
+            f"{result['peak_bytes_per_step']:>9.2f} B peak/step"
+        )
+
+    if args.output is not None:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        report = {
+            "commit": _commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "results": results,
+        }
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"Regression: {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,151 @@
+"""
+Benchmark of the time taken to import turingtoy in a fresh interpreter, as
+worker processes do on every start.
+
+Run with `nox -s benchmarks_imports` or `python -m benchmarks.imports`.
+Results are printed and saved as JSON, and `--compare` checks them against
+the results of a previous run.
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+from pathlib import (
+    Path,
+)
+from typing import (
+    Any,
+    Dict,
+    List,
+    Optional,
+)
+
+from benchmarks.engine import (
+    _commit,
+)
+
+# Statements timed, from the import of the package to the first run
+STATEMENTS = {
+    "turingtoy": "import turingtoy",
+    "turingtoy.engine": "from turingtoy.engine import run_machine",
+    "first run": (
+        "from turingtoy import run_machine; "
+        "run_machine({'blank': ' ', 'start state': 'a', 'final states': ['b'], "
+        "'table': {'a': {' ': {'R': 'b'}}, 'b': {}}}, '')"
+    ),
+}
+
+Result = Dict[str, Any]
+
+
+def _seconds(statement: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", statement], check=True)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _modules(statement: str) -> List[str]:
+    code = f"import sys; {statement}; print('\\n'.join(sorted(sys.modules)))"
+    return subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    ).stdout.split()
+
+
+def run_benchmarks(repeat: int = 10) -> List[Result]:
+    """
+    Time each of STATEMENTS in a fresh interpreter, without the startup
+    time of the interpreter itself, and count the modules they import.
+    """
+    startup = _seconds("pass", repeat)
+    startup_modules = len(_modules("pass"))
+    return [
+        {
+            "statement": name,
+            "seconds": max(0.0, _seconds(statement, repeat) - startup),
+            "modules": len(_modules(statement)) - startup_modules,
+        }
+        for name, statement in STATEMENTS.items()
+    ]
+
+
+def compare(
+    results: List[Result], baseline: List[Result], tolerance: float
+) -> List[str]:
+    """
+    Return a message for each statement of `results` that is more than
+    `tolerance` (a fraction) slower, or imports more modules, than in
+    `baseline`.
+    """
+    baseline_by_statement = {result["statement"]: result for result in baseline}
+    regressions = []
+    for result in results:
+        base = baseline_by_statement.get(result["statement"])
+        if base is None:
+            continue
+        if result["seconds"] > base["seconds"] * (1 + tolerance):
+            regressions.append(
+                f"{result['statement']}: seconds went from {base['seconds']:.4g} "
+                f"to {result['seconds']:.4g}"
+            )
+        if result["modules"] > base["modules"]:
+            regressions.append(
+                f"{result['statement']}: modules went from {base['modules']} "
+                f"to {result['modules']}"
+            )
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--output", type=Path, help="JSON file to save results to")
+    parser.add_argument("--compare", type=Path, help="JSON results to compare to")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="fraction of slowdown reported as a regression",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=10, help="timed imports per statement"
+    )
+    args = parser.parse_args(argv)
+    # Read before running, as the output may overwrite it
+    baseline = (
+        None
+        if args.compare is None
+        else json.loads(args.compare.read_text())["results"]
+    )
+
+    results = run_benchmarks(args.repeat)
+    for result in results:
+        print(
+            f"{result['statement']:>24}: {result['seconds'] * 1000:>8.2f} ms "
+            f"{result['modules']:>5} modules"
+        )
+
+    if args.output is not None:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        report = {
+            "commit": _commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "results": results,
+        }
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"Regression: {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -27,7 +27,7 @@ from setuptools import (
 
 nox.options.sessions = "lint", "mypy", "safety", "tests"
 
-SOURCE_LOCATIONS = ["src", "tests", "noxfile.py"]
+SOURCE_LOCATIONS = ["src", "tests", "benchmarks", "noxfile.py"]
 
 logger = logging.getLogger(__name__)  # type: ignore
 
@@ -40,10 +40,27 @@ def tests(session: Session) -> None:
         "-m",
         "not e2e",
     ]
-    session.run("poetry", "install", external=True)
+    session.run("poetry", "install", "--extras", "numpy", external=True)
     session.run("pytest", *args)
 
 
+@nox.session(python=["3.9"])
+def benchmarks(session: Session) -> None:
+    # Not run by default. Compare with the results of the previous run with
+    # `nox -s benchmarks -- --compare .local/benchmarks/results.json`
+    args = ["--output", ".local/benchmarks/results.json", *session.posargs]
+    session.run("poetry", "install", external=True)
+    session.run("python", "-m", "benchmarks.engine", *args)
+
+
+@nox.session(python=["3.9"])
+def benchmarks_imports(session: Session) -> None:
+    # Not run by default, compared like the benchmarks session
+    args = ["--output", ".local/benchmarks/imports.json", *session.posargs]
+    session.run("poetry", "install", external=True)
+    session.run("python", "-m", "benchmarks.imports", *args)
+
+
 @nox.session(python=["3.9"])
 def lint(session: Session) -> None:
     args = session.posargs or SOURCE_LOCATIONS
@@ -1,84 +1,119 @@
-import json
-
+import importlib
 from typing import (
-    Dict,
-    List,
-    Optional,
-    Tuple,
+    TYPE_CHECKING,
+    Any,
 )
 
-import poetry_version
-
-__version__ = poetry_version.extract(source_file=__file__)
-
-
-def run_turing_machine(
-    machine: Dict,
-    input_: str,
-    steps: Optional[int] = None,        
-) -> Tuple[str, List, bool]: #output, execution_history, accpeted
-
-    offset = 10 # nombre de caractère blank que je décide d'afficher
-    ruban = machine.get("blank")*offset + input_ + machine.get("blank")*offset
-
-    state = machine.get("start state")
-    reading = ruban[offset]
-    position = 0
-    memory = " "*offset + input_ + " "*offset
-    execution_history = []
-
-
-    while state not in machine["final states"]:
-
-        
-
-            
-        history = {
-            "state" : state,
-            "reading" : reading,
-            "position" : position,
-            "memory" : memory.strip(),
-            "transition" : machine['table'][state][reading]
-        }
-
-        execution_history.append(history)
-
-        instructions = machine['table'][state][reading]
-
-        # si le caractère lu est une clé vers un dict
-        if isinstance(instructions, dict):
-
-            for instruction in instructions:
-            
-                if instruction == 'write':
-                    ruban = list(ruban)
-                    ruban[position+offset] = instructions[instruction]
-                    ruban = "".join(ruban)
-
-                    memory = list(memory)
-                    memory[position+offset] = instructions[instruction]
-                    memory = "".join(memory)
-                    
-                if instruction == 'L':
-                    position-=1
-                    state = instructions[instruction]
-
-                if instruction == 'R':
-                    position+=1
-                    state = instructions[instruction]
-                    
-            
-        # si le caractère lu est une clé vers une str
-        if isinstance(instructions, str):
-                    
-            if instructions == 'L':
-                position-=1
-
-            if instructions == 'R':
-                position+=1
-        reading = ruban[position+offset]
-
-    return memory.strip(), execution_history, True
-
+from turingtoy.checkpoint import (
+    Checkpoint,
+)
+from turingtoy.engine import (
+    RunResult,
+    iter_turing_machine,
+    resume_machine,
+    run_machine,
+    run_machine_slices,
+    run_turing_machine,
+)
+from turingtoy.history import (
+    DeltaHistory,
+)
+from turingtoy.machine import (
+    CompiledMachine,
+    compile_machine,
+    validate_machine,
+)
+from turingtoy.macro import (
+    MacroMachine,
+)
+from turingtoy.minimize import (
+    minimize_machine,
+)
+from turingtoy.multitape import (
+    MultiTapeMachine,
+    MultiTapeResult,
+    compile_multitape_machine,
+    run_multitape_machine,
+)
+from turingtoy.profiling import (
+    Profile,
+)
 
-          # Implement the function
+if TYPE_CHECKING:
+    from turingtoy.aio import (
+        MachinePool,
+        run_machine_async,
+    )
+    from turingtoy.batch import (
+        run_many,
+        run_many_unordered,
+    )
+    from turingtoy.cache import (
+        ResultCache,
+    )
+
+# Exports imported on first access, by module, as these modules import
+# asyncio, multiprocessing and sqlite3, which worker processes and single
+# runs do not need
+LAZY_EXPORTS = {
+    "MachinePool": "turingtoy.aio",
+    "ResultCache": "turingtoy.cache",
+    "run_machine_async": "turingtoy.aio",
+    "run_many": "turingtoy.batch",
+    "run_many_unordered": "turingtoy.batch",
+}
+
+__all__ = [
+    "Checkpoint",
+    "CompiledMachine",
+    "DeltaHistory",
+    "MachinePool",
+    "MacroMachine",
+    "MultiTapeMachine",
+    "MultiTapeResult",
+    "Profile",
+    "ResultCache",
+    "RunResult",
+    "compile_machine",
+    "compile_multitape_machine",
+    "iter_turing_machine",
+    "minimize_machine",
+    "resume_machine",
+    "run_machine",
+    "run_machine_async",
+    "run_machine_slices",
+    "run_many",
+    "run_many_unordered",
+    "run_multitape_machine",
+    "run_turing_machine",
+    "validate_machine",
+]
+
+
+def __getattr__(name: str) -> Any:
+    """
+    Import the lazy exports and `__version__` on first access.
+    """
+    if name == "__version__":
+        value: Any = _version()
+    elif name in LAZY_EXPORTS:
+        value = getattr(importlib.import_module(LAZY_EXPORTS[name]), name)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
+
+def _version() -> str:
+    from importlib.metadata import (
+        PackageNotFoundError,
+        version,
+    )
+
+    try:
+        return version(__name__)
+    except PackageNotFoundError:  # pragma: no cover
+        # Not installed, as when run from a source checkout
+        import poetry_version
+
+        return poetry_version.extract(source_file=__file__)
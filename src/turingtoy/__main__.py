@@ -0,0 +1,210 @@
+"""
+Command-line runner: runs a machine on inputs read one per line, and writes
+a JSON line with the result of each run as soon as it is done.
+"""
+
+import json
+import sys
+from contextlib import (
+    nullcontext,
+)
+from enum import (
+    Enum,
+)
+from functools import (
+    partial,
+)
+from pathlib import (
+    Path,
+)
+from typing import (
+    IO,
+    Any,
+    Dict,
+    Optional,
+)
+
+import typer
+
+from turingtoy.batch import (
+    map_inputs,
+)
+from turingtoy.engine import (
+    run_machine,
+)
+from turingtoy.history import (
+    DeltaHistory,
+)
+from turingtoy.machine import (
+    CompiledMachine,
+    compile_machine,
+    validate_machine,
+)
+
+app = typer.Typer(add_completion=False)
+
+
+class History(str, Enum):
+    none = "none"
+    deltas = "deltas"
+    sampled = "sampled"
+    full = "full"
+
+
+class TraceFormat(str, Enum):
+    ndjson = "ndjson"
+    binary = "binary"
+
+
+# File extension of the traces of each format
+TRACE_SUFFIXES = {"ndjson": ".ndjson", "binary": ".trace"}
+
+
+@app.command()
+def main(
+    machine: Path = typer.Argument(
+        ..., exists=True, dir_okay=False, help="JSON or YAML file of the machine."
+    ),
+    inputs: Optional[Path] = typer.Option(
+        None,
+        "--inputs",
+        "-i",
+        exists=True,
+        dir_okay=False,
+        help="File of inputs, one per line. Defaults to stdin.",
+    ),
+    steps: Optional[int] = typer.Option(None, help="Maximum steps per run."),
+    timeout: Optional[float] = typer.Option(None, help="Maximum seconds per run."),
+    history: History = typer.Option(
+        "none", help="Execution history written with each result."
+    ),
+    sample_every: int = typer.Option(1, min=1, help="Steps between two sampled steps."),
+    trace: Optional[Path] = typer.Option(
+        None,
+        file_okay=False,
+        help="Directory to write the trace of each run to, named by input index.",
+    ),
+    trace_format: TraceFormat = typer.Option("ndjson", help="Format of traces."),
+    workers: Optional[int] = typer.Option(
+        None, help="Worker processes. Defaults to the number of cores."
+    ),
+    chunksize: int = typer.Option(64, help="Inputs sent to a worker at once."),
+    ordered: bool = typer.Option(
+        True, help="Write results in input order, or as soon as they are done."
+    ),
+    validate: bool = typer.Option(
+        False,
+        help="Check the machine for undefined states and invalid symbols, and "
+        "list its missing transitions on stderr.",
+    ),
+) -> None:
+    """
+    Run MACHINE on each input and write a JSON line per run to stdout.
+
+    Runs missing a transition, and inputs with symbols outside the machine
+    alphabet, get an "error" instead of an "output". With --validate, the
+    missing transitions are listed on stderr before the runs.
+    """
+    if trace is not None:
+        if history == History.sampled:
+            raise typer.BadParameter("cannot be used with --history sampled")
+        trace.mkdir(parents=True, exist_ok=True)
+    compiled = compile_machine(load_machine(machine))
+    if validate:
+        try:
+            validate_machine(compiled)
+        except ValueError as e:
+            raise typer.BadParameter(str(e), param_hint="MACHINE")
+        for warning in compiled.analysis.warnings:
+            typer.echo(f"Warning: {warning}", err=True)
+
+    run = partial(
+        _run_input,
+        options={
+            "steps": steps,
+            "timeout": timeout,
+            "history": history.value,
+            "sample_every": sample_every,
+            "trace_format": trace_format.value,
+        },
+        trace=None if trace is None else str(trace),
+    )
+    with (
+        nullcontext(sys.stdin) if inputs is None else open(inputs, encoding="utf-8")
+    ) as lines:
+        for _, line in map_inputs(
+            compiled,
+            (line.rstrip("\r\n") for line in lines),
+            run,
+            workers,
+            chunksize,
+            ordered,
+        ):
+            sys.stdout.write(line)
+            sys.stdout.flush()
+
+
+def load_machine(path: Path) -> Dict:
+    """
+    Load a machine dict from a JSON file, or a YAML file if its name ends
+    with ".yaml" or ".yml", which requires PyYAML.
+    """
+    with open(path, encoding="utf-8") as file:
+        if path.suffix not in (".yaml", ".yml"):
+            return json.load(file)
+        try:
+            import yaml
+        except ImportError as e:  # pragma: no cover
+            raise ImportError(
+                "Loading YAML machines requires PyYAML, install turingtoy[yaml]"
+            ) from e
+        return yaml.safe_load(file)
+
+
+def _run_input(
+    machine: CompiledMachine,
+    index: int,
+    input_: str,
+    options: Dict[str, Any],
+    trace: Optional[str],
+) -> str:
+    """
+    Run `machine` on `input_` in a worker process, and return the JSON line
+    of the result.
+    """
+    record: Dict[str, Any] = {"index": index, "input": input_}
+    trace_file: Optional[IO] = None
+    if trace is not None:
+        trace_format = options["trace_format"]
+        path = Path(trace) / f"{index}{TRACE_SUFFIXES[trace_format]}"
+        trace_file = (
+            open(path, "wb")
+            if trace_format == "binary"
+            else open(path, "w", encoding="utf-8")
+        )
+    try:
+        result = run_machine(machine, input_, trace=trace_file, **options)
+    except (KeyError, ValueError) as e:
+        record["error"] = e.args[0]
+    else:
+        record.update(
+            output=result.output,
+            accepted=result.accepted,
+            reason=result.reason,
+            steps=result.steps,
+        )
+        execution_history = result.execution_history
+        if options["history"] != "none":
+            record["execution_history"] = (
+                execution_history.to_list()
+                if isinstance(execution_history, DeltaHistory)
+                else execution_history
+            )
+    finally:
+        if trace_file is not None:
+            trace_file.close()
+    return json.dumps(record) + "\n"
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,125 @@
+"""
+asyncio entry points, which run machines without blocking the event loop.
+"""
+
+import asyncio
+import os
+from concurrent.futures import (
+    ProcessPoolExecutor,
+)
+from functools import (
+    partial,
+)
+from typing import (
+    Any,
+    Dict,
+    Optional,
+    Union,
+)
+
+from turingtoy.engine import (
+    SLICE_STEPS,
+    RunResult,
+    run_machine,
+    run_machine_slices,
+)
+from turingtoy.machine import (
+    CompiledMachine,
+    compile_machine,
+)
+
+
+async def run_machine_async(
+    machine: Union[Dict, CompiledMachine],
+    input_: str,
+    steps: Optional[int] = None,
+    timeout: Optional[float] = None,
+    slice_steps: int = SLICE_STEPS,
+    **options: Any,
+) -> RunResult:
+    """
+    Same as run_machine(), but run in the calling thread `slice_steps` steps
+    at a time, yielding to the event loop in between (see
+    run_machine_slices() for the options).
+
+    Cancelling the run stops it at its next yield, so it can be bounded by
+    asyncio.wait_for() as well as by `timeout`, which returns a partial
+    result with the TIMEOUT reason instead.
+    """
+    slices = run_machine_slices(
+        machine, input_, steps, timeout, slice_steps=slice_steps, **options
+    )
+    try:
+        while True:
+            try:
+                next(slices)
+            except StopIteration as stop:
+                return stop.value
+            await asyncio.sleep(0)
+    finally:
+        slices.close()
+
+
+class MachinePool:
+    """
+    Pool of `workers` processes (one per core by default) doing whole runs
+    for coroutines, with at most `max_pending` runs submitted at once (twice
+    the number of workers by default).
+
+    Coroutines calling run() beyond that wait for a run to finish, which
+    bounds the memory held by queued runs and serves coroutines in order.
+    Cancelling a waiting run() withdraws it, but a run already started in a
+    worker goes on until it ends, so runs should be bounded by `steps` or
+    `timeout`.
+    """
+
+    def __init__(
+        self, workers: Optional[int] = None, max_pending: Optional[int] = None
+    ) -> None:
+        workers = workers or os.cpu_count() or 1
+        self.executor = ProcessPoolExecutor(workers)
+        self.max_pending = max_pending or 2 * workers
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def run(
+        self,
+        machine: Union[Dict, CompiledMachine],
+        input_: str,
+        steps: Optional[int] = None,
+        timeout: Optional[float] = None,
+        **options: Any,
+    ) -> RunResult:
+        """
+        Return run_machine(machine, input_, steps, timeout, **options), run
+        in a worker process. The machine and options must be picklable,
+        which excludes `trace` and `progress`.
+        """
+        if self._semaphore is None:
+            # Created on first use, in the event loop running the pool
+            self._semaphore = asyncio.Semaphore(self.max_pending)
+        async with self._semaphore:
+            return await asyncio.get_running_loop().run_in_executor(
+                self.executor,
+                partial(
+                    run_machine,
+                    compile_machine(machine),
+                    input_,
+                    steps,
+                    timeout,
+                    **options,
+                ),
+            )
+
+    def close(self) -> None:
+        """
+        Shut the worker processes down, cancelling the runs not started, and
+        wait for the started ones to end.
+        """
+        self.executor.shutdown(cancel_futures=True)
+
+    async def __aenter__(self) -> "MachinePool":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        # Waiting for the started runs in a thread keeps the event loop going
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
@@ -0,0 +1,220 @@
+import os
+from collections import (
+    deque,
+)
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    wait,
+)
+from functools import (
+    partial,
+)
+from itertools import (
+    islice,
+)
+from typing import (
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from turingtoy.engine import (
+    run_turing_machine,
+)
+from turingtoy.machine import (
+    CompiledMachine,
+    compile_machine,
+)
+
+T = TypeVar("T")
+
+# Called by map_inputs() with the machine, the index of an input and the input
+InputFunction = Callable[[CompiledMachine, int, str], T]
+
+# Machine run by the chunks sent to a worker process, set by _init_worker
+_worker_machine: Optional[CompiledMachine] = None
+
+Chunk = Tuple[int, List[str]]  # index of the first input, inputs
+ChunkResult = Tuple[int, List[T]]  # index of the first input, results
+
+
+def run_many(
+    machine: Union[Dict, CompiledMachine],
+    inputs: Iterable[str],
+    workers: Optional[int] = None,
+    chunksize: int = 64,
+    steps: Optional[int] = None,
+    timeout: Optional[float] = None,
+) -> Iterator[Tuple[str, bool]]:
+    """
+    Run `machine` on each of `inputs`, yielding `(output, accepted)` in input
+    order.
+
+    The machine is compiled once and sent once to each of `workers` processes
+    (one per core by default, none if `workers` is 1). Inputs are sent to
+    them in chunks of `chunksize`, and consumed lazily with a bounded number
+    of chunks in flight. `steps` and `timeout` apply to each run.
+    """
+    run = partial(_run_input, steps=steps, timeout=timeout)
+    for _, result in map_inputs(machine, inputs, run, workers, chunksize):
+        yield result
+
+
+def run_many_unordered(
+    machine: Union[Dict, CompiledMachine],
+    inputs: Iterable[str],
+    workers: Optional[int] = None,
+    chunksize: int = 64,
+    steps: Optional[int] = None,
+    timeout: Optional[float] = None,
+) -> Iterator[Tuple[int, str, bool]]:
+    """
+    Same as run_many(), but yield `(index, output, accepted)` as soon as the
+    chunk of each input is done, where `index` is the position of the input
+    in `inputs`.
+    """
+    run = partial(_run_input, steps=steps, timeout=timeout)
+    for index, (output, accepted) in map_inputs(
+        machine, inputs, run, workers, chunksize, ordered=False
+    ):
+        yield index, output, accepted
+
+
+def map_inputs(
+    machine: Union[Dict, CompiledMachine],
+    inputs: Iterable[str],
+    function: InputFunction[T],
+    workers: Optional[int] = None,
+    chunksize: int = 64,
+    ordered: bool = True,
+) -> Iterator[Tuple[int, T]]:
+    """
+    Call `function(compiled, index, input_)` on each of `inputs`, where
+    `compiled` is the compiled `machine` and `index` the position of the
+    input, yielding `(index, result)`.
+
+    Inputs are processed like in run_many(), and `function` must be
+    picklable, such as a module-level function or a partial of one. The
+    results are yielded in input order if `ordered`, else as soon as their
+    chunk is done.
+    """
+    for start, results in _run_chunks(
+        machine, inputs, function, workers, chunksize, ordered
+    ):
+        yield from enumerate(results, start)
+
+
+def _run_chunks(
+    machine: Union[Dict, CompiledMachine],
+    inputs: Iterable[str],
+    function: InputFunction[T],
+    workers: Optional[int],
+    chunksize: int,
+    ordered: bool,
+) -> Iterator[ChunkResult[T]]:
+    if chunksize < 1:
+        raise ValueError("chunksize must be at least 1")
+    compiled = compile_machine(machine)
+    workers = workers or os.cpu_count() or 1
+    chunks = _chunks(inputs, chunksize)
+
+    if workers == 1:
+        for chunk in chunks:
+            yield _run_chunk(compiled, chunk, function)
+        return
+
+    max_in_flight = 2 * workers
+    with ProcessPoolExecutor(
+        workers, initializer=_init_worker, initargs=(compiled,)
+    ) as executor:
+        ordered_futures: Deque[Future] = deque()
+        pending: Set[Future] = set()
+        for chunk in chunks:
+            future = executor.submit(_run_worker_chunk, chunk, function)
+            # Unordered results are yielded from `pending` only, so that the
+            # futures and their results are freed once yielded
+            if ordered:
+                ordered_futures.append(future)
+            pending.add(future)
+            if len(pending) >= max_in_flight:
+                yield from _collect(ordered_futures, pending, ordered)
+        while pending:
+            yield from _collect(ordered_futures, pending, ordered)
+
+
+def _collect(
+    ordered_futures: Deque[Future],
+    pending: Set[Future],
+    ordered: bool,
+) -> Iterator[ChunkResult]:
+    """
+    Wait for chunk results and yield them: the oldest one if `ordered`, else
+    all the completed ones.
+    """
+    if ordered:
+        future = ordered_futures.popleft()
+        pending.discard(future)
+        yield future.result()
+        return
+
+    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+    for future in done:
+        pending.discard(future)
+        yield future.result()
+
+
+def _chunks(inputs: Iterable[str], chunksize: int) -> Iterator[Chunk]:
+    iterator = iter(inputs)
+    start = 0
+    while True:
+        chunk = list(islice(iterator, chunksize))
+        if not chunk:
+            return
+        yield start, chunk
+        start += len(chunk)
+
+
+def _init_worker(machine: CompiledMachine) -> None:  # pragma: no cover
+    global _worker_machine
+    _worker_machine = machine
+
+
+# Worker process functions are not seen by coverage
+def _run_worker_chunk(
+    chunk: Chunk, function: InputFunction[T]
+) -> ChunkResult[T]:  # pragma: no cover
+    if _worker_machine is None:
+        raise RuntimeError("Worker process was not initialized with a machine")
+    return _run_chunk(_worker_machine, chunk, function)
+
+
+def _run_chunk(
+    machine: CompiledMachine, chunk: Chunk, function: InputFunction[T]
+) -> ChunkResult[T]:
+    start, inputs = chunk
+    return start, [
+        function(machine, index, input_) for index, input_ in enumerate(inputs, start)
+    ]
+
+
+def _run_input(
+    machine: CompiledMachine,
+    index: int,
+    input_: str,
+    steps: Optional[int],
+    timeout: Optional[float],
+) -> Tuple[str, bool]:
+    output, _, accepted = run_turing_machine(
+        machine, input_, steps, timeout=timeout, history="none"
+    )
+    return output, accepted
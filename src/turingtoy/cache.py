@@ -0,0 +1,187 @@
+import sqlite3
+from collections import (
+    OrderedDict,
+)
+from typing import (
+    Dict,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from turingtoy.engine import (
+    TIMEOUT,
+    RunResult,
+    run_machine,
+)
+from turingtoy.machine import (
+    CompiledMachine,
+    compile_machine,
+)
+
+# Machine fingerprint, input and step budget
+CacheKey = Tuple[str, str, Optional[int]]
+# Output, accepted, stop reason and number of steps done
+CacheEntry = Tuple[str, bool, str, int]
+
+# Rough memory cost of an entry besides its strings
+ENTRY_OVERHEAD = 256
+
+
+class ResultCache:
+    """
+    Memoizes the results of runs without history, keyed by the fingerprint of
+    the machine (see CompiledMachine.fingerprint), the input and the step
+    budget.
+
+    The least recently used results are evicted when the cache holds more
+    than `max_entries` results or roughly more than `max_bytes` bytes. With
+    `path`, results are also stored in a sqlite database at that path, which
+    survives restarts and is looked up on memory misses.
+
+    `hits`, `misses` and `disk_hits` (the part of the hits found on disk)
+    count lookups, to size the cache.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1 << 16,
+        max_bytes: int = 64 << 20,
+        path: Optional[str] = None,
+    ) -> None:
+        if max_entries < 1 or max_bytes < 1:
+            raise ValueError("max_entries and max_bytes must be at least 1")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries: "OrderedDict[CacheKey, CacheEntry]" = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.db: Optional[sqlite3.Connection] = None
+        if path is not None:
+            self.db = sqlite3.connect(path)
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "fingerprint TEXT, input TEXT, steps INTEGER, "
+                "output TEXT, accepted INTEGER, reason TEXT, done INTEGER, "
+                "PRIMARY KEY (fingerprint, input, steps))"
+            )
+            self.db.commit()
+
+    def run(
+        self,
+        machine: Union[Dict, CompiledMachine],
+        input_: str,
+        steps: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ) -> RunResult:
+        """
+        Same as run_machine(machine, input_, steps, timeout, history="none"),
+        reusing the result of a previous identical run if any. Runs stopped by
+        the timeout are not cached, as they depend on the speed of the run.
+        """
+        if steps is not None and steps < 0:
+            # Negative budgets would share the stored steps of unbounded runs
+            raise ValueError("steps must be at least 0")
+        compiled = compile_machine(machine)
+        key = (compiled.fingerprint, input_, steps)
+        entry = self.get(key)
+        if entry is not None:
+            output, accepted, reason, done = entry
+            return RunResult(output, [], accepted, reason, done)
+
+        result = run_machine(compiled, input_, steps, timeout, history="none")
+        if result.reason != TIMEOUT:
+            self.put(key, (result.output, result.accepted, result.reason, result.steps))
+        return result
+
+    def get(self, key: CacheKey) -> Optional[CacheEntry]:
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+        entry = self._load(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.disk_hits += 1
+        self._remember(key, entry)
+        return entry
+
+    def put(self, key: CacheKey, entry: CacheEntry) -> None:
+        self._remember(key, entry)
+        if self.db is not None:
+            fingerprint, input_, steps = key
+            output, accepted, reason, done = entry
+            self.db.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    fingerprint,
+                    input_,
+                    _steps_column(steps),
+                    output,
+                    accepted,
+                    reason,
+                    done,
+                ),
+            )
+            self.db.commit()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def clear(self) -> None:
+        """
+        Forget all the results, in memory and on disk, and reset the counters.
+        """
+        self.entries.clear()
+        self.bytes = 0
+        self.hits = self.misses = self.disk_hits = 0
+        if self.db is not None:
+            self.db.execute("DELETE FROM results")
+            self.db.commit()
+
+    def close(self) -> None:
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+
+    def _remember(self, key: CacheKey, entry: CacheEntry) -> None:
+        previous = self.entries.pop(key, None)
+        if previous is not None:
+            self.bytes -= _size(key, previous)
+        self.entries[key] = entry
+        self.bytes += _size(key, entry)
+        while len(self.entries) > 1 and (
+            len(self.entries) > self.max_entries or self.bytes > self.max_bytes
+        ):
+            evicted = self.entries.popitem(last=False)
+            self.bytes -= _size(*evicted)
+
+    def _load(self, key: CacheKey) -> Optional[CacheEntry]:
+        if self.db is None:
+            return None
+        fingerprint, input_, steps = key
+        row = self.db.execute(
+            "SELECT output, accepted, reason, done FROM results "
+            "WHERE fingerprint = ? AND input = ? AND steps = ?",
+            (fingerprint, input_, _steps_column(steps)),
+        ).fetchone()
+        if row is None:
+            return None
+        output, accepted, reason, done = row
+        return output, bool(accepted), reason, done
+
+
+def _steps_column(steps: Optional[int]) -> int:
+    # SQL NULLs are never equal, so unbounded runs are stored with -1 steps,
+    # which run() rejects
+    return -1 if steps is None else steps
+
+
+def _size(key: CacheKey, entry: CacheEntry) -> int:
+    return len(key[1]) + len(entry[0]) + ENTRY_OVERHEAD
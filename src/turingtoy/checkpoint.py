@@ -0,0 +1,91 @@
+import json
+import struct
+from dataclasses import (
+    dataclass,
+)
+from typing import (
+    Tuple,
+)
+
+from turingtoy.machine import (
+    UNWRITTEN,
+    CompiledMachine,
+)
+
+MAGIC = b"TTCP"
+VERSION = 1
+# Magic, version, length of the JSON header, length of the tape cells
+HEADER = struct.Struct("<4sBII")
+
+
+@dataclass(frozen=True)
+class Checkpoint:
+    """
+    Configuration of a machine run, from which the run can be resumed.
+
+    `cells` are the symbol ids of the written part of the tape, starting at
+    position `start`, and `symbols` are the names of these ids. The state and
+    symbols are stored by name, so that the checkpoint can be resumed with any
+    machine with the same `fingerprint` (see CompiledMachine.fingerprint).
+    """
+
+    fingerprint: str
+    symbols: Tuple[str, ...]
+    state: str
+    position: int
+    start: int
+    cells: bytes
+    steps: int
+
+    def to_bytes(self) -> bytes:
+        """
+        Serialize the checkpoint: a short JSON header followed by the tape.
+        """
+        header = json.dumps(
+            {
+                "fingerprint": self.fingerprint,
+                "symbols": self.symbols,
+                "state": self.state,
+                "position": self.position,
+                "start": self.start,
+                "steps": self.steps,
+            }
+        ).encode("utf-8")
+        return (
+            HEADER.pack(MAGIC, VERSION, len(header), len(self.cells))
+            + header
+            + self.cells
+        )
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Checkpoint":
+        try:
+            magic, version, header_size, cells_size = HEADER.unpack_from(data)
+        except struct.error:
+            magic = version = None
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Not a turingtoy checkpoint")
+        cells_start = HEADER.size + header_size
+        header = json.loads(data[HEADER.size : cells_start].decode("utf-8"))
+        return cls(
+            fingerprint=header["fingerprint"],
+            symbols=tuple(header["symbols"]),
+            state=header["state"],
+            position=header["position"],
+            start=header["start"],
+            cells=bytes(data[cells_start : cells_start + cells_size]),
+            steps=header["steps"],
+        )
+
+    def tape_cells(self, machine: CompiledMachine) -> bytes:
+        """
+        Return `cells` with the symbol ids of `machine`, which must have the
+        same fingerprint as the checkpointed machine.
+        """
+        if machine.fingerprint != self.fingerprint:
+            raise ValueError("The checkpoint was taken with another machine")
+        ids = {symbol: id_ for id_, symbol in enumerate(machine.symbols) if id_}
+        translation = bytes(
+            [UNWRITTEN] + [ids[symbol] for symbol in self.symbols[1:]]
+        ).ljust(256, b"\0")
+        return self.cells.translate(translation)
@@ -0,0 +1,777 @@
+import sys
+import time
+from contextlib import (
+    nullcontext,
+)
+from dataclasses import (
+    dataclass,
+)
+from typing import (
+    IO,
+    Any,
+    ContextManager,
+    Dict,
+    Generator,
+    Iterator,
+    List,
+    Literal,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from turingtoy.checkpoint import (
+    Checkpoint,
+)
+from turingtoy.history import (
+    DeltaHistory,
+    Recorder,
+    full_recorder,
+)
+from turingtoy.loops import (
+    LoopDetector,
+)
+from turingtoy.machine import (
+    CompiledMachine,
+    compile_machine,
+    missing_transition_message,
+)
+from turingtoy.macro import (
+    MacroMachine,
+)
+from turingtoy.profiling import (
+    Profile,
+    ProgressCallback,
+)
+from turingtoy.tape import (
+    TAPES,
+    MmapTape,
+    Tape,
+    TapeBackend,
+)
+from turingtoy.trace import (
+    TRACE_WRITERS,
+    TraceFormat,
+    TraceWriter,
+)
+
+# Number of steps run between two wall-clock checks when a timeout is given
+SLICE_STEPS = 1 << 14
+
+# Number of steps between two loop checks when detecting loops
+LOOP_CHECK_STEPS = 1 << 10
+
+# Reasons for stopping a run, besides the ones of LoopDetector
+HALTED = "halted"
+STEP_LIMIT = "steps"
+TIMEOUT = "timeout"
+
+# Number of step records buffered by iter_turing_machine
+ITER_STEPS = 1 << 8
+
+HistoryMode = Literal["none", "deltas", "sampled", "full"]
+
+
+class Execution:
+    """
+    Configuration of a running machine: its tape, head cell index, current
+    state and number of steps done so far.
+    """
+
+    __slots__ = ("machine", "tape", "head", "state", "steps")
+
+    def __init__(
+        self,
+        machine: CompiledMachine,
+        input_: str,
+        tape_backend: TapeBackend = "memory",
+        tape_dir: Optional[str] = None,
+    ) -> None:
+        self.machine = machine
+        self.tape = _new_tape(tape_backend, machine.encode(input_), 0, tape_dir)
+        self.head = self.tape.origin
+        self.state = machine.start
+        self.steps = 0
+
+    @classmethod
+    def from_checkpoint(
+        cls,
+        machine: CompiledMachine,
+        checkpoint: Checkpoint,
+        tape_backend: TapeBackend = "memory",
+        tape_dir: Optional[str] = None,
+    ) -> "Execution":
+        """
+        Restore the configuration saved in `checkpoint`, which must have been
+        taken with the same machine.
+        """
+        execution = cls(machine, "")
+        tape = _new_tape(
+            tape_backend, checkpoint.tape_cells(machine), checkpoint.start, tape_dir
+        )
+        execution.tape = tape
+        execution.head = tape.extend(tape.origin + checkpoint.position)
+        execution.state = machine.states.index(checkpoint.state)
+        execution.steps = checkpoint.steps
+        return execution
+
+    def checkpoint(self) -> Checkpoint:
+        """
+        Save the current configuration, with only the written part of the tape.
+        """
+        start, cells = self.tape.content()
+        return Checkpoint(
+            fingerprint=self.machine.fingerprint,
+            symbols=self.machine.symbols,
+            state=self.machine.states[self.state],
+            position=self.position,
+            start=start,
+            cells=cells,
+            steps=self.steps,
+        )
+
+    @property
+    def halted(self) -> bool:
+        return self.machine.final[self.state]
+
+    @property
+    def position(self) -> int:
+        return self.head - self.tape.origin
+
+    def output(self) -> str:
+        return self.tape.render(self.machine)
+
+    def run(self, max_steps: int, record: Optional[Recorder] = None) -> int:
+        """
+        Run until the machine halts or `max_steps` steps are done, calling
+        `record` before each step if given. Returns the number of steps done.
+        """
+        if record is None:
+            return self._run_fast(max_steps)
+
+        machine = self.machine
+        table = machine.run_table
+        n_symbols = machine.n_symbols
+        tape = self.tape
+        cells = tape.cells
+        low, high = tape.span()
+        head = self.head
+        state = self.state
+
+        done = 0
+        try:
+            while done < max_steps:
+                index = state * n_symbols + cells[head]
+                transition = table[index]
+                if transition is None:
+                    break
+
+                record(index, head - tape.origin)
+
+                write, move, state = transition
+                cells[head] = write
+                head += move
+                if not low <= head < high:
+                    head = tape.extend(head)
+                    cells = tape.cells
+                    low, high = tape.span()
+                done += 1
+        finally:
+            self.head = head
+            self.state = state
+            self.steps += done
+        self._check_stop(done, max_steps)
+        return done
+
+    def _run_fast(self, max_steps: int) -> int:
+        """
+        Same as run() without recording, which keeps the loop free of any
+        per-step allocation or call.
+        """
+        machine = self.machine
+        if machine.has_sweeps:
+            return self._run_sweeping(max_steps)
+
+        table = machine.run_table
+        n_symbols = machine.n_symbols
+        tape = self.tape
+        cells = tape.cells
+        low, high = tape.span()
+        head = self.head
+        state = self.state
+
+        done = 0
+        try:
+            for done in range(max_steps):  # noqa: B007
+                transition = table[state * n_symbols + cells[head]]
+                if transition is None:
+                    break
+                write, move, state = transition
+                cells[head] = write
+                head += move
+                if not low <= head < high:
+                    head = tape.extend(head)
+                    cells = tape.cells
+                    low, high = tape.span()
+            else:
+                done = max_steps
+        finally:
+            self.head = head
+            self.state = state
+            self.steps += done
+        self._check_stop(done, max_steps)
+        return done
+
+    def _run_sweeping(self, max_steps: int) -> int:
+        """
+        Same as _run_fast(), but sweeps (see CompiledMachine.sweeps) are run
+        at once, by searching the end of the swept cells and translating them.
+        """
+        machine = self.machine
+        table = machine.run_table
+        sweeps = machine.sweeps
+        n_symbols = machine.n_symbols
+        tape = self.tape
+        cells = tape.cells
+        low, high = tape.span()
+        head = self.head
+        state = self.state
+
+        done = 0
+        try:
+            while done < max_steps:
+                index = state * n_symbols + cells[head]
+                sweep = sweeps[index]
+                if sweep is None:
+                    transition = table[index]
+                    if transition is None:
+                        break
+                    write, move, state = transition
+                    cells[head] = write
+                    head += move
+                    done += 1
+                else:
+                    move, stops, translation = sweep
+                    if move > 0:
+                        start = head
+                        end = min(high, head + max_steps - done)
+                        for stop in stops:
+                            found = cells.find(stop, start, end)
+                            if found != -1:
+                                end = found
+                        head = end
+                    else:
+                        end = head + 1
+                        start = max(low, end - (max_steps - done))
+                        for stop in stops:
+                            found = cells.rfind(stop, start, end)
+                            if found != -1:
+                                start = found + 1
+                        head = start - 1
+                    if translation is not None:
+                        cells[start:end] = cells[start:end].translate(translation)
+                    done += end - start
+                if not low <= head < high:
+                    head = tape.extend(head)
+                    cells = tape.cells
+                    low, high = tape.span()
+        finally:
+            self.head = head
+            self.state = state
+            self.steps += done
+        self._check_stop(done, max_steps)
+        return done
+
+    def _check_stop(self, done: int, max_steps: int) -> None:
+        """
+        Raise a KeyError if a run of `max_steps` steps that did `done` steps
+        stopped on a missing transition (see CompiledMachine.run_table).
+        """
+        if done < max_steps and not self.halted:
+            raise self._missing_transition(self.state, self.tape.cells[self.head])
+
+    def _missing_transition(self, state: int, symbol: int) -> KeyError:
+        return KeyError(
+            missing_transition_message(
+                self.machine.states[state], self.machine.symbols[symbol]
+            )
+        )
+
+
+def _new_tape(
+    backend: TapeBackend, symbols: bytes, start: int, tape_dir: Optional[str]
+) -> Tape:
+    if backend == "mmap":
+        return MmapTape(symbols, start=start, directory=tape_dir)
+    if tape_dir is not None:
+        raise ValueError("tape_dir requires tape='mmap'")
+    return TAPES[backend](symbols, start=start)
+
+
+@dataclass
+class RunResult:
+    output: str
+    execution_history: Sequence
+    accepted: bool
+    reason: str  # why the run stopped: HALTED, STEP_LIMIT, TIMEOUT, CYCLE, DRIFT
+    steps: int
+    checkpoint: Optional[Checkpoint] = None  # final configuration, if asked for
+    profile: Optional[Profile] = None  # statistics of the run, if asked for
+
+
+def run_machine(
+    machine: Union[Dict, CompiledMachine],
+    input_: str,
+    steps: Optional[int] = None,
+    timeout: Optional[float] = None,
+    history: HistoryMode = "full",
+    sample_every: int = 1,
+    block_size: Optional[int] = None,
+    detect_loops: bool = False,
+    snapshot: bool = False,
+    tape: TapeBackend = "memory",
+    tape_dir: Optional[str] = None,
+    trace: Optional[IO] = None,
+    trace_format: TraceFormat = "ndjson",
+    profile: bool = False,
+    progress: Optional[ProgressCallback] = None,
+    progress_every: int = SLICE_STEPS,
+) -> RunResult:
+    """
+    Run `machine` on `input_` until it reaches a final state.
+
+    A run reaching a missing transition raises a KeyError naming the state
+    and the symbol read. CompiledMachine.analysis lists the missing
+    transitions beforehand.
+
+    The run stops early after `steps` steps or `timeout` seconds of wall-clock
+    time if given. It is then not accepted, and the output and execution
+    history are those of the partial run.
+
+    `history` selects what the execution history records:
+    - "full": a list with a step dict for each step,
+    - "sampled": a list with the step dicts of steps 0, `sample_every`,
+      2 * `sample_every`...,
+    - "deltas": a DeltaHistory, which stores much less than "full" and
+      rebuilds the same step dicts on demand,
+    - "none": nothing, which is the fastest way to run a machine.
+
+    With `block_size`, the machine is run by a MacroMachine on blocks of that
+    many cells, for very long runs. This requires `history="none"`.
+
+    With `detect_loops`, the run also stops as soon as a LoopDetector finds
+    that the machine never halts.
+
+    With `snapshot`, the result also holds a Checkpoint of the final
+    configuration, from which resume_machine() can continue the run.
+
+    `tape` selects where the tape is stored: "memory", or "mmap" for a
+    memory-mapped temporary file (see MmapTape), for tapes too large for
+    memory. The file is created in `tape_dir`, or else in the default
+    temporary directory, which may be in memory: see tempfile.gettempdir().
+
+    With `trace`, each step of the full execution history is also written to
+    that file as the machine runs, in `trace_format` (see turingtoy.trace).
+    The file is flushed but left open.
+
+    With `profile`, the result also holds a Profile of the run: the steps
+    done in each state and with each transition, the head range, the tape
+    high-water mark and the time spent compiling, running and rendering.
+
+    With `progress`, progress(steps, state, position) is called whenever the
+    number of steps done reaches a multiple of `progress_every`.
+
+    Without these options, none of their bookkeeping happens.
+    """
+    if block_size is not None:
+        if (
+            history != "none"
+            or detect_loops
+            or snapshot
+            or tape != "memory"
+            or tape_dir is not None
+            or trace is not None
+            or profile
+            or progress is not None
+        ):
+            raise ValueError(
+                "block_size requires history='none' and no detect_loops, snapshot, "
+                "tape, trace, profile or progress"
+            )
+        output, accepted, done = MacroMachine(machine, block_size).run(
+            input_, steps, timeout
+        )
+        return RunResult(
+            output,
+            [],
+            accepted,
+            HALTED if accepted else STEP_LIMIT if done == steps else TIMEOUT,
+            done,
+        )
+
+    profiler = Profile() if profile else None
+    with _phase(profiler, "compile"):
+        compiled = compile_machine(machine)
+    execution = Execution(compiled, input_, tape, tape_dir)
+    try:
+        return _drive(
+            execution,
+            steps,
+            timeout,
+            history,
+            sample_every,
+            detect_loops,
+            snapshot,
+            trace,
+            trace_format,
+            profiler,
+            progress,
+            progress_every,
+        )
+    finally:
+        execution.tape.close()
+
+
+def resume_machine(
+    machine: Union[Dict, CompiledMachine],
+    checkpoint: Checkpoint,
+    steps: Optional[int] = None,
+    timeout: Optional[float] = None,
+    history: HistoryMode = "full",
+    sample_every: int = 1,
+    detect_loops: bool = False,
+    snapshot: bool = False,
+    tape: TapeBackend = "memory",
+    tape_dir: Optional[str] = None,
+    trace: Optional[IO] = None,
+    trace_format: TraceFormat = "ndjson",
+    profile: bool = False,
+    progress: Optional[ProgressCallback] = None,
+    progress_every: int = SLICE_STEPS,
+) -> RunResult:
+    """
+    Continue the run saved in `checkpoint` until the machine reaches a final
+    state, with the options of run_machine().
+
+    `steps` bounds the total number of steps, including the ones done before
+    the checkpoint, so that retrying a run with a higher budget only costs the
+    extra steps. The execution history only covers the resumed steps.
+    """
+    profiler = Profile() if profile else None
+    with _phase(profiler, "compile"):
+        compiled = compile_machine(machine)
+    execution = Execution.from_checkpoint(compiled, checkpoint, tape, tape_dir)
+    try:
+        return _drive(
+            execution,
+            steps,
+            timeout,
+            history,
+            sample_every,
+            detect_loops,
+            snapshot,
+            trace,
+            trace_format,
+            profiler,
+            progress,
+            progress_every,
+        )
+    finally:
+        execution.tape.close()
+
+
+def run_machine_slices(
+    machine: Union[Dict, CompiledMachine],
+    input_: str,
+    steps: Optional[int] = None,
+    timeout: Optional[float] = None,
+    history: HistoryMode = "full",
+    sample_every: int = 1,
+    detect_loops: bool = False,
+    snapshot: bool = False,
+    tape: TapeBackend = "memory",
+    tape_dir: Optional[str] = None,
+    trace: Optional[IO] = None,
+    trace_format: TraceFormat = "ndjson",
+    profile: bool = False,
+    progress: Optional[ProgressCallback] = None,
+    progress_every: int = SLICE_STEPS,
+    slice_steps: int = SLICE_STEPS,
+) -> Generator[None, None, RunResult]:
+    """
+    Same as run_machine() without `block_size`, as a generator running at
+    most `slice_steps` steps each time it is resumed, and returning the
+    result. This lets cooperative schedulers interleave runs. Closing the
+    generator stops the run and releases its tape.
+    """
+    if slice_steps < 1:
+        raise ValueError("slice_steps must be at least 1")
+    profiler = Profile() if profile else None
+    with _phase(profiler, "compile"):
+        compiled = compile_machine(machine)
+    execution = Execution(compiled, input_, tape, tape_dir)
+    try:
+        return (
+            yield from _drive_slices(
+                execution,
+                steps,
+                timeout,
+                history,
+                sample_every,
+                detect_loops,
+                snapshot,
+                trace,
+                trace_format,
+                profiler,
+                progress,
+                progress_every,
+                slice_steps,
+            )
+        )
+    finally:
+        execution.tape.close()
+
+
+def _drive(
+    execution: Execution,
+    steps: Optional[int],
+    timeout: Optional[float],
+    history: HistoryMode,
+    sample_every: int,
+    detect_loops: bool,
+    snapshot: bool,
+    trace: Optional[IO],
+    trace_format: TraceFormat,
+    profiler: Optional[Profile],
+    progress: Optional[ProgressCallback],
+    progress_every: int,
+) -> RunResult:
+    """
+    Run `execution` for run_machine() and resume_machine().
+    """
+    slices = _drive_slices(
+        execution,
+        steps,
+        timeout,
+        history,
+        sample_every,
+        detect_loops,
+        snapshot,
+        trace,
+        trace_format,
+        profiler,
+        progress,
+        progress_every,
+    )
+    while True:
+        try:
+            next(slices)
+        except StopIteration as stop:
+            return stop.value
+
+
+def _drive_slices(
+    execution: Execution,
+    steps: Optional[int],
+    timeout: Optional[float],
+    history: HistoryMode,
+    sample_every: int,
+    detect_loops: bool,
+    snapshot: bool,
+    trace: Optional[IO],
+    trace_format: TraceFormat,
+    profiler: Optional[Profile],
+    progress: Optional[ProgressCallback],
+    progress_every: int,
+    max_slice: Optional[int] = None,
+) -> Generator[None, None, RunResult]:
+    """
+    Same as _drive(), but yield after each slice of steps, which are at most
+    `max_slice` steps long if given, and return the result.
+    """
+    if sample_every < 1:
+        raise ValueError("sample_every must be at least 1")
+    if progress_every < 1:
+        raise ValueError("progress_every must be at least 1")
+
+    execution_history: Sequence
+    record: Optional[Recorder]
+    if history == "deltas":
+        start, cells = execution.tape.content()
+        execution_history = DeltaHistory(execution.machine, cells, start=start)
+        record = execution_history.record
+    else:
+        execution_history = []
+        record = (
+            None
+            if history == "none"
+            else full_recorder(execution.machine, execution.tape, execution_history)
+        )
+    writer: Optional[TraceWriter] = None
+    if trace is not None:
+        if history == "sampled":
+            raise ValueError("trace cannot be used with history='sampled'")
+        writer = TRACE_WRITERS[trace_format](execution.machine, execution.tape, trace)
+        record = writer.record if record is None else _chain(record, writer.record)
+    # Recorder of the steps skipped between samples
+    skipped: Optional[Recorder] = None
+    if profiler is not None:
+        profiler.start(execution.machine, execution.tape, execution.position)
+        skipped = profiler.record
+        record = skipped if record is None else _chain(record, skipped)
+    loop_detector = LoopDetector(execution.machine) if detect_loops else None
+    next_progress = (execution.steps // progress_every + 1) * progress_every
+
+    budget = sys.maxsize if steps is None else steps
+    deadline = None if timeout is None else time.monotonic() + timeout
+    try:
+        reason = yield from _loop(
+            execution,
+            budget,
+            deadline,
+            history,
+            sample_every,
+            record,
+            skipped,
+            loop_detector,
+            profiler,
+            progress,
+            progress_every,
+            next_progress,
+            max_slice,
+        )
+    finally:
+        if writer is not None:
+            writer.flush()
+
+    with _phase(profiler, "render"):
+        output = execution.output()
+    return RunResult(
+        output,
+        execution_history,
+        execution.halted,
+        reason,
+        execution.steps,
+        execution.checkpoint() if snapshot else None,
+        profiler,
+    )
+
+
+def _loop(
+    execution: Execution,
+    budget: int,
+    deadline: Optional[float],
+    history: HistoryMode,
+    sample_every: int,
+    record: Optional[Recorder],
+    skipped: Optional[Recorder],
+    loop_detector: Optional[LoopDetector],
+    profiler: Optional[Profile],
+    progress: Optional[ProgressCallback],
+    progress_every: int,
+    next_progress: int,
+    max_slice: Optional[int],
+) -> Generator[None, None, str]:
+    """
+    Run `execution` by slices of steps until it stops, for _drive_slices(),
+    yielding after each slice, and return why it stopped.
+
+    Each slice is timed on its own in the "run" phase of `profiler`, so that
+    the time the generator is suspended is not counted.
+    """
+    next_sample = execution.steps
+    reason: Optional[str] = None
+    while reason is None:
+        if execution.halted:
+            reason = HALTED
+            continue
+        if execution.steps >= budget:
+            reason = STEP_LIMIT
+            continue
+
+        slice_steps = budget - execution.steps
+        if deadline is not None:
+            slice_steps = min(slice_steps, SLICE_STEPS)
+        if loop_detector is not None:
+            slice_steps = min(slice_steps, LOOP_CHECK_STEPS)
+        if progress is not None:
+            slice_steps = min(slice_steps, next_progress - execution.steps)
+        if max_slice is not None:
+            slice_steps = min(slice_steps, max_slice)
+        with _phase(profiler, "run"):
+            if history == "sampled":
+                # Samples are scheduled by step, as slices may end between them
+                if execution.steps == next_sample:
+                    slice_steps -= execution.run(1, record)
+                    next_sample += sample_every
+                execution.run(min(slice_steps, next_sample - execution.steps), skipped)
+            else:
+                execution.run(slice_steps, record)
+
+        if profiler is not None:
+            profiler.update(execution.tape, execution.position)
+        if progress is not None and execution.steps >= next_progress:
+            progress(
+                execution.steps,
+                execution.machine.states[execution.state],
+                execution.position,
+            )
+            next_progress += progress_every
+        yield
+        if execution.halted:
+            continue
+        if deadline is not None and time.monotonic() >= deadline:
+            reason = TIMEOUT
+        elif loop_detector is not None:
+            with _phase(profiler, "run"):
+                reason = loop_detector.check(
+                    execution.tape, execution.head, execution.state
+                )
+    return reason
+
+
+def _phase(profiler: Optional[Profile], name: str) -> ContextManager:
+    return nullcontext() if profiler is None else profiler.phase(name)
+
+
+def _chain(first: Recorder, second: Recorder) -> Recorder:
+    def record(index: int, position: int) -> None:
+        first(index, position)
+        second(index, position)
+
+    return record
+
+
+def run_turing_machine(
+    machine: Union[Dict, CompiledMachine],
+    input_: str,
+    steps: Optional[int] = None,
+    **options: Any,
+) -> Tuple[str, Sequence, bool]:  # output, execution_history, accepted
+    """
+    Run `machine` on `input_` until it reaches a final state or the end of its
+    `steps` budget. See run_machine() for the other options.
+    """
+    result = run_machine(machine, input_, steps, **options)
+    return result.output, result.execution_history, result.accepted
+
+
+def iter_turing_machine(
+    machine: Union[Dict, CompiledMachine],
+    input_: str,
+    steps: Optional[int] = None,
+) -> Iterator[Dict]:
+    """
+    Run `machine` on `input_` lazily, yielding the execution history dicts of
+    run_turing_machine as the machine runs.
+    """
+    execution = Execution(compile_machine(machine), input_)
+    buffer: List[Dict] = []
+    record = full_recorder(execution.machine, execution.tape, buffer)
+
+    budget = sys.maxsize if steps is None else steps
+    while execution.steps < budget and not execution.halted:
+        execution.run(min(ITER_STEPS, budget - execution.steps), record)
+        yield from buffer
+        buffer.clear()
@@ -0,0 +1,188 @@
+from array import (
+    array,
+)
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+    overload,
+)
+
+from turingtoy.machine import (
+    CompiledMachine,
+)
+from turingtoy.tape import (
+    Tape,
+)
+
+# Called before each step with the transition table index and head position
+Recorder = Callable[[int, int], None]
+
+
+def full_recorder(machine: CompiledMachine, tape: Tape, history: List) -> Recorder:
+    """
+    Return a recorder appending the legacy step dicts to `history`, with a
+    copy of the tape in each of them.
+    """
+    n_symbols = machine.n_symbols
+    states = machine.states
+    symbols = machine.symbols
+    instructions = machine.instructions
+    render = tape.render
+
+    def record(index: int, position: int) -> None:
+        history.append(
+            {
+                "state": states[index // n_symbols],
+                "reading": symbols[index % n_symbols],
+                "position": position,
+                "memory": render(machine),
+                "transition": instructions[index],
+            }
+        )
+
+    return record
+
+
+class Step(Mapping[str, Any]):
+    """
+    View of a step of a DeltaHistory, with the keys of the legacy step dicts.
+
+    Fields are read from the columns of the history when accessed, and the
+    `memory` snapshot is rebuilt then.
+    """
+
+    __slots__ = ("history", "step")
+
+    KEYS = ("state", "reading", "position", "memory", "transition")
+
+    def __init__(self, history: "DeltaHistory", step: int) -> None:
+        self.history = history
+        self.step = step
+
+    @property
+    def state(self) -> str:
+        return self.history.machine.states[self.history.states[self.step]]
+
+    @property
+    def reading(self) -> str:
+        return self.history.machine.symbols[self.history.readings[self.step]]
+
+    @property
+    def position(self) -> int:
+        return self.history.positions[self.step]
+
+    @property
+    def memory(self) -> str:
+        return self.history.memory(self.step)
+
+    @property
+    def transition(self) -> Any:
+        history = self.history
+        machine = history.machine
+        return machine.instructions[
+            history.states[self.step] * machine.n_symbols + history.readings[self.step]
+        ]
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.KEYS)
+
+    def __len__(self) -> int:
+        return len(self.KEYS)
+
+    def __repr__(self) -> str:
+        return f"Step({self.step}, {self.to_dict()!r})"
+
+    def to_dict(self) -> Dict:
+        return {key: getattr(self, key) for key in self.KEYS}
+
+
+class DeltaHistory(Sequence[Step]):
+    """
+    Execution history storing each field of the steps in its own typed
+    column: state ids, read symbol ids, head positions and written symbol
+    ids, which takes 10 bytes per step.
+
+    Steps are returned as Step views, which behave like the legacy step dicts.
+    The `memory` snapshots of the tape are rebuilt on demand by replaying the
+    writes from the initial tape, which holds the symbol ids `input_` from
+    position `start`. The replay goes on from the last rebuilt step, so going
+    through the steps in order only replays each write once. to_list()
+    converts the history to the legacy list of dicts.
+    """
+
+    def __init__(self, machine: CompiledMachine, input_: bytes, start: int = 0) -> None:
+        self.machine = machine
+        self.input = input_
+        self.start = start
+        self.states = array("i")
+        self.readings = array("B")
+        self.positions = array("i")
+        self.writes = array("B")
+        # Step and tape of the last replay
+        self._replayed: Optional[Tuple[int, Tape]] = None
+
+    def record(self, index: int, position: int) -> None:
+        state, symbol = divmod(index, self.machine.n_symbols)
+        self.states.append(state)
+        self.readings.append(symbol)
+        self.positions.append(position)
+        self.writes.append(self.machine.table[index][0])  # type: ignore
+
+    def __len__(self) -> int:
+        return len(self.states)
+
+    @overload
+    def __getitem__(self, step: int) -> Step:
+        ...
+
+    @overload
+    def __getitem__(self, step: slice) -> List[Step]:
+        ...
+
+    def __getitem__(self, step: Union[int, slice]) -> Union[Step, List[Step]]:
+        if isinstance(step, slice):
+            return [Step(self, i) for i in range(len(self))[step]]
+        return Step(self, range(len(self))[step])
+
+    def __iter__(self) -> Iterator[Step]:
+        return (Step(self, step) for step in range(len(self)))
+
+    def tape(self, step: int) -> Tape:
+        """
+        Rebuild the tape as it was before `step`.
+        """
+        replayed = self._replay(step)
+        tape = Tape(padding=0)
+        tape.cells = bytearray(replayed.cells)
+        tape.origin = replayed.origin
+        return tape
+
+    def memory(self, step: int) -> str:
+        return self.machine.render(self._replay(step).cells)
+
+    def to_list(self) -> List[Dict]:
+        return [step.to_dict() for step in self]
+
+    def _replay(self, step: int) -> Tape:
+        if self._replayed is None or self._replayed[0] > step:
+            self._replayed = (0, Tape(self.input, start=self.start))
+        done, tape = self._replayed
+        positions = self.positions
+        writes = self.writes
+        for i in range(done, step):
+            tape.write(positions[i], writes[i])
+        self._replayed = (step, tape)
+        return tape
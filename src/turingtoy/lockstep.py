@@ -0,0 +1,119 @@
+"""
+Lockstep simulation of one machine on a batch of inputs with NumPy.
+
+This module requires the optional numpy dependency (`turingtoy[numpy]`).
+"""
+
+import sys
+from typing import (
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+try:
+    import numpy as np
+except ImportError as e:  # pragma: no cover
+    raise ImportError(
+        "turingtoy.lockstep requires numpy, install turingtoy[numpy]"
+    ) from e
+
+from turingtoy.machine import (
+    CompiledMachine,
+    compile_machine,
+    missing_transition_message,
+)
+
+
+def run_lockstep(
+    machine: Union[Dict, CompiledMachine],
+    inputs: Sequence[str],
+    steps: Optional[int] = None,
+    padding: int = 16,
+) -> List[Tuple[str, bool]]:
+    """
+    Run `machine` on all `inputs` at once, returning `(output, accepted)` for
+    each input like run_turing_machine(..., history="none").
+
+    Tapes are the rows of a 2-D array, and each step advances all the running
+    lanes with vectorized lookups in the transition table. The run ends when
+    all lanes halt or after `steps` steps. This is much faster than one run
+    per input for large batches of short inputs.
+    """
+    compiled = compile_machine(machine)
+    n_symbols = compiled.n_symbols
+    # Transition tables indexed by state * n_symbols + symbol
+    defined = np.array([t is not None for t in compiled.table], dtype=bool)
+    transitions = [t or (0, 0, 0) for t in compiled.table]
+    write_table = np.array([t[0] for t in transitions], dtype=np.uint8)
+    move_table = np.array([t[1] for t in transitions], dtype=np.int64)
+    next_table = np.array([t[2] for t in transitions], dtype=np.int64)
+    final = np.array(compiled.final, dtype=bool)
+
+    encoded = [compiled.encode(input_) for input_ in inputs]
+    width = max((len(symbols) for symbols in encoded), default=0) + 2 * padding
+    tapes = np.zeros((len(inputs), width), dtype=np.uint8)
+    for lane, symbols in enumerate(encoded):
+        tapes[lane, padding : padding + len(symbols)] = np.frombuffer(
+            symbols, dtype=np.uint8
+        )
+    states = np.full(len(inputs), compiled.start, dtype=np.int64)
+
+    # Running lanes, with their row offset in the flattened tapes, their head
+    # index in the flattened tapes and their state
+    lanes = np.nonzero(~final[states])[0]
+    bases = lanes * width
+    cursors = bases + padding
+    lane_states = states[lanes]
+    cells = tapes.reshape(-1)
+    # Number of steps before a head may leave the tapes
+    margin = min(padding, width - 1 - padding)
+
+    budget = sys.maxsize if steps is None else steps
+    step = 0
+    while lanes.size and step < budget:
+        if margin < 0:
+            heads = cursors - bases
+            if heads.min() < 0 or heads.max() >= width:
+                # Empty tapes (no padding and empty inputs) grow too
+                grow = max(width, 1)
+                tapes = np.pad(tapes, ((0, 0), (grow, grow)))
+                cells = tapes.reshape(-1)
+                heads += grow
+                width += 2 * grow
+                bases = lanes * width
+                cursors = bases + heads
+            margin = min(int(heads.min()), width - 1 - int(heads.max()))
+
+        indices = lane_states * n_symbols + cells[cursors]
+        if not defined[indices].all():
+            lane = int(np.argmin(defined[indices]))
+            state, symbol = divmod(int(indices[lane]), n_symbols)
+            message = missing_transition_message(
+                compiled.states[state], compiled.symbols[symbol]
+            )
+            raise KeyError(f"{message} (input {int(lanes[lane])})")
+
+        cells[cursors] = write_table[indices]
+        cursors += move_table[indices]
+        lane_states = next_table[indices]
+        step += 1
+        margin -= 1
+
+        halted = final[lane_states]
+        if halted.any():
+            states[lanes[halted]] = lane_states[halted]
+            running = ~halted
+            lanes = lanes[running]
+            bases = bases[running]
+            cursors = cursors[running]
+            lane_states = lane_states[running]
+
+    states[lanes] = lane_states
+    return [
+        (compiled.render(tape.tobytes()), bool(final[state]))
+        for tape, state in zip(tapes, states)
+    ]
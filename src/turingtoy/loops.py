@@ -0,0 +1,85 @@
+from typing import (
+    Optional,
+    Tuple,
+)
+
+from turingtoy.machine import (
+    UNWRITTEN,
+    CompiledMachine,
+)
+from turingtoy.tape import (
+    Tape,
+)
+
+# Reasons for stopping a machine that never halts
+CYCLE = "cycle"  # a configuration repeated
+DRIFT = "drift"  # the head moves forever over blank cells
+
+# State, head position relative to the non-blank cells, hash of these cells
+# and the cells
+Configuration = Tuple[int, int, int, bytes]
+
+
+class LoopDetector:
+    """
+    Detects that a machine will never halt, from configurations sampled at
+    regular intervals of its run.
+
+    Configurations are compared with Brent's algorithm, so only one of them is
+    kept at a time: a cycle is found once the sampling interval times a power
+    of two exceeds its length. A drift is found from the machine's drift
+    states (see CompiledMachine.drifts) when the head has only blanks ahead.
+    """
+
+    def __init__(self, machine: CompiledMachine) -> None:
+        self.machine = machine
+        self._blanks = bytes([UNWRITTEN, machine.symbols.index(machine.blank, 1)])
+        self._others = tuple(
+            bytes([symbol])
+            for symbol in range(machine.n_symbols)
+            if symbol not in self._blanks
+        )
+        # All blank symbols become UNWRITTEN, as they behave the same
+        self._normalize = bytes(range(256)).replace(self._blanks[1:], b"\0")
+        self._saved: Optional[Configuration] = None
+        self._power = 1
+        self._distance = 0
+
+    def check(self, tape: Tape, head: int, state: int) -> Optional[str]:
+        """
+        Return CYCLE or DRIFT if the machine, in `state` with its head at
+        cell index `head`, never halts. Return None if that is not known yet.
+        """
+        position = head - tape.origin
+        start, cells = tape.content()
+        move = self.machine.drifts[state]
+        if move and self._only_blanks_ahead(cells, position - start, move):
+            return DRIFT
+
+        configuration = self._configuration(cells, start, position, state)
+        if configuration == self._saved:
+            return CYCLE
+        if self._distance == self._power:
+            self._saved = configuration
+            self._power *= 2
+            self._distance = 0
+        self._distance += 1
+        return None
+
+    def _only_blanks_ahead(self, cells: bytes, index: int, move: int) -> bool:
+        if move > 0:
+            start = max(0, index)
+            return all(cells.find(symbol, start) == -1 for symbol in self._others)
+        end = max(0, index + 1)
+        return all(cells.rfind(symbol, 0, end) == -1 for symbol in self._others)
+
+    def _configuration(
+        self, cells: bytes, start: int, position: int, state: int
+    ) -> Configuration:
+        cells = cells.translate(self._normalize)
+        content = cells.strip(b"\0")
+        if content:
+            start += len(cells) - len(cells.lstrip(b"\0"))
+        else:
+            start = position
+        return state, position - start, hash(content), content
@@ -0,0 +1,434 @@
+import json
+from dataclasses import (
+    dataclass,
+)
+from functools import (
+    cached_property,
+)
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+# Symbol id of a cell that was never written. It reads as the blank symbol but
+# is rendered as a space, like the padding of the original string tape.
+UNWRITTEN = 0
+
+MOVES = {"L": -1, "R": 1, "S": 0}
+
+# Symbol ids are stored in bytes, which bounds the alphabet size
+MAX_SYMBOLS = 256
+
+Transition = Tuple[int, int, int]  # write symbol id, move delta, next state id
+
+# Move delta, symbols ending the sweep (one bytes object each), and
+# bytes.translate table of the symbols written, or None if the sweep does not
+# change the tape
+Sweep = Tuple[int, Tuple[bytes, ...], Optional[bytes]]
+
+
+class Alphabet:
+    """
+    Symbols of a compiled machine, numbered from 1 as id 0 is UNWRITTEN, and
+    their conversion from and to strings.
+    """
+
+    symbols: Tuple[str, ...]
+
+    @property
+    def n_symbols(self) -> int:
+        return len(self.symbols)
+
+    @property
+    def render_chars(self) -> Tuple[str, ...]:
+        return (" ",) + self.symbols[1:]
+
+    @cached_property
+    def _render_table(self) -> Optional[bytes]:
+        """
+        bytes.translate table mapping symbol ids to latin-1 characters, or None
+        if some symbol cannot be rendered that way.
+        """
+        try:
+            table = "".join(self.render_chars).encode("latin-1")
+        except UnicodeEncodeError:
+            return None
+        if len(table) != self.n_symbols:
+            return None
+        return table.ljust(MAX_SYMBOLS, b"?")
+
+    def encode(self, input_: str) -> bytes:
+        """
+        Convert an input string to symbol ids.
+        """
+        ids = {symbol: id_ for id_, symbol in enumerate(self.symbols) if id_}
+        try:
+            return bytes([ids[symbol] for symbol in input_])
+        except KeyError as e:
+            raise ValueError(f"Input symbol {e} is not in the machine alphabet")
+
+    def decode(self, cells: Union[bytes, bytearray]) -> str:
+        """
+        Convert symbol ids to a string, unwritten cells being spaces.
+        """
+        table = self._render_table
+        if table is not None:
+            return cells.translate(table).decode("latin-1")
+        chars = self.render_chars
+        return "".join([chars[symbol] for symbol in cells])
+
+    def render(self, cells: Union[bytes, bytearray, memoryview]) -> str:
+        """
+        Convert symbol ids to a string, trimmed of surrounding whitespace.
+        """
+        if isinstance(cells, memoryview):
+            cells = cells.tobytes()
+        return self.decode(cells.strip(bytes([UNWRITTEN]))).strip()
+
+
+@dataclass(frozen=True)
+class CompiledMachine(Alphabet):
+    """
+    Integer-encoded form of a machine dict.
+
+    States and symbols are numbered densely, and the transition of state `q`
+    reading symbol `s` is stored in `table[q * n_symbols + s]`, or is None when
+    the machine dict does not define it. The original instruction objects are
+    kept in `instructions` with the same layout, for execution histories.
+    """
+
+    blank: str
+    states: Tuple[str, ...]
+    symbols: Tuple[str, ...]
+    start: int
+    final: Tuple[bool, ...]
+    table: Tuple[Optional[Transition], ...]
+    instructions: Tuple[Any, ...]
+
+    @cached_property
+    def run_table(self) -> Tuple[Optional[Transition], ...]:
+        """
+        `table` where all the entries of final states are None too.
+
+        The engine stops on None entries, so it needs no other check per
+        step: the run halted if the state is final, and else it misses a
+        transition.
+        """
+        n_symbols = self.n_symbols
+        return tuple(
+            None if self.final[index // n_symbols] else transition
+            for index, transition in enumerate(self.table)
+        )
+
+    @cached_property
+    def analysis(self) -> "MachineAnalysis":
+        """
+        Static analysis of the machine, computed once per compiled machine.
+        """
+        n_symbols = self.n_symbols
+        n_states = len(self.states)
+        rows = [
+            self.table[state * n_symbols : (state + 1) * n_symbols]
+            for state in range(n_states)
+        ]
+        successors = [
+            {t[2] for t in row if t is not None} if not self.final[state] else set()
+            for state, row in enumerate(rows)
+        ]
+        reachable = _closure({self.start}, successors)
+        predecessors: List[Set[int]] = [set() for _ in range(n_states)]
+        for state, targets in enumerate(successors):
+            for target in targets:
+                predecessors[target].add(state)
+        halting = _closure(
+            {state for state in range(n_states) if self.final[state]}, predecessors
+        )
+
+        def names(states: Iterable[int]) -> Tuple[str, ...]:
+            return tuple(self.states[state] for state in sorted(states))
+
+        running = [state for state in sorted(reachable) if not self.final[state]]
+        return MachineAnalysis(
+            unreachable_states=names(set(range(n_states)) - reachable),
+            dead_states=names(set(running) - halting),
+            undefined_states=names(state for state in running if not any(rows[state])),
+            missing_transitions=tuple(
+                (self.states[state], self.symbols[symbol])
+                for state in running
+                if any(rows[state])
+                # Unwritten cells have the same transitions as blanks
+                for symbol in range(1, n_symbols)
+                if rows[state][symbol] is None
+            ),
+            invalid_symbols=tuple(
+                symbol for symbol in self.symbols[1:] if len(symbol) != 1
+            ),
+        )
+
+    @cached_property
+    def sweeps(self) -> Tuple[Optional[Sweep], ...]:
+        """
+        Sweeps of the machine, with the same layout as `table`.
+
+        A transition going back to its own state with a move is the first
+        step of a sweep: the machine keeps moving in the same direction while
+        it reads symbols having such a transition with the same move. The
+        sweep of `table[i]` is in `sweeps[i]`, and is None for other
+        transitions.
+        """
+        n_symbols = self.n_symbols
+        sweeps: List[Optional[Sweep]] = [None] * len(self.table)
+        for state in range(len(self.states)):
+            # Final states have no transitions to sweep with
+            row = self.run_table[state * n_symbols : (state + 1) * n_symbols]
+            for move in (-1, 1):
+                swept = [
+                    symbol
+                    for symbol, transition in enumerate(row)
+                    if transition is not None and transition[1:] == (move, state)
+                ]
+                if not swept:
+                    continue
+                stops = tuple(
+                    bytes([symbol])
+                    for symbol in range(n_symbols)
+                    if symbol not in swept
+                )
+                writes = bytearray(range(MAX_SYMBOLS))
+                for symbol in swept:
+                    writes[symbol] = row[symbol][0]  # type: ignore
+                translation = (
+                    None if writes == bytes(range(MAX_SYMBOLS)) else bytes(writes)
+                )
+                for symbol in swept:
+                    sweeps[state * n_symbols + symbol] = (move, stops, translation)
+        return tuple(sweeps)
+
+    @cached_property
+    def fingerprint(self) -> str:
+        """
+        Stable hash of the machine's behavior. It does not depend on the
+        order of keys in the machine dict, nor on how moves are written.
+        """
+        # Only needed by caches, checkpoints and traces, and slow to import
+        import hashlib
+
+        symbols = (None,) + self.symbols[1:]
+        transitions = [
+            [
+                self.states[state],
+                symbols[symbol],
+                symbols[t[0]],
+                t[1],
+                self.states[t[2]],
+            ]
+            for (state, symbol), t in (
+                (divmod(index, self.n_symbols), t) for index, t in enumerate(self.table)
+            )
+            if t is not None
+        ]
+        canonical = {
+            "blank": self.blank,
+            "start state": self.states[self.start],
+            "final states": sorted(
+                state for state, final in zip(self.states, self.final) if final
+            ),
+            "table": sorted(transitions, key=json.dumps),
+        }
+        return hashlib.sha256(
+            json.dumps(canonical, sort_keys=True).encode("utf-8")
+        ).hexdigest()
+
+    @cached_property
+    def has_sweeps(self) -> bool:
+        return any(self.sweeps)
+
+    @cached_property
+    def drifts(self) -> Tuple[int, ...]:
+        """
+        Move delta of each state that never halts once it reads a blank with
+        only blank cells ahead, or 0.
+
+        From such states, the transitions on blanks all move the same way,
+        so the machine never reads anything else than blanks and keeps
+        cycling through states.
+        """
+        return tuple(self._drift(state) for state in range(len(self.states)))
+
+    def _drift(self, state: int) -> int:
+        transition = self.table[state * self.n_symbols + UNWRITTEN]
+        move = 0 if transition is None else transition[1]
+        visited = set()
+        while move and state not in visited:
+            transition = self.table[state * self.n_symbols + UNWRITTEN]
+            if self.final[state] or transition is None or transition[1] != move:
+                return 0
+            visited.add(state)
+            state = transition[2]
+        return move
+
+
+@dataclass(frozen=True)
+class MachineAnalysis:
+    """
+    Findings of CompiledMachine.analysis. States are reachable when some
+    input takes the machine to them from its start state.
+
+    - `unreachable_states`: states that are never reached,
+    - `dead_states`: reachable states from which no final state can be
+      reached, so runs reaching them never halt or miss a transition,
+    - `undefined_states`: reachable non-final states without any
+      transition, such as target states missing from the machine dict,
+    - `missing_transitions`: (state, symbol) pairs of the other reachable
+      non-final states without a transition, where runs stop with an error,
+    - `invalid_symbols`: symbols that are not a single character, so they
+      can neither be given in inputs nor rendered in outputs.
+
+    `errors` describes the findings that make the machine invalid, and
+    `warnings` the missing transitions. These are allowed, as most machines
+    only define the transitions their inputs need, but a run reaching one
+    raises a KeyError after the steps done before it.
+    """
+
+    unreachable_states: Tuple[str, ...]
+    dead_states: Tuple[str, ...]
+    undefined_states: Tuple[str, ...]
+    missing_transitions: Tuple[Tuple[str, str], ...]
+    invalid_symbols: Tuple[str, ...]
+
+    @property
+    def errors(self) -> List[str]:
+        errors = []
+        if self.undefined_states:
+            errors.append(f"Undefined states: {list(self.undefined_states)}")
+        if self.invalid_symbols:
+            errors.append(
+                f"Symbols are not single characters: {list(self.invalid_symbols)}"
+            )
+        return errors
+
+    @property
+    def warnings(self) -> List[str]:
+        warnings = []
+        if self.missing_transitions:
+            warnings.append(f"Missing transitions: {list(self.missing_transitions)}")
+        return warnings
+
+
+def _closure(states: Set[int], edges: List[Set[int]]) -> Set[int]:
+    """
+    Return `states` and the states reachable from them through `edges`.
+    """
+    closure = set(states)
+    pending = list(states)
+    while pending:
+        for state in edges[pending.pop()]:
+            if state not in closure:
+                closure.add(state)
+                pending.append(state)
+    return closure
+
+
+def validate_machine(machine: Union[Dict, CompiledMachine]) -> CompiledMachine:
+    """
+    Compile `machine` and check its analysis (see MachineAnalysis), raising
+    a ValueError listing its errors if any. Its warnings are left to the
+    caller.
+    """
+    compiled = compile_machine(machine)
+    errors = compiled.analysis.errors
+    if errors:
+        raise ValueError("Invalid machine: " + "; ".join(errors))
+    return compiled
+
+
+def compile_machine(machine: Union[Dict, CompiledMachine]) -> CompiledMachine:
+    """
+    Compile a machine dict to a CompiledMachine, which can be reused to run
+    the machine on many inputs. Compiled machines are returned as is.
+    """
+    if isinstance(machine, CompiledMachine):
+        return machine
+
+    blank = machine["blank"]
+    table = machine["table"]
+
+    decoded = {
+        (state, symbol): _decode_instruction(instruction, state)
+        for state, transitions in table.items()
+        for symbol, instruction in transitions.items()
+    }
+
+    states = _unique(
+        [machine["start state"]]
+        + list(table)
+        + [next_state for _, _, next_state in decoded.values()]
+        + list(machine["final states"])
+    )
+    # The blank symbol gets two ids: one for unwritten cells, one for written
+    symbols = [blank] + _unique(
+        [blank]
+        + [symbol for _, symbol in decoded]
+        + [write for write, _, _ in decoded.values() if write is not None]
+    )
+    if len(symbols) > MAX_SYMBOLS:
+        raise ValueError(f"Machines are limited to {MAX_SYMBOLS - 1} symbols")
+
+    state_ids = {state: id_ for id_, state in enumerate(states)}
+    symbol_ids = {symbol: id_ for id_, symbol in enumerate(symbols) if id_}
+
+    n_symbols = len(symbols)
+    transitions: List[Optional[Transition]] = [None] * (len(states) * n_symbols)
+    instructions: List[Any] = [None] * len(transitions)
+    for (state, symbol), (write, move, next_state) in decoded.items():
+        read_ids = [symbol_ids[symbol]]
+        if symbol == blank:
+            read_ids.append(UNWRITTEN)
+        for read_id in read_ids:
+            index = state_ids[state] * n_symbols + read_id
+            write_id = read_id if write is None else symbol_ids[write]
+            transitions[index] = (write_id, move, state_ids[next_state])
+            instructions[index] = table[state][symbol]
+
+    final_states = set(machine["final states"])
+    return CompiledMachine(
+        blank=blank,
+        states=tuple(states),
+        symbols=tuple(symbols),
+        start=state_ids[machine["start state"]],
+        final=tuple(state in final_states for state in states),
+        table=tuple(transitions),
+        instructions=tuple(instructions),
+    )
+
+
+def _decode_instruction(instruction: Any, state: str) -> Tuple[Optional[str], int, str]:
+    """
+    Return the symbol written, the move delta and the next state of an
+    instruction, which is either a move shorthand ("L", "R" or "S") or a dict.
+    """
+    if isinstance(instruction, str):
+        return None, MOVES[instruction], state
+    for key, move in MOVES.items():
+        if key in instruction:
+            return instruction.get("write"), move, instruction[key]
+    return instruction.get("write"), 0, state
+
+
+def missing_transition_message(state: str, reading: Any) -> str:
+    """
+    Describe the missing transition of `state` reading `reading`, a symbol or
+    a tuple of symbols for multi-tape machines, for the KeyError of the runs
+    reaching it.
+    """
+    return f"No transition for state {state!r} reading {reading!r}"
+
+
+def _unique(items: List[str]) -> List[str]:
+    return list(dict.fromkeys(items))
@@ -0,0 +1,213 @@
+import sys
+import time
+from typing import (
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from turingtoy.machine import (
+    CompiledMachine,
+    compile_machine,
+    missing_transition_message,
+)
+
+# Number of macro steps between two wall-clock checks when a timeout is given
+SLICE_MACRO_STEPS = 1 << 10
+
+# Number of steps in a block between two wall-clock checks, for machines
+# staying in a block for long
+SLICE_BLOCK_STEPS = 1 << 14
+
+LEFT = -1
+RIGHT = 1
+
+# Runs of identical blocks on one side of the head as [block, count] lists,
+# the nearest run last
+Stack = List
+# State, block and head offset when the head left the block or the machine
+# halted in it, and number of steps done in the block
+BlockResult = Tuple[int, bytes, int, int]
+
+
+class MacroMachine:
+    """
+    Runs a compiled machine on macro-symbols: blocks of `block_size` cells.
+
+    The result of running the machine through a block, from the state and
+    side it entered the block, is cached and reused for later visits of the
+    same block. The tape is kept as runs of identical blocks on each side of
+    the head, and a run of blocks that the machine crosses without changing
+    state is crossed at once. This is how very long runs of busy-beaver-like
+    machines are simulated.
+    """
+
+    def __init__(
+        self, machine: Union[Dict, CompiledMachine], block_size: int = 8
+    ) -> None:
+        if block_size < 1:
+            raise ValueError("block_size must be at least 1")
+        self.machine = compile_machine(machine)
+        self.block_size = block_size
+        self.cache: Dict[Tuple[int, bytes, int], BlockResult] = {}
+
+    def run(
+        self,
+        input_: str,
+        steps: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ) -> Tuple[str, bool, int]:
+        """
+        Run the machine on `input_` like run_turing_machine(...,
+        history="none"), and return the output, whether it was accepted and
+        the number of steps done.
+        """
+        k = self.block_size
+        final = self.machine.final
+        blank_block = bytes(k)
+
+        cells = self.machine.encode(input_)
+        cells += bytes(-len(cells) % k)
+        left: Stack = []
+        right: Stack = []
+        for start in range(len(cells) - k, -1, -k):
+            _push(right, cells[start : start + k], 1)
+
+        budget = sys.maxsize if steps is None else steps
+        deadline = None if timeout is None else time.monotonic() + timeout
+        state = self.machine.start
+        direction = RIGHT
+        done = 0
+        macro_steps = 0
+        while not final[state] and done < budget:
+            macro_steps += 1
+            if (
+                deadline is not None
+                and macro_steps % SLICE_MACRO_STEPS == 0
+                and time.monotonic() >= deadline
+            ):
+                break
+
+            ahead, behind = (right, left) if direction == RIGHT else (left, right)
+            if ahead:
+                block, count = ahead[-1]
+            else:
+                # Blank blocks are endless, but only crossed at once when
+                # the budget bounds the crossing
+                block, count = blank_block, 1 if steps is None else sys.maxsize
+            entry = 0 if direction == RIGHT else k - 1
+            key = (state, block, direction)
+            result = self.cache.get(key)
+            if result is None:
+                result = self._run_block(state, block, entry, budget - done, deadline)
+                # Results stopped in the block by the budget or the deadline
+                # depend on them, so they are not cached
+                if final[result[0]] or not 0 <= result[2] < k:
+                    self.cache[key] = result
+            next_state, next_block, offset, block_steps = result
+
+            if block_steps > budget - done:
+                # Not enough steps left to go through this block
+                next_state, next_block, offset, block_steps = self._run_block(
+                    state, block, entry, budget - done, deadline
+                )
+            _pop(ahead, 1)
+
+            if final[next_state] or 0 <= offset < k:
+                # Halted, or stopped by the budget or the deadline, in the block
+                _push(behind, next_block, 1)
+                state = next_state
+                done += block_steps
+                break
+
+            if next_state == state and (offset < 0) == (direction == LEFT):
+                # Went through the block without changing state: go through
+                # the whole run of identical blocks
+                crossed = min(count, (budget - done) // block_steps)
+                _pop(ahead, crossed - 1)
+                _push(behind, next_block, crossed)
+                done += crossed * block_steps
+                continue
+
+            if offset < 0:
+                _push(right, next_block, 1)
+                direction = LEFT
+            else:
+                _push(left, next_block, 1)
+                direction = RIGHT
+            state = next_state
+            done += block_steps
+
+        runs = left + right[::-1]
+        while runs and runs[0][0] == blank_block:
+            runs.pop(0)
+        while runs and runs[-1][0] == blank_block:
+            runs.pop()
+        tape = b"".join([block * count for block, count in runs])
+        return self.machine.render(tape), final[state], done
+
+    def _run_block(
+        self,
+        state: int,
+        block: bytes,
+        offset: int,
+        max_steps: int,
+        deadline: Optional[float] = None,
+    ) -> BlockResult:
+        """
+        Run the machine in `block` from `offset` until it halts, leaves the
+        block, does `max_steps` steps or reaches the `deadline`, which is
+        checked every SLICE_BLOCK_STEPS steps.
+        """
+        machine = self.machine
+        final = machine.final
+        table = machine.table
+        n_symbols = machine.n_symbols
+        k = self.block_size
+        cells = bytearray(block)
+        done = 0
+        while True:
+            slice_end = (
+                max_steps
+                if deadline is None
+                else min(max_steps, done + SLICE_BLOCK_STEPS)
+            )
+            while 0 <= offset < k and not final[state] and done < slice_end:
+                transition = table[state * n_symbols + cells[offset]]
+                if transition is None:
+                    raise KeyError(
+                        missing_transition_message(
+                            machine.states[state], machine.symbols[cells[offset]]
+                        )
+                    )
+                write, move, state = transition
+                cells[offset] = write
+                offset += move
+                done += 1
+            if (
+                done < slice_end
+                or done == max_steps
+                or deadline is None
+                or time.monotonic() >= deadline
+            ):
+                return state, bytes(cells), offset, done
+
+
+def _push(stack: Stack, block: bytes, count: int) -> None:
+    if stack and stack[-1][0] == block:
+        stack[-1][1] += count
+    else:
+        stack.append([block, count])
+
+
+def _pop(stack: Stack, count: int) -> None:
+    """
+    Remove `count` blocks from the nearest run of `stack`, which is either
+    empty (blank blocks) or holds at least `count` blocks.
+    """
+    if stack and count:
+        stack[-1][1] -= count
+        if not stack[-1][1]:
+            stack.pop()
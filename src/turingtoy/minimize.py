@@ -0,0 +1,103 @@
+from typing import (
+    Any,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from turingtoy.machine import (
+    CompiledMachine,
+    Transition,
+    compile_machine,
+)
+
+# Keys of the moves in machine dict instructions, by move delta
+MOVE_KEYS = {-1: "L", 0: "S", 1: "R"}
+
+
+def minimize_machine(machine: Union[Dict, CompiledMachine]) -> CompiledMachine:
+    """
+    Return the smallest machine behaving like `machine`: unreachable states
+    are removed, and states behaving the same on every tape are merged,
+    keeping the name of the first one. The states left are numbered densely
+    in their original order.
+
+    The minimized machine gives the same outputs, acceptance and number of
+    steps on every input, but the execution histories name the merged
+    states after the kept ones. Transitions of final states, which are never
+    run, are dropped.
+    """
+    compiled = compile_machine(machine)
+    n_symbols = compiled.n_symbols
+    table = compiled.run_table
+    unreachable = set(compiled.analysis.unreachable_states)
+    kept = [
+        state for state, name in enumerate(compiled.states) if name not in unreachable
+    ]
+
+    def row(state: int) -> Tuple[Optional[Transition], ...]:
+        return table[state * n_symbols : (state + 1) * n_symbols]
+
+    # Moore's partition refinement: states start in blocks of final and
+    # non-final states, which are split until the states of each block have
+    # the same transitions to the same blocks
+    blocks = {state: int(compiled.final[state]) for state in kept}
+    n_blocks = len(set(blocks.values()))
+    while True:
+        signatures: Dict[Any, int] = {}
+        refined = {
+            state: signatures.setdefault(
+                (
+                    blocks[state],
+                    tuple(
+                        None if t is None else (t[0], t[1], blocks[t[2]])
+                        for t in row(state)
+                    ),
+                ),
+                len(signatures),
+            )
+            for state in kept
+        }
+        blocks = refined
+        if len(signatures) == n_blocks:
+            break
+        n_blocks = len(signatures)
+
+    # Blocks are numbered in the order of their first state, which is kept
+    representatives: List[int] = []
+    for state in kept:
+        if blocks[state] == len(representatives):
+            representatives.append(state)
+    states = tuple(compiled.states[state] for state in representatives)
+
+    transitions: List[Optional[Transition]] = []
+    instructions: List[Any] = []
+    for state in representatives:
+        for symbol, transition in enumerate(row(state)):
+            if transition is None:
+                transitions.append(None)
+                instructions.append(None)
+                continue
+            write, move, target = transition
+            merged = blocks[target]
+            transitions.append((write, move, merged))
+            instruction = compiled.instructions[state * n_symbols + symbol]
+            if representatives[merged] != target:
+                # The instruction names a merged state
+                instruction = (
+                    {} if write == symbol else {"write": compiled.symbols[write]}
+                )
+                instruction[MOVE_KEYS[move]] = states[merged]
+            instructions.append(instruction)
+
+    return CompiledMachine(
+        blank=compiled.blank,
+        states=states,
+        symbols=compiled.symbols,
+        start=blocks[compiled.start],
+        final=tuple(compiled.final[state] for state in representatives),
+        table=tuple(transitions),
+        instructions=tuple(instructions),
+    )
@@ -0,0 +1,431 @@
+"""
+Machines with several tapes, each with its own head.
+
+A multi-tape machine dict is a machine dict with a "tapes" count, where:
+- transitions are keyed by the symbols read on each tape, as a tuple or as
+  a string of one character per tape,
+- instructions are either a moves shorthand, such as "RS" to move the head
+  of the first tape right and keep the second one in place, or a dict with
+  an optional "write" (symbols per tape, as a tuple, list or string, None
+  keeping the symbol read) and a moves key giving the next state.
+
+Moves are "L", "R" or "S" (stay). Instructions moving all the heads the same
+way make k-track machines, which read and write k symbols per cell.
+"""
+
+import sys
+import time
+from dataclasses import (
+    dataclass,
+)
+from functools import (
+    cached_property,
+)
+from itertools import (
+    product,
+)
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Literal,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from turingtoy.engine import (
+    HALTED,
+    SLICE_STEPS,
+    STEP_LIMIT,
+    TIMEOUT,
+)
+from turingtoy.machine import (
+    MAX_SYMBOLS,
+    MOVES,
+    UNWRITTEN,
+    Alphabet,
+    _unique,
+    missing_transition_message,
+)
+from turingtoy.tape import (
+    TAPES,
+    TapeBackend,
+)
+
+# Symbol ids written on each tape, move deltas of each head, next state id
+MultiTransition = Tuple[Tuple[int, ...], Tuple[int, ...], int]
+
+# Maximum number of entries of a transition table, which grows as the number
+# of symbols to the power of the number of tapes
+MAX_TABLE = 1 << 22
+
+# Called before each step with the table index of the transition and the
+# head positions
+MultiRecorder = Callable[[int, List[int]], None]
+
+
+@dataclass(frozen=True)
+class MultiTapeMachine(Alphabet):
+    """
+    Integer-encoded form of a multi-tape machine dict.
+
+    The tapes share the symbol ids, and the symbols read on all of them make
+    a single index: the transition of state `q` reading `s_0, ..., s_k-1`
+    is stored in `table[q * stride + s_0 * weights[0] + ... + s_k-1 *
+    weights[k-1]]`, or is None when the machine dict does not define it. The
+    original instruction objects are kept in `instructions` with the same
+    layout, for execution histories.
+    """
+
+    n_tapes: int
+    blank: str
+    states: Tuple[str, ...]
+    symbols: Tuple[str, ...]
+    start: int
+    final: Tuple[bool, ...]
+    table: Tuple[Optional[MultiTransition], ...]
+    instructions: Tuple[Any, ...]
+
+    @property
+    def stride(self) -> int:
+        return self.n_symbols**self.n_tapes
+
+    @property
+    def weights(self) -> Tuple[int, ...]:
+        return tuple(
+            self.n_symbols ** (self.n_tapes - 1 - tape) for tape in range(self.n_tapes)
+        )
+
+    @cached_property
+    def run_table(self) -> Tuple[Optional[MultiTransition], ...]:
+        """
+        `table` where all the entries of final states are None too, like
+        CompiledMachine.run_table.
+        """
+        stride = self.stride
+        return tuple(
+            None if self.final[index // stride] else transition
+            for index, transition in enumerate(self.table)
+        )
+
+    def reading(self, index: int) -> Tuple[str, ...]:
+        """
+        Return the symbols read on each tape at index `index` of the table.
+        """
+        return tuple(
+            self.symbols[index // weight % self.n_symbols] for weight in self.weights
+        )
+
+
+def compile_multitape_machine(
+    machine: Union[Dict, MultiTapeMachine],
+) -> MultiTapeMachine:
+    """
+    Compile a multi-tape machine dict to a MultiTapeMachine, which can be
+    reused to run the machine on many inputs. Compiled machines are returned
+    as is.
+    """
+    if isinstance(machine, MultiTapeMachine):
+        return machine
+
+    n_tapes = machine["tapes"]
+    if n_tapes < 1:
+        raise ValueError("Machines need at least one tape")
+    blank = machine["blank"]
+    table = machine["table"]
+
+    decoded = {
+        (state, key): (
+            _per_tape(key, n_tapes, "Read symbols"),
+            *_decode_instruction(instruction, state, n_tapes),
+        )
+        for state, transitions in table.items()
+        for key, instruction in transitions.items()
+    }
+
+    states = _unique(
+        [machine["start state"]]
+        + list(table)
+        + [next_state for _, _, _, next_state in decoded.values()]
+        + list(machine["final states"])
+    )
+    # The blank symbol gets two ids: one for unwritten cells, one for written
+    symbols = [blank] + _unique(
+        [blank]
+        + [symbol for reading, _, _, _ in decoded.values() for symbol in reading]
+        + [
+            symbol
+            for _, writes, _, _ in decoded.values()
+            for symbol in writes
+            if symbol is not None
+        ]
+    )
+    if len(symbols) > MAX_SYMBOLS:
+        raise ValueError(f"Machines are limited to {MAX_SYMBOLS - 1} symbols")
+    stride = len(symbols) ** n_tapes
+    if len(states) * stride > MAX_TABLE:
+        raise ValueError(
+            f"{len(states)} states reading {len(symbols) - 1} symbols on "
+            f"{n_tapes} tapes exceed the {MAX_TABLE} transitions of a table"
+        )
+
+    state_ids = {state: id_ for id_, state in enumerate(states)}
+    symbol_ids = {symbol: id_ for id_, symbol in enumerate(symbols) if id_}
+    weights = [len(symbols) ** (n_tapes - 1 - tape) for tape in range(n_tapes)]
+
+    transitions: List[Optional[MultiTransition]] = [None] * (len(states) * stride)
+    instructions: List[Any] = [None] * len(transitions)
+    for (state, key), (reading, writes, moves, next_state) in decoded.items():
+        read_ids = [
+            [symbol_ids[symbol], UNWRITTEN] if symbol == blank else [symbol_ids[symbol]]
+            for symbol in reading
+        ]
+        for ids in product(*read_ids):
+            index = state_ids[state] * stride + sum(
+                id_ * weight for id_, weight in zip(ids, weights)
+            )
+            write_ids = tuple(
+                id_ if write is None else symbol_ids[write]
+                for id_, write in zip(ids, writes)
+            )
+            transitions[index] = (write_ids, moves, state_ids[next_state])
+            instructions[index] = table[state][key]
+
+    final_states = set(machine["final states"])
+    return MultiTapeMachine(
+        n_tapes=n_tapes,
+        blank=blank,
+        states=tuple(states),
+        symbols=tuple(symbols),
+        start=state_ids[machine["start state"]],
+        final=tuple(state in final_states for state in states),
+        table=tuple(transitions),
+        instructions=tuple(instructions),
+    )
+
+
+def _decode_instruction(
+    instruction: Any, state: str, n_tapes: int
+) -> Tuple[Tuple[Optional[str], ...], Tuple[int, ...], str]:
+    """
+    Return the symbols written (None where kept), the move deltas and the
+    next state of an instruction, which is either a moves shorthand or a
+    dict.
+    """
+    if isinstance(instruction, str):
+        return (None,) * n_tapes, _moves(instruction, n_tapes), state
+    write = instruction.get("write")
+    writes = (
+        (None,) * n_tapes
+        if write is None
+        else _per_tape(write, n_tapes, "Written symbols")
+    )
+    for key, next_state in instruction.items():
+        if key != "write":
+            return writes, _moves(key, n_tapes), next_state
+    return writes, (0,) * n_tapes, state
+
+
+def _moves(key: str, n_tapes: int) -> Tuple[int, ...]:
+    try:
+        return tuple(MOVES[move] for move in _per_tape(key, n_tapes, "Moves"))
+    except KeyError as e:
+        raise ValueError(f"Unknown move {e} in {key!r}")
+
+
+def _per_tape(value: Any, n_tapes: int, what: str) -> Tuple[Any, ...]:
+    """
+    Return the items of `value`, a tuple, a list or a string of one
+    character per tape, checking that there is one per tape.
+    """
+    items = tuple(value)
+    if len(items) != n_tapes:
+        raise ValueError(f"{what} {value!r} are not one per tape ({n_tapes} tapes)")
+    return items
+
+
+class MultiTapeExecution:
+    """
+    Configuration of a running multi-tape machine: its tapes, head cell
+    indices, current state and number of steps done so far.
+    """
+
+    __slots__ = ("machine", "tapes", "heads", "state", "steps")
+
+    def __init__(
+        self,
+        machine: MultiTapeMachine,
+        inputs: Sequence[str],
+        tape_backend: TapeBackend = "memory",
+    ) -> None:
+        if len(inputs) > machine.n_tapes:
+            raise ValueError(f"{len(inputs)} inputs given for {machine.n_tapes} tapes")
+        inputs = list(inputs) + [""] * (machine.n_tapes - len(inputs))
+        self.machine = machine
+        self.tapes = [TAPES[tape_backend](machine.encode(input_)) for input_ in inputs]
+        self.heads = [tape.origin for tape in self.tapes]
+        self.state = machine.start
+        self.steps = 0
+
+    @property
+    def halted(self) -> bool:
+        return self.machine.final[self.state]
+
+    @property
+    def positions(self) -> List[int]:
+        return [head - tape.origin for head, tape in zip(self.heads, self.tapes)]
+
+    def outputs(self) -> Tuple[str, ...]:
+        return tuple(tape.render(self.machine) for tape in self.tapes)
+
+    def run(self, max_steps: int, record: Optional[MultiRecorder] = None) -> int:
+        """
+        Run until the machine halts or `max_steps` steps are done, calling
+        `record` before each step if given. Returns the number of steps done.
+        """
+        machine = self.machine
+        table = machine.run_table
+        stride = machine.stride
+        weights = machine.weights
+        tapes = self.tapes
+        heads = self.heads
+        cells = [tape.cells for tape in tapes]
+        spans = [tape.span() for tape in tapes]
+        tape_range = range(machine.n_tapes)
+        state = self.state
+
+        done = 0
+        try:
+            while done < max_steps:
+                index = state * stride
+                for tape in tape_range:
+                    index += cells[tape][heads[tape]] * weights[tape]
+                transition = table[index]
+                if transition is None:
+                    break
+
+                if record is not None:
+                    record(index, self.positions)
+
+                writes, moves, state = transition
+                for tape in tape_range:
+                    head = heads[tape]
+                    tape_cells = cells[tape]
+                    tape_cells[head] = writes[tape]
+                    head += moves[tape]
+                    low, high = spans[tape]
+                    if not low <= head < high:
+                        head = tapes[tape].extend(head)
+                        cells[tape] = tapes[tape].cells
+                        spans[tape] = tapes[tape].span()
+                    heads[tape] = head
+                done += 1
+        finally:
+            self.state = state
+            self.steps += done
+        if done < max_steps and not self.halted:
+            reading = tuple(
+                machine.symbols[tape.cells[head]] for tape, head in zip(tapes, heads)
+            )
+            raise KeyError(missing_transition_message(machine.states[state], reading))
+        return done
+
+
+def multitape_recorder(execution: MultiTapeExecution, history: List) -> MultiRecorder:
+    """
+    Return a recorder appending step dicts to `history`, with the keys of
+    the single-tape ones and a tuple or list item per tape in their values.
+    """
+    machine = execution.machine
+    stride = machine.stride
+    states = machine.states
+    instructions = machine.instructions
+    tapes = execution.tapes
+
+    def record(index: int, positions: List[int]) -> None:
+        history.append(
+            {
+                "state": states[index // stride],
+                "reading": machine.reading(index),
+                "position": positions,
+                "memory": [tape.render(machine) for tape in tapes],
+                "transition": instructions[index],
+            }
+        )
+
+    return record
+
+
+@dataclass
+class MultiTapeResult:
+    outputs: Tuple[str, ...]  # rendered tapes, in order
+    execution_history: List[Dict]
+    accepted: bool
+    reason: str  # why the run stopped: HALTED, STEP_LIMIT or TIMEOUT
+    steps: int
+
+    @property
+    def output(self) -> str:
+        return self.outputs[0]
+
+
+def run_multitape_machine(
+    machine: Union[Dict, MultiTapeMachine],
+    inputs: Union[str, Sequence[str]],
+    steps: Optional[int] = None,
+    timeout: Optional[float] = None,
+    history: Literal["none", "full"] = "full",
+    tape: TapeBackend = "memory",
+) -> MultiTapeResult:
+    """
+    Run a multi-tape `machine` until it reaches a final state, with
+    `inputs` on its first tapes (a single input goes on the first tape) and
+    the heads at position 0 of each tape.
+
+    `steps`, `timeout` and `tape` are the same as in run_machine().
+    `history` is "full", for a list with a step dict for each step, or
+    "none".
+    """
+    compiled = compile_multitape_machine(machine)
+    execution = MultiTapeExecution(
+        compiled, [inputs] if isinstance(inputs, str) else inputs, tape
+    )
+    execution_history: List[Dict] = []
+    record = (
+        None if history == "none" else multitape_recorder(execution, execution_history)
+    )
+
+    budget = sys.maxsize if steps is None else steps
+    deadline = None if timeout is None else time.monotonic() + timeout
+    try:
+        reason: Optional[str] = None
+        while reason is None:
+            if execution.halted:
+                reason = HALTED
+                continue
+            if execution.steps >= budget:
+                reason = STEP_LIMIT
+                continue
+            slice_steps = budget - execution.steps
+            if deadline is not None:
+                slice_steps = min(slice_steps, SLICE_STEPS)
+            execution.run(slice_steps, record)
+            if (
+                not execution.halted
+                and deadline is not None
+                and time.monotonic() >= deadline
+            ):
+                reason = TIMEOUT
+        return MultiTapeResult(
+            execution.outputs(),
+            execution_history,
+            execution.halted,
+            reason,
+            execution.steps,
+        )
+    finally:
+        for execution_tape in execution.tapes:
+            execution_tape.close()
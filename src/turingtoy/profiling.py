@@ -0,0 +1,139 @@
+import time
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+)
+
+from turingtoy.machine import (
+    CompiledMachine,
+)
+from turingtoy.tape import (
+    Tape,
+)
+
+# Called every `progress_every` steps with the number of steps done, the
+# current state and the head position
+ProgressCallback = Callable[[int, str, int], None]
+
+PHASES = ("compile", "run", "render")
+
+
+class Profile:
+    """
+    Statistics of a run, collected by run_machine(profile=True).
+
+    `hits` counts the steps done with each transition, with the layout of
+    CompiledMachine.table. `lowest` and `highest` are the extreme head
+    positions, `high_water` the largest number of tape cells allocated
+    (checked between slices of steps, and exact for growing tapes), and
+    `timings` the seconds spent in each of PHASES. The "run" time is summed
+    over the slices of steps, so it leaves out the time spent by the caller
+    between the slices of run_machine_slices() and run_machine_async().
+
+    Profiling calls record() on every step, so the run does not use the
+    sweep skipping of history-less runs and is much slower than without it.
+    """
+
+    def __init__(self) -> None:
+        self.machine: Optional[CompiledMachine] = None
+        self.hits: List[int] = []
+        self.lowest = 0
+        self.highest = 0
+        self.high_water = 0
+        self.timings: Dict[str, float] = dict.fromkeys(PHASES, 0.0)
+
+    def start(self, machine: CompiledMachine, tape: Tape, position: int) -> None:
+        """
+        Start counting the steps of `machine`, with the head at `position`.
+        """
+        self.machine = machine
+        self.hits = [0] * len(machine.table)
+        self.lowest = self.highest = position
+        self.update(tape, position)
+
+    def record(self, index: int, position: int) -> None:
+        self.hits[index] += 1
+        if position < self.lowest:
+            self.lowest = position
+        elif position > self.highest:
+            self.highest = position
+
+    def update(self, tape: Tape, position: int) -> None:
+        """
+        Account for the tape and the head position between two slices of
+        steps, and at the end of the run.
+        """
+        self.lowest = min(self.lowest, position)
+        self.highest = max(self.highest, position)
+        self.high_water = max(self.high_water, tape.allocated())
+
+    def phase(self, name: str) -> "Phase":
+        """
+        Return a context manager adding the time spent in its block to the
+        timing of phase `name`.
+        """
+        return Phase(self.timings, name)
+
+    @property
+    def head_range(self) -> Tuple[int, int]:
+        return self.lowest, self.highest
+
+    @property
+    def steps(self) -> int:
+        return sum(self.hits)
+
+    def transition_hits(self) -> Dict[Tuple[str, str], int]:
+        """
+        Return the number of steps done with each transition used, by state
+        and read symbol, from the most used.
+        """
+        machine = self._machine()
+        hits: Dict[Tuple[str, str], int] = {}
+        for index, count in enumerate(self.hits):
+            if count:
+                state, symbol = divmod(index, machine.n_symbols)
+                # Unwritten cells read as the blank symbol, which has two ids
+                key = (machine.states[state], machine.symbols[symbol])
+                hits[key] = hits.get(key, 0) + count
+        return dict(sorted(hits.items(), key=lambda item: -item[1]))
+
+    def state_visits(self) -> Dict[str, int]:
+        """
+        Return the number of steps done in each state visited, from the most
+        visited.
+        """
+        machine = self._machine()
+        n_symbols = machine.n_symbols
+        visits = {
+            name: sum(self.hits[state * n_symbols : (state + 1) * n_symbols])
+            for state, name in enumerate(machine.states)
+        }
+        return {
+            name: count
+            for name, count in sorted(visits.items(), key=lambda item: -item[1])
+            if count
+        }
+
+    def _machine(self) -> CompiledMachine:
+        if self.machine is None:
+            raise ValueError("The profile was not started")
+        return self.machine
+
+
+class Phase:
+    __slots__ = ("timings", "name", "started")
+
+    def __init__(self, timings: Dict[str, float], name: str) -> None:
+        self.timings = timings
+        self.name = name
+        self.started = 0.0
+
+    def __enter__(self) -> None:
+        self.started = time.perf_counter()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.timings[self.name] += time.perf_counter() - self.started
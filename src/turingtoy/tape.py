@@ -0,0 +1,354 @@
+import mmap
+from typing import (
+    IO,
+    Dict,
+    List,
+    Literal,
+    Optional,
+    Tuple,
+    Type,
+)
+
+from turingtoy.machine import (
+    UNWRITTEN,
+    Alphabet,
+)
+
+# Minimum size of a memory-mapped tape and of its growth
+MMAP_CHUNK = 1 << 24
+
+# Size of the slices scanned to find the written part of a tape
+SCAN_CHUNK = 1 << 20
+
+# Number of cells added at once to the tracked range of a memory-mapped tape
+MMAP_TRACKED = 1 << 12
+
+# Number of cells in a chunk of a sparse tape
+SPARSE_CHUNK = 1 << 12
+
+TapeBackend = Literal["memory", "mmap", "sparse"]
+
+
+class Tape:
+    """
+    Unbounded tape of symbol ids, stored in a bytearray.
+
+    `cells[origin]` is the cell at position 0 (the first input symbol, unless
+    the symbols are written from another `start` position). The buffer
+    at least doubles whenever the head leaves it, on either side, so
+    growing is amortized O(1) per step and writes happen in place.
+    """
+
+    __slots__ = ("cells", "origin")
+
+    def __init__(self, symbols: bytes = b"", padding: int = 16, start: int = 0) -> None:
+        left = padding + max(0, start)
+        self.cells = bytearray(left) + symbols + bytearray(padding)
+        self.origin = left - start
+
+    def extend(self, index: int) -> int:
+        """
+        Grow the buffer so that `index` is a valid cell index. Returns the
+        index of the same cell after growing.
+        """
+        size = len(self.cells)
+        if index < 0:
+            grow = max(size, -index)
+            self.cells[0:0] = bytes(grow)
+            self.origin += grow
+            return index + grow
+        if index >= size:
+            self.cells.extend(bytes(max(size, index - size + 1)))
+        return index
+
+    def span(self) -> Tuple[int, int]:
+        """
+        Return the range of cell indices, from the first to the one after the
+        last, that can be read and written in place. The engine calls
+        extend() for the cells outside of it.
+        """
+        return 0, len(self.cells)
+
+    def read(self, position: int) -> int:
+        index = self.origin + position
+        if 0 <= index < len(self.cells):
+            return self.cells[index]
+        return UNWRITTEN
+
+    def write(self, position: int, symbol: int) -> None:
+        index = self.extend(self.origin + position)
+        self.cells[index] = symbol
+
+    def bounds(self) -> Tuple[int, int]:
+        """
+        Return the cell indices of the first written cell and of the cell
+        after the last one, or (0, 0) if no cell was written.
+        """
+        cells = self.cells
+        # Cells outside the span are never written in place
+        first, size = self.span()
+        while first < size:
+            chunk = cells[first : min(size, first + SCAN_CHUNK)]
+            written = chunk.lstrip(bytes([UNWRITTEN]))
+            first += len(chunk) - len(written)
+            if written:
+                break
+        else:
+            return 0, 0
+
+        last = size
+        while True:
+            chunk = cells[max(first, last - SCAN_CHUNK) : last]
+            written = chunk.rstrip(bytes([UNWRITTEN]))
+            if written:
+                return first, last - len(chunk) + len(written)
+            last -= len(chunk)
+
+    def written(self) -> memoryview:
+        """
+        Return a view of the cells from the first to the last written one,
+        without copying them.
+        """
+        first, last = self.bounds()
+        return memoryview(self.cells)[first:last]
+
+    def content(self) -> Tuple[int, bytes]:
+        """
+        Return the position of the first written cell and a copy of the cells
+        from it to the last written one, or (0, b"") if no cell was written.
+        """
+        first, last = self.bounds()
+        if first == last:
+            return 0, b""
+        return first - self.origin, bytes(self.cells[first:last])
+
+    def allocated(self) -> int:
+        """
+        Return the number of cells stored, written or not.
+        """
+        return len(self.cells)
+
+    def render(self, machine: Alphabet) -> str:
+        """
+        Render the tape like Alphabet.render().
+        """
+        return machine.render(self.cells)
+
+    def close(self) -> None:
+        """
+        Release the storage of the tape.
+        """
+
+
+class MmapTape(Tape):
+    """
+    Tape stored in a memory-mapped file, for tapes too large for memory.
+
+    The file is `path`, or an anonymous temporary file in `directory` (the
+    default temporary directory if None), and it grows by at least `chunk`
+    bytes (MMAP_CHUNK by default) at a time. Only the pages around the head
+    and the written cells stay in memory, and the OS writes the others back
+    to the file. The file should be on disk, not in a RAM-backed file system
+    like /tmp often is.
+
+    The span (see Tape.span) only covers the cells around the ones the head
+    visited, and grows by MMAP_TRACKED cells when the head leaves it, so
+    that finding the written cells does not scan the whole file.
+
+    The views returned by written() must be released before the tape grows
+    or is closed.
+    """
+
+    __slots__ = ("file", "map", "chunk", "low", "high")
+
+    def __init__(
+        self,
+        symbols: bytes = b"",
+        padding: int = 16,
+        start: int = 0,
+        path: Optional[str] = None,
+        chunk: Optional[int] = None,
+        directory: Optional[str] = None,
+    ) -> None:
+        # Slow to import, and only needed by memory-mapped tapes
+        import tempfile
+
+        chunk = chunk or MMAP_CHUNK
+        # Put the symbols in the middle, so that the head can go either way
+        # for a while before moving the cells
+        needed = padding + max(0, start) + len(symbols) + padding
+        size = max(chunk, needed)
+        left = padding + max(0, start) + (size - needed) // 2
+
+        self.file: IO[bytes] = (
+            tempfile.TemporaryFile(dir=directory) if path is None else open(path, "w+b")
+        )
+        self.file.truncate(size)
+        self.map = mmap.mmap(self.file.fileno(), size)
+        self.map[left : left + len(symbols)] = symbols
+        # The engine only uses the bytearray methods that mmap also has
+        self.cells = self.map  # type: ignore
+        self.origin = left - start
+        self.chunk = chunk
+        self.low = left
+        self.high = left + len(symbols)
+        if 0 <= self.origin < size:
+            self._track(self.origin)
+
+    def span(self) -> Tuple[int, int]:
+        return self.low, self.high
+
+    def extend(self, index: int) -> int:
+        cells = self.map
+        size = len(cells)
+        if 0 <= index < size:
+            self._track(index)
+            return index
+
+        grow = max(size, self.chunk, -index if index < 0 else index - size + 1)
+        # New bytes of the file are zeros
+        cells.resize(size + grow)
+        if index >= 0:
+            self._track(index)
+            return index
+
+        cells.move(grow, 0, size)
+        for start in range(0, grow, self.chunk):
+            end = min(grow, start + self.chunk)
+            cells[start:end] = bytes(end - start)
+        self.origin += grow
+        self.low += grow
+        self.high += grow
+        self._track(index + grow)
+        return index + grow
+
+    def render(self, machine: Alphabet) -> str:
+        # Most of the file is unwritten, only copy the written cells
+        with self.written() as cells:
+            return machine.render(cells)
+
+    def close(self) -> None:
+        self.map.close()
+        self.file.close()
+
+    def _track(self, index: int) -> None:
+        # Grow the span past `index`, which is a cell index in the file
+        if index < self.low:
+            self.low = max(0, index - MMAP_TRACKED)
+        elif index >= self.high:
+            self.high = min(len(self.map), index + 1 + MMAP_TRACKED)
+
+
+class SparseTape(Tape):
+    """
+    Tape made of chunks of SPARSE_CHUNK cells, allocated on demand and kept
+    in a dict by chunk number.
+
+    `cells` is the chunk under the head, and `origin` the cell index of
+    position 0 relative to it, so the engine runs on it like on a contiguous
+    tape: extend() switches to the chunk of a cell outside `cells`. Chunks
+    that were never written are freed when the head leaves them, so walking
+    far away does not keep the cells in between.
+    """
+
+    __slots__ = ("chunks", "number", "previous")
+
+    def __init__(self, symbols: bytes = b"", padding: int = 16, start: int = 0) -> None:
+        # Chunks are allocated on demand, so no padding is needed
+        self.chunks: Dict[int, bytearray] = {}
+        offset = 0
+        while offset < len(symbols):
+            number, index = divmod(start + offset, SPARSE_CHUNK)
+            part = symbols[offset : offset + SPARSE_CHUNK - index]
+            self._chunk(number)[index : index + len(part)] = part
+            offset += len(part)
+        # Chunk under the head and the one it left last, which is checked for
+        # writes when the head leaves it for a third chunk
+        self.number = 0
+        self.cells = self._chunk(0)
+        self.origin = 0
+        self.previous = (0, self.cells)
+
+    def extend(self, index: int) -> int:
+        if 0 <= index < SPARSE_CHUNK:
+            return index
+        number, index = divmod(index - self.origin, SPARSE_CHUNK)
+        previous_number, previous = self.previous
+        if previous_number != number and previous.count(UNWRITTEN) == SPARSE_CHUNK:
+            # The chunk left before the current one was never written
+            self.chunks.pop(previous_number, None)
+        self.previous = (self.number, self.cells)
+        self.number = number
+        self.cells = self._chunk(number)
+        self.origin = -number * SPARSE_CHUNK
+        return index
+
+    def read(self, position: int) -> int:
+        number, index = divmod(position, SPARSE_CHUNK)
+        chunk = self.chunks.get(number)
+        return UNWRITTEN if chunk is None else chunk[index]
+
+    def write(self, position: int, symbol: int) -> None:
+        number, index = divmod(position, SPARSE_CHUNK)
+        self._chunk(number)[index] = symbol
+
+    def bounds(self) -> Tuple[int, int]:
+        # Indices relative to `origin`, like the ones extend() takes, as the
+        # written cells may span several chunks
+        start, written = self.content()
+        return self.origin + start, self.origin + start + len(written)
+
+    def written(self) -> memoryview:
+        # The chunks are not contiguous, so the written cells are copied
+        return memoryview(self.content()[1])
+
+    def content(self) -> Tuple[int, bytes]:
+        numbers = self._written_chunks()
+        if not numbers:
+            return 0, b""
+        first = numbers[0]
+        cells = bytearray((numbers[-1] - first + 1) * SPARSE_CHUNK)
+        for number in numbers:
+            start = (number - first) * SPARSE_CHUNK
+            cells[start : start + SPARSE_CHUNK] = self.chunks[number]
+        written = cells.lstrip(bytes([UNWRITTEN]))
+        start = first * SPARSE_CHUNK + len(cells) - len(written)
+        return start, bytes(written.rstrip(bytes([UNWRITTEN])))
+
+    def allocated(self) -> int:
+        return len(self.chunks) * SPARSE_CHUNK
+
+    def render(self, machine: Alphabet) -> str:
+        # Unwritten cells are rendered as spaces, so the chunks around the
+        # written ones are skipped and the gaps between them are spaces
+        pieces = []
+        last = None
+        for number in self._written_chunks():
+            if last is not None:
+                pieces.append(" " * ((number - last - 1) * SPARSE_CHUNK))
+            pieces.append(machine.decode(self.chunks[number]))
+            last = number
+        return "".join(pieces).strip()
+
+    def close(self) -> None:
+        self.chunks.clear()
+
+    def _chunk(self, number: int) -> bytearray:
+        chunk = self.chunks.get(number)
+        if chunk is None:
+            chunk = self.chunks[number] = bytearray(SPARSE_CHUNK)
+        return chunk
+
+    def _written_chunks(self) -> List[int]:
+        return sorted(
+            number
+            for number, chunk in self.chunks.items()
+            if chunk.count(UNWRITTEN) != SPARSE_CHUNK
+        )
+
+
+TAPES: Dict[str, Type[Tape]] = {
+    "memory": Tape,
+    "mmap": MmapTape,
+    "sparse": SparseTape,
+}
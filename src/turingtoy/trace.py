@@ -0,0 +1,211 @@
+"""
+Streaming of execution histories to files, as the machine runs.
+
+A trace holds the step dicts of a full execution history, either as
+newline-delimited JSON, or in a compact binary format: a header with the
+names of the states and symbols, then a fixed-size record for each step,
+which TraceReader reads back with O(1) access to any step.
+"""
+
+import abc
+import json
+import mmap
+import struct
+from typing import (
+    IO,
+    Any,
+    Dict,
+    List,
+    Literal,
+    Type,
+    Union,
+    overload,
+)
+
+from turingtoy.history import (
+    DeltaHistory,
+)
+from turingtoy.machine import (
+    CompiledMachine,
+)
+from turingtoy.tape import (
+    Tape,
+)
+
+TraceFormat = Literal["ndjson", "binary"]
+
+MAGIC = b"TTTR"
+VERSION = 1
+# Magic, version, length of the JSON header, length of the initial tape cells
+HEADER = struct.Struct("<4sBII")
+# State id, read symbol id, head position, written symbol id
+RECORD = struct.Struct("<IBiB")
+
+# Size of the buffer of binary records written at once
+BUFFER_SIZE = 1 << 16
+
+
+class TraceWriter(abc.ABC):
+    """
+    Recorder (see history.Recorder) streaming the steps of a run to `sink`.
+    flush() must be called at the end of the run.
+    """
+
+    def __init__(self, machine: CompiledMachine, tape: Tape, sink: IO) -> None:
+        self.machine = machine
+        self.tape = tape
+        self.sink = sink
+
+    @abc.abstractmethod
+    def record(self, index: int, position: int) -> None:
+        """
+        Record the step at `index` in the machine's step table, with the head
+        at `position` before it.
+        """
+
+    def flush(self) -> None:
+        self.sink.flush()
+
+
+class NdjsonTraceWriter(TraceWriter):
+    """
+    Writes each step dict of the full execution history as a JSON line to a
+    text sink.
+    """
+
+    def record(self, index: int, position: int) -> None:
+        machine = self.machine
+        state, symbol = divmod(index, machine.n_symbols)
+        step = {
+            "state": machine.states[state],
+            "reading": machine.symbols[symbol],
+            "position": position,
+            "memory": self.tape.render(machine),
+            "transition": machine.instructions[index],
+        }
+        self.sink.write(json.dumps(step) + "\n")
+
+
+class BinaryTraceWriter(TraceWriter):
+    """
+    Writes a header with the machine and the initial tape, then a RECORD for
+    each step, to a binary sink.
+    """
+
+    def __init__(self, machine: CompiledMachine, tape: Tape, sink: IO) -> None:
+        super().__init__(machine, tape, sink)
+        start, cells = tape.content()
+        header = json.dumps(
+            {
+                "fingerprint": machine.fingerprint,
+                "states": machine.states,
+                "symbols": machine.symbols,
+                "instructions": machine.instructions,
+                "start": start,
+            }
+        ).encode("utf-8")
+        sink.write(HEADER.pack(MAGIC, VERSION, len(header), len(cells)))
+        sink.write(header)
+        sink.write(cells)
+        self.buffer = bytearray()
+
+    def record(self, index: int, position: int) -> None:
+        machine = self.machine
+        state, symbol = divmod(index, machine.n_symbols)
+        write = machine.table[index][0]  # type: ignore
+        self.buffer += RECORD.pack(state, symbol, position, write)
+        if len(self.buffer) >= BUFFER_SIZE:
+            self.sink.write(self.buffer)
+            self.buffer.clear()
+
+    def flush(self) -> None:
+        self.sink.write(self.buffer)
+        self.buffer.clear()
+        super().flush()
+
+
+TRACE_WRITERS: Dict[str, Type[TraceWriter]] = {
+    "ndjson": NdjsonTraceWriter,
+    "binary": BinaryTraceWriter,
+}
+
+
+class TraceReader:
+    """
+    Memory-maps a binary trace file, and returns the step dicts of its
+    execution history without their `memory` snapshot, with O(1) access to
+    any step. to_history() rebuilds the whole history, snapshots included.
+    """
+
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as file:
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, header_size, cells_size = HEADER.unpack_from(self.map)
+        except struct.error:
+            magic = version = None
+        if magic != MAGIC or version != VERSION:
+            self.map.close()
+            raise ValueError("Not a turingtoy binary trace")
+
+        cells_start = HEADER.size + header_size
+        header = json.loads(self.map[HEADER.size : cells_start].decode("utf-8"))
+        self.fingerprint: str = header["fingerprint"]
+        self.states: List[str] = header["states"]
+        self.symbols: List[str] = header["symbols"]
+        self.instructions: List[Any] = header["instructions"]
+        self.start: int = header["start"]
+        self.input = self.map[cells_start : cells_start + cells_size]
+        self.records_start = cells_start + cells_size
+
+    def __len__(self) -> int:
+        return (len(self.map) - self.records_start) // RECORD.size
+
+    @overload
+    def __getitem__(self, step: int) -> Dict:
+        ...
+
+    @overload
+    def __getitem__(self, step: slice) -> List[Dict]:
+        ...
+
+    def __getitem__(self, step: Union[int, slice]) -> Union[Dict, List[Dict]]:
+        if isinstance(step, slice):
+            return [self[i] for i in range(len(self))[step]]
+        step = range(len(self))[step]
+        state, symbol, position, _ = RECORD.unpack_from(
+            self.map, self.records_start + step * RECORD.size
+        )
+        return {
+            "state": self.states[state],
+            "reading": self.symbols[symbol],
+            "position": position,
+            "transition": self.instructions[state * len(self.symbols) + symbol],
+        }
+
+    def to_history(self, machine: CompiledMachine) -> DeltaHistory:
+        """
+        Load the trace of a run of `machine` in a DeltaHistory.
+        """
+        if machine.fingerprint != self.fingerprint:
+            raise ValueError("The trace was written with another machine")
+        if tuple(self.symbols) != machine.symbols:
+            raise ValueError("The trace symbol ids do not match the machine")
+        history = DeltaHistory(machine, self.input, start=self.start)
+        for state, symbol, position, write in RECORD.iter_unpack(
+            self.map[self.records_start : self.records_start + len(self) * RECORD.size]
+        ):
+            history.states.append(state)
+            history.readings.append(symbol)
+            history.positions.append(position)
+            history.writes.append(write)
+        return history
+
+    def close(self) -> None:
+        self.map.close()
+
+    def __enter__(self) -> "TraceReader":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
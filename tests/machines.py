@@ -0,0 +1,272 @@
+from typing import (
+    Any,
+    Dict,
+    List,
+)
+
+
+def to_dict(keys: List[str], value: Any) -> Dict[str, Any]:
+    return {key: value for key in keys}
+
+
+DOUBLE_1: Dict[str, Any] = {
+    "blank": "0",
+    "start state": "e1",
+    "final states": ["done"],
+    "table": {
+        "e1": {
+            "0": {"L": "done"},
+            "1": {"write": "0", "R": "e2"},
+        },
+        "e2": {
+            "1": {"write": "1", "R": "e2"},
+            "0": {"write": "0", "R": "e3"},
+        },
+        "e3": {
+            "1": {"write": "1", "R": "e3"},
+            "0": {"write": "1", "L": "e4"},
+        },
+        "e4": {
+            "1": {"write": "1", "L": "e4"},
+            "0": {"write": "0", "L": "e5"},
+        },
+        "e5": {
+            "1": {"write": "1", "L": "e5"},
+            "0": {"write": "1", "R": "e1"},
+        },
+        "done": {},
+    },
+}
+
+
+# Adds two binary numbers together.
+
+# Format: Given input a+b where a and b are binary numbers,
+# leaves c b on the tape, where c = a+b.
+# Example: '11+1' => '100 1'.
+ADD_TWO_BINARY_NUMBERS: Dict[str, Any] = {
+    "blank": " ",
+    "start state": "right",
+    "final states": ["done"],
+    "table": {
+        # Start at the second number's rightmost digit.
+        "right": {
+            **to_dict(["0", "1", "+"], "R"),
+            " ": {"L": "read"},
+        },
+        # Add each digit from right to left:
+        # read the current digit of the second number,
+        "read": {
+            "0": {"write": "c", "L": "have0"},
+            "1": {"write": "c", "L": "have1"},
+            "+": {"write": " ", "L": "rewrite"},
+        },
+        # and add it to the next place of the first number,
+        # marking the place (using O or I) as already added.
+        "have0": {**to_dict(["0", "1"], "L"), "+": {"L": "add0"}},
+        "have1": {**to_dict(["0", "1"], "L"), "+": {"L": "add1"}},
+        "add0": {
+            **to_dict(["0", " "], {"write": "O", "R": "back0"}),
+            "1": {"write": "I", "R": "back0"},
+            **to_dict(["O", "I"], "L"),
+        },
+        "add1": {
+            **to_dict(["0", " "], {"write": "I", "R": "back1"}),
+            "1": {"write": "O", "L": "carry"},
+            **to_dict(["O", "I"], "L"),
+        },
+        "carry": {
+            **to_dict(["0", " "], {"write": "1", "R": "back1"}),
+            "1": {"write": "0", "L": "carry"},
+        },
+        # Then, restore the current digit, and repeat with the next digit.
+        "back0": {
+            **to_dict(["0", "1", "O", "I", "+"], "R"),
+            "c": {"write": "0", "L": "read"},
+        },
+        "back1": {
+            **to_dict(["0", "1", "O", "I", "+"], "R"),
+            "c": {"write": "1", "L": "read"},
+        },
+        # Finish: rewrite place markers back to 0s and 1s.
+        "rewrite": {
+            "O": {"write": "0", "L": "rewrite"},
+            "I": {"write": "1", "L": "rewrite"},
+            **to_dict(["0", "1"], "L"),
+            " ": {"R": "done"},
+        },
+        "done": {},
+    },
+}
+
+
+# Adds two binary numbers with a second tape, in steps linear in the size of
+# the numbers: the second number is moved to the second tape, and both
+# numbers are added from right to left at once.
+
+# Examples: '1+1' => '10', '1011+11001' => '100100'.
+ADD_TWO_BINARY_NUMBERS_2_TAPES: Dict[str, Any] = {
+    "tapes": 2,
+    "blank": " ",
+    "start state": "right",
+    "final states": ["done"],
+    "table": {
+        "right": {
+            **to_dict(["0 ", "1 "], "RS"),
+            "+ ": {"write": [" ", None], "RS": "copy"},
+        },
+        "copy": {
+            "0 ": {"write": " 0", "RR": "copy"},
+            "1 ": {"write": " 1", "RR": "copy"},
+            "  ": {"LL": "back"},
+        },
+        # Stay on the rightmost digits of both numbers.
+        "back": {
+            **to_dict([" 0", " 1"], "LS"),
+            **to_dict(["00", "01", "10", "11"], {"SS": "add"}),
+        },
+        # Add both digits and the carry, clearing the second tape.
+        "add": {
+            **to_dict(["00", "0 ", " 0"], {"write": "0 ", "LL": "add"}),
+            **to_dict(["01", "10", "1 ", " 1"], {"write": "1 ", "LL": "add"}),
+            "11": {"write": "0 ", "LL": "carry"},
+            "  ": {"SS": "done"},
+        },
+        "carry": {
+            **to_dict(["00", "0 ", " 0"], {"write": "1 ", "LL": "add"}),
+            **to_dict(["01", "10", "1 ", " 1"], {"write": "0 ", "LL": "carry"}),
+            "11": {"write": "1 ", "LL": "carry"},
+            "  ": {"write": "1 ", "SS": "done"},
+        },
+        "done": {},
+    },
+}
+
+
+# Multiplies two binary numbers together.
+
+# Examples: '11*11' => '1001', '111*110' => '101010'.
+BINARY_MULTIPLICATION: Dict[str, Any] = {
+    "blank": " ",
+    "start state": "start",
+    "final states": ["done"],
+    "table": {
+        # Prefix the input with a '+', and go to the rightmost digit.
+        "start": {
+            **to_dict(["0", "1"], {"L": "init"}),
+        },
+        "init": {
+            " ": {"write": "+", "R": "right"},
+        },
+        "right": {
+            **to_dict(["0", "1", "*"], "R"),
+            " ": {"L": "readB"},
+        },
+        # Read and erase the last digit of the multiplier.
+        # If it's 1, add the current multiplicand.
+        # In any case, double the multiplicand afterwards.
+        "readB": {
+            "0": {"write": " ", "L": "doubleL"},
+            "1": {"write": " ", "L": "addA"},
+        },
+        "addA": {
+            **to_dict(["0", "1"], "L"),
+            "*": {"L": "read"},  # enter adder
+        },
+        # Double the multiplicand by appending a 0.
+        "doubleL": {
+            **to_dict(["0", "1"], "L"),
+            "*": {"write": "0", "R": "shift"},
+        },
+        "double": {  # return from adder
+            **to_dict(["0", "1", "+"], "R"),
+            "*": {"write": "0", "R": "shift"},
+        },
+        # Make room by shifting the multiplier right 1 cell.
+        "shift": {
+            "0": {"write": "*", "R": "shift0"},
+            "1": {"write": "*", "R": "shift1"},
+            " ": {"L": "tidy"},  # base case: multiplier = 0
+        },
+        "shift0": {
+            "0": {"R": "shift0"},
+            "1": {"write": "0", "R": "shift1"},
+            " ": {"write": "0", "R": "right"},
+        },
+        "shift1": {
+            "0": {"write": "1", "R": "shift0"},
+            "1": {"R": "shift1"},
+            " ": {"write": "1", "R": "right"},
+        },
+        "tidy": {
+            **to_dict(["0", "1"], {"write": " ", "L": "tidy"}),
+            "+": {"write": " ", "L": "done"},
+        },
+        "done": {},
+        # This is the 'binary addition' machine almost verbatim.
+        # It's adjusted to keep the '+'
+        # and to lead to another state instead of halting.
+        "read": {
+            "0": {"write": "c", "L": "have0"},
+            "1": {"write": "c", "L": "have1"},
+            "+": {"L": "rewrite"},  # keep the +
+        },
+        "have0": {**to_dict(["0", "1"], "L"), "+": {"L": "add0"}},
+        "have1": {**to_dict(["0", "1"], "L"), "+": {"L": "add1"}},
+        "add0": {
+            **to_dict(["0", " "], {"write": "O", "R": "back0"}),
+            "1": {"write": "I", "R": "back0"},
+            **to_dict(["O", "I"], "L"),
+        },
+        "add1": {
+            **to_dict(["0", " "], {"write": "I", "R": "back1"}),
+            "1": {"write": "O", "L": "carry"},
+            **to_dict(["O", "I"], "L"),
+        },
+        "carry": {
+            **to_dict(["0", " "], {"write": "1", "R": "back1"}),
+            "1": {"write": "0", "L": "carry"},
+        },
+        "back0": {
+            **to_dict(["0", "1", "O", "I", "+"], "R"),
+            "c": {"write": "0", "L": "read"},
+        },
+        "back1": {
+            **to_dict(["0", "1", "O", "I", "+"], "R"),
+            "c": {"write": "1", "L": "read"},
+        },
+        "rewrite": {
+            "O": {"write": "0", "L": "rewrite"},
+            "I": {"write": "1", "L": "rewrite"},
+            **to_dict(["0", "1"], "L"),
+            " ": {"R": "double"},  # when done, go to the 'double' state
+        },
+    },
+}
+
+
+# Never halts: walks right forever over blanks.
+RUN_AWAY: Dict[str, Any] = {
+    "blank": " ",
+    "start state": "right",
+    "final states": ["done"],
+    "table": {
+        "right": {"1": {"write": "0", "R": "right"}, "0": "R", " ": "R"},
+    },
+}
+
+
+# 5-state busy beaver champion: halts after 47,176,870 steps with 4098 ones.
+BUSY_BEAVER_5: Dict[str, Any] = {
+    "blank": "0",
+    "start state": "A",
+    "final states": ["H"],
+    "table": {
+        "A": {"0": {"write": "1", "R": "B"}, "1": {"write": "1", "L": "C"}},
+        "B": {"0": {"write": "1", "R": "C"}, "1": {"write": "1", "R": "B"}},
+        "C": {"0": {"write": "1", "R": "D"}, "1": {"write": "0", "L": "E"}},
+        "D": {"0": {"write": "1", "L": "A"}, "1": {"write": "1", "L": "D"}},
+        "E": {"0": {"write": "1", "R": "H"}, "1": {"write": "0", "L": "A"}},
+        "H": {},
+    },
+}
@@ -0,0 +1,126 @@
+import asyncio
+import time
+from typing import (
+    List,
+)
+
+import pytest
+
+from tests.machines import (
+    BINARY_MULTIPLICATION,
+    DOUBLE_1,
+    RUN_AWAY,
+)
+from turingtoy import (
+    DeltaHistory,
+    MachinePool,
+    run_machine,
+    run_machine_async,
+    run_machine_slices,
+)
+
+
+def test_run_machine_slices() -> None:
+    expected = run_machine(BINARY_MULTIPLICATION, "11*101", history="deltas")
+    slices = run_machine_slices(
+        BINARY_MULTIPLICATION, "11*101", history="deltas", slice_steps=100
+    )
+    resumed = 0
+    with pytest.raises(StopIteration) as stop:
+        while True:
+            next(slices)
+            resumed += 1
+    result = stop.value.value
+    assert resumed == -(-expected.steps // 100)
+    assert (result.output, result.accepted, result.steps) == (
+        expected.output,
+        expected.accepted,
+        expected.steps,
+    )
+    assert isinstance(result.execution_history, DeltaHistory)
+    assert isinstance(expected.execution_history, DeltaHistory)
+    assert result.execution_history.to_list() == expected.execution_history.to_list()
+
+    with pytest.raises(ValueError, match="slice_steps"):
+        next(run_machine_slices(DOUBLE_1, "1", slice_steps=0))
+
+
+@pytest.mark.asyncio
+async def test_run_machine_async_interleaves_runs() -> None:
+    ticks: List[int] = []
+
+    async def tick() -> None:
+        for i in range(5):
+            ticks.append(i)
+            await asyncio.sleep(0)
+
+    result, _ = await asyncio.gather(
+        run_machine_async(BINARY_MULTIPLICATION, "11*101", slice_steps=10),
+        tick(),
+    )
+    assert result == run_machine(BINARY_MULTIPLICATION, "11*101")
+    assert ticks == list(range(5))
+
+    result = await run_machine_async(RUN_AWAY, "1", steps=50, history="none")
+    assert (result.reason, result.steps) == ("steps", 50)
+
+
+@pytest.mark.asyncio
+async def test_run_machine_async_cancellation_and_deadlines() -> None:
+    task = asyncio.ensure_future(run_machine_async(RUN_AWAY, "1", history="none"))
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(
+            run_machine_async(RUN_AWAY, "1", history="none", slice_steps=1000), 0.05
+        )
+
+    result = await run_machine_async(RUN_AWAY, "1", timeout=0.05, history="none")
+    assert (result.reason, result.accepted) == ("timeout", False)
+
+
+@pytest.mark.asyncio
+async def test_machine_pool_runs_in_processes() -> None:
+    inputs = [f"{a:b}*{b:b}" for a in range(1, 5) for b in range(1, 5)]
+    async with MachinePool(workers=2, max_pending=3) as pool:
+        results = await asyncio.gather(
+            *[
+                pool.run(BINARY_MULTIPLICATION, input_, history="none")
+                for input_ in inputs
+            ]
+        )
+        result = await pool.run(RUN_AWAY, "1", steps=100, history="none")
+        assert (result.reason, result.steps) == ("steps", 100)
+
+    assert results == [
+        run_machine(BINARY_MULTIPLICATION, input_, history="none") for input_ in inputs
+    ]
+    pool = MachinePool()
+    assert pool.max_pending >= 2
+    pool.close()
+
+
+@pytest.mark.asyncio
+async def test_machine_pool_exits_without_blocking_the_loop() -> None:
+    ticks: List[float] = []
+
+    async def tick() -> None:
+        while True:
+            ticks.append(time.monotonic())
+            await asyncio.sleep(0.01)
+
+    ticker = asyncio.create_task(tick())
+    async with MachinePool(workers=1) as pool:
+        run = asyncio.create_task(pool.run(RUN_AWAY, "1", timeout=1, history="none"))
+        # Let the run start in the worker
+        await asyncio.sleep(0.3)
+        exited = time.monotonic()
+    # The pool waited for the run, while the ticker went on
+    assert time.monotonic() - exited > 0.3
+    assert sum(tick > exited for tick in ticks) > 10
+    ticker.cancel()
+    assert (await run).reason == "timeout"
@@ -0,0 +1,68 @@
+from collections import (
+    deque,
+)
+from typing import (
+    Any,
+    List,
+)
+
+import pytest
+
+from tests.machines import (
+    ADD_TWO_BINARY_NUMBERS,
+    RUN_AWAY,
+)
+from turingtoy import (
+    compile_machine,
+    run_many,
+    run_many_unordered,
+    run_turing_machine,
+)
+
+INPUTS = [f"{a:b}+{b:b}" for a in range(1, 8) for b in range(1, 8)]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_run_many_yields_results_in_input_order(workers: int) -> None:
+    expected = [
+        run_turing_machine(ADD_TWO_BINARY_NUMBERS, input_)[::2] for input_ in INPUTS
+    ]
+
+    results = run_many(ADD_TWO_BINARY_NUMBERS, iter(INPUTS), workers, chunksize=3)
+    assert list(results) == expected
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_run_many_unordered_yields_input_indices(workers: int) -> None:
+    compiled = compile_machine(ADD_TWO_BINARY_NUMBERS)
+
+    results = list(run_many_unordered(compiled, INPUTS, workers, chunksize=5))
+    assert sorted(index for index, _, _ in results) == list(range(len(INPUTS)))
+    for index, output, accepted in results:
+        assert (output, accepted) == run_turing_machine(compiled, INPUTS[index])[::2]
+
+
+def test_run_many_unordered_frees_results(monkeypatch: pytest.MonkeyPatch) -> None:
+    queues: List[deque] = []
+
+    def recorded_deque(*args: Any) -> deque:
+        queue: deque = deque(*args)
+        queues.append(queue)
+        return queue
+
+    monkeypatch.setattr("turingtoy.batch.deque", recorded_deque)
+    results = run_many_unordered(ADD_TWO_BINARY_NUMBERS, INPUTS, 2, chunksize=5)
+    assert len(list(results)) == len(INPUTS)
+    # No future is kept once its chunk results were yielded
+    assert [len(queue) for queue in queues] == [0]
+
+
+def test_run_many_limits() -> None:
+    assert list(run_many(RUN_AWAY, ["1", "11"], workers=1, steps=3)) == [
+        ("0", False),
+        ("00", False),
+    ]
+    assert list(run_many(RUN_AWAY, ["1"], workers=1, timeout=0.01)) == [("0", False)]
+
+    with pytest.raises(ValueError, match="chunksize"):
+        list(run_many(RUN_AWAY, ["1"], chunksize=0))
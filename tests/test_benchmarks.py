@@ -0,0 +1,67 @@
+import json
+from pathlib import (
+    Path,
+)
+
+from benchmarks import (
+    imports,
+)
+from benchmarks.engine import (
+    compare,
+    main,
+)
+
+
+def test_benchmarks_save_and_compare_results(tmp_path: Path) -> None:
+    output = tmp_path / "results.json"
+    assert main(["--sizes", "1", "--repeat", "1", "--output", str(output)]) == 0
+    results = json.loads(output.read_text())["results"]
+    assert {result["machine"] for result in results} == {
+        "double_1",
+        "add_two_binary_numbers",
+        "binary_multiplication",
+    }
+    assert {result["history"] for result in results} == {"none", "deltas", "full"}
+    assert all(result["steps"] > 0 for result in results)
+
+    # The output can be the baseline it is compared to
+    args = ["--sizes", "1", "--repeat", "1", "--tolerance", "1e9"]
+    assert main([*args, "--compare", str(output), "--output", str(output)]) == 0
+
+
+def test_compare_finds_regressions() -> None:
+    baseline = [
+        {
+            "machine": "double_1",
+            "bits": 4,
+            "history": "none",
+            "steps_per_second": 1000.0,
+            "peak_bytes": 100,
+        }
+    ]
+    same = [dict(baseline[0])]
+    slower = [dict(baseline[0], steps_per_second=700.0, peak_bytes=130)]
+    other = [dict(baseline[0], bits=8, steps_per_second=1.0)]
+
+    assert compare(same, baseline, 0.2) == []
+    assert compare(other, baseline, 0.2) == []
+    assert len(compare(slower, baseline, 0.2)) == 2
+    assert compare(slower, baseline, 0.5) == []
+
+
+def test_import_benchmarks_save_and_compare_results(tmp_path: Path) -> None:
+    output = tmp_path / "imports.json"
+    assert imports.main(["--repeat", "1", "--output", str(output)]) == 0
+    results = json.loads(output.read_text())["results"]
+    assert [result["statement"] for result in results] == list(imports.STATEMENTS)
+    assert all(result["modules"] > 0 for result in results)
+
+    args = ["--repeat", "1", "--tolerance", "1e9"]
+    assert imports.main([*args, "--compare", str(output)]) == 0
+
+    slower = [dict(results[0], seconds=results[0]["seconds"] * 2 + 1)]
+    more_modules = [dict(results[0], modules=results[0]["modules"] + 1)]
+    assert imports.compare(results, results, 0.2) == []
+    assert len(imports.compare(slower, results, 0.2)) == 1
+    assert len(imports.compare(more_modules, results, 0.2)) == 1
+    assert imports.compare([dict(results[0], statement="other")], results, 0) == []
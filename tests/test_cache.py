@@ -0,0 +1,113 @@
+from pathlib import (
+    Path,
+)
+from typing import (
+    Dict,
+)
+
+import pytest
+
+from tests.machines import (
+    ADD_TWO_BINARY_NUMBERS,
+    DOUBLE_1,
+    RUN_AWAY,
+)
+from turingtoy import (
+    ResultCache,
+    compile_machine,
+    run_machine,
+)
+from turingtoy.engine import (
+    STEP_LIMIT,
+)
+
+
+def reverse_keys(value: Dict) -> Dict:
+    return {
+        key: reverse_keys(item) if isinstance(item, dict) else item
+        for key, item in reversed(list(value.items()))
+    }
+
+
+def test_fingerprint_ignores_key_order_and_shorthands() -> None:
+    shorthand = reverse_keys(DOUBLE_1)
+    # Moving right in the same state without writing anything new
+    shorthand["table"]["e2"]["1"] = "R"
+    shorthand["table"]["e3"]["1"] = "R"
+
+    fingerprint = compile_machine(DOUBLE_1).fingerprint
+    assert compile_machine(shorthand).fingerprint == fingerprint
+    assert compile_machine(ADD_TWO_BINARY_NUMBERS).fingerprint != fingerprint
+
+    changed = reverse_keys(DOUBLE_1)
+    changed["table"]["e3"]["1"] = "L"
+    assert compile_machine(changed).fingerprint != fingerprint
+
+
+def test_run_hits_and_misses() -> None:
+    cache = ResultCache()
+    expected = run_machine(DOUBLE_1, "111", history="none")
+
+    assert cache.run(DOUBLE_1, "111") == expected
+    assert cache.run(reverse_keys(DOUBLE_1), "111") == expected
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # The step budget is part of the key
+    result = cache.run(DOUBLE_1, "111", steps=5)
+    assert result.reason == STEP_LIMIT
+    assert cache.run(DOUBLE_1, "111", steps=5) == result
+    assert (cache.hits, cache.misses, len(cache)) == (2, 2, 2)
+
+    cache.clear()
+    assert (cache.hits, cache.misses, len(cache)) == (0, 0, 0)
+
+
+def test_timeouts_are_not_cached() -> None:
+    cache = ResultCache()
+    assert not cache.run(RUN_AWAY, "1", timeout=0.01).accepted
+    assert len(cache) == 0
+
+
+def test_lru_eviction() -> None:
+    cache = ResultCache(max_entries=2)
+    for input_ in ["1", "11", "1"]:
+        cache.run(DOUBLE_1, input_)
+    cache.run(DOUBLE_1, "111")
+    assert [key[1] for key in cache.entries] == ["1", "111"]
+
+    # Entries are a bit more than 256 bytes each
+    cache = ResultCache(max_bytes=600)
+    for input_ in ["1" * i for i in range(1, 10)]:
+        cache.run(DOUBLE_1, input_)
+    assert [key[1] for key in cache.entries] == ["1" * 8, "1" * 9]
+    size = cache.bytes
+    key = next(iter(cache.entries))
+    cache.put(key, cache.entries[key])
+    assert cache.bytes == size
+    assert [key[1] for key in cache.entries] == ["1" * 9, "1" * 8]
+
+
+def test_sqlite_backend(tmp_path: Path) -> None:
+    path = str(tmp_path / "cache.sqlite")
+    cache = ResultCache(path=path)
+    expected = cache.run(DOUBLE_1, "11")
+    cache.run(DOUBLE_1, "11", steps=3)
+    cache.close()
+    cache.close()
+
+    cache = ResultCache(path=path)
+    assert cache.run(DOUBLE_1, "11") == expected
+    assert cache.run(DOUBLE_1, "11") == expected
+    assert (cache.hits, cache.misses, cache.disk_hits) == (2, 0, 1)
+
+    cache.clear()
+    assert cache.run(DOUBLE_1, "11", steps=3).steps == 3
+    assert cache.misses == 1
+    cache.close()
+
+
+def test_limits() -> None:
+    with pytest.raises(ValueError, match="at least 1"):
+        ResultCache(max_entries=0)
+    with pytest.raises(ValueError, match="at least 0"):
+        ResultCache().run(DOUBLE_1, "11", steps=-1)
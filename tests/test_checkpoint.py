@@ -0,0 +1,100 @@
+import pytest
+
+from tests.machines import (
+    ADD_TWO_BINARY_NUMBERS,
+    BINARY_MULTIPLICATION,
+    RUN_AWAY,
+)
+from turingtoy import (
+    Checkpoint,
+    DeltaHistory,
+    compile_machine,
+    resume_machine,
+    run_machine,
+)
+from turingtoy.engine import (
+    HALTED,
+    STEP_LIMIT,
+)
+
+
+@pytest.mark.parametrize(
+    ("machine", "input_", "first_steps"),
+    [
+        (BINARY_MULTIPLICATION, "101*11", 40),
+        (ADD_TWO_BINARY_NUMBERS, "1011+11001", 7),
+        (ADD_TWO_BINARY_NUMBERS, "1+1", 0),
+    ],
+)
+def test_resume_gives_the_same_run(
+    machine: dict, input_: str, first_steps: int
+) -> None:
+    reference = run_machine(machine, input_)
+
+    partial = run_machine(machine, input_, first_steps, snapshot=True)
+    assert partial.reason == STEP_LIMIT
+    assert partial.checkpoint is not None
+    assert partial.checkpoint.steps == first_steps
+    checkpoint = Checkpoint.from_bytes(partial.checkpoint.to_bytes())
+    assert checkpoint == partial.checkpoint
+
+    resumed = resume_machine(machine, checkpoint)
+    assert resumed.output == reference.output
+    assert resumed.accepted
+    assert resumed.steps == reference.steps
+    assert resumed.execution_history == reference.execution_history[first_steps:]
+
+    deltas = resume_machine(machine, checkpoint, history="deltas")
+    assert isinstance(deltas.execution_history, DeltaHistory)
+    assert deltas.execution_history.to_list() == resumed.execution_history
+
+
+def test_steps_bound_the_total_run() -> None:
+    first = run_machine(RUN_AWAY, "11", 10, history="none", snapshot=True)
+    assert first.checkpoint is not None
+    assert first.checkpoint.position == 10
+
+    retry = resume_machine(RUN_AWAY, first.checkpoint, 15, snapshot=True)
+    assert retry.steps == 15
+    assert len(retry.execution_history) == 5
+    assert retry.execution_history[0]["position"] == 10
+    assert retry.checkpoint is not None
+    assert retry.checkpoint.position == 15
+
+    halted = run_machine(ADD_TWO_BINARY_NUMBERS, "1+1", snapshot=True)
+    assert halted.checkpoint is not None
+    assert resume_machine(ADD_TWO_BINARY_NUMBERS, halted.checkpoint).reason == HALTED
+
+
+def test_blank_tape_checkpoint() -> None:
+    result = run_machine(RUN_AWAY, "", 3, snapshot=True)
+    assert result.checkpoint is not None
+    assert (result.checkpoint.cells, result.checkpoint.start) == (b"", 0)
+    assert resume_machine(RUN_AWAY, result.checkpoint, 5).steps == 5
+
+
+def test_resume_with_reordered_machine() -> None:
+    partial = run_machine(BINARY_MULTIPLICATION, "11*11", 30, snapshot=True)
+    assert partial.checkpoint is not None
+    reordered = dict(BINARY_MULTIPLICATION)
+    reordered["table"] = dict(reversed(list(BINARY_MULTIPLICATION["table"].items())))
+    assert (
+        compile_machine(reordered).symbols
+        != compile_machine(BINARY_MULTIPLICATION).symbols
+    )
+
+    resumed = resume_machine(reordered, partial.checkpoint, history="none")
+    assert resumed.output == run_machine(BINARY_MULTIPLICATION, "11*11").output
+
+
+def test_invalid_checkpoints() -> None:
+    partial = run_machine(RUN_AWAY, "1", 2, snapshot=True)
+    assert partial.checkpoint is not None
+    with pytest.raises(ValueError, match="another machine"):
+        resume_machine(ADD_TWO_BINARY_NUMBERS, partial.checkpoint)
+    with pytest.raises(ValueError, match="Not a turingtoy checkpoint"):
+        Checkpoint.from_bytes(b"TTCP")
+    with pytest.raises(ValueError, match="Not a turingtoy checkpoint"):
+        Checkpoint.from_bytes(b"\0" * 32)
+    with pytest.raises(ValueError, match="snapshot"):
+        run_machine(RUN_AWAY, "1", history="none", block_size=4, snapshot=True)
@@ -0,0 +1,166 @@
+from typing import (
+    Dict,
+    Optional,
+)
+
+import pytest
+
+from tests.machines import (
+    ADD_TWO_BINARY_NUMBERS,
+    BINARY_MULTIPLICATION,
+    DOUBLE_1,
+    RUN_AWAY,
+)
+from turingtoy import (
+    compile_machine,
+    run_turing_machine,
+)
+from turingtoy.engine import (
+    Execution,
+)
+from turingtoy.machine import (
+    Sweep,
+)
+
+
+def test_run_turing_machine_stops_after_steps() -> None:
+    output, execution_history, accepted = run_turing_machine(RUN_AWAY, "11", steps=5)
+    assert output == "00"
+    assert len(execution_history) == 5
+    assert execution_history[-1]["position"] == 4
+    assert not accepted
+
+    output, execution_history, accepted = run_turing_machine(
+        ADD_TWO_BINARY_NUMBERS, "11+1", steps=3
+    )
+    assert output == "11+1"
+    assert len(execution_history) == 3
+    assert not accepted
+
+
+def test_run_turing_machine_accepts_within_steps() -> None:
+    reference = run_turing_machine(ADD_TWO_BINARY_NUMBERS, "11+1")
+    n_steps = len(reference[1])
+
+    assert run_turing_machine(ADD_TWO_BINARY_NUMBERS, "11+1", n_steps) == reference
+    assert not run_turing_machine(ADD_TWO_BINARY_NUMBERS, "11+1", n_steps - 1)[2]
+
+
+def test_run_turing_machine_stops_after_timeout() -> None:
+    assert run_turing_machine(RUN_AWAY, "1", timeout=0.01, history="none") == (
+        "0",
+        [],
+        False,
+    )
+
+    output, execution_history, accepted = run_turing_machine(
+        RUN_AWAY, "1", steps=10, timeout=60
+    )
+    assert len(execution_history) == 10
+    assert not accepted
+
+    assert run_turing_machine(
+        ADD_TWO_BINARY_NUMBERS, "11+1", timeout=60
+    ) == run_turing_machine(ADD_TWO_BINARY_NUMBERS, "11+1")
+
+
+def test_execution_resumes_where_it_stopped() -> None:
+    execution = Execution(compile_machine(ADD_TWO_BINARY_NUMBERS), "11+1")
+    assert execution.run(10) == 10
+    assert execution.position == 0
+    assert not execution.halted
+
+    assert (
+        execution.run(1000)
+        == len(run_turing_machine(ADD_TWO_BINARY_NUMBERS, "11+1")[1]) - 10
+    )
+    assert execution.halted
+    assert execution.output() == "100 1"
+    assert execution.run(1000) == 0
+
+
+def test_compiled_machine_sweeps() -> None:
+    compiled = compile_machine(ADD_TWO_BINARY_NUMBERS)
+    n_symbols = compiled.n_symbols
+    symbols = compiled.symbols
+
+    def sweep(state: str, symbol: str) -> Optional[Sweep]:
+        index = compiled.states.index(state) * n_symbols + symbols.index(symbol, 1)
+        return compiled.sweeps[index]
+
+    assert compiled.has_sweeps
+    assert sweep("read", "0") is None
+    move, stops, translation = sweep("right", "+")  # type: ignore
+    assert move == 1
+    assert sorted(symbols[stop[0]] for stop in stops) == [" ", " ", "I", "O", "c"]
+    assert translation is None
+
+    move, stops, translation = sweep("rewrite", "O")  # type: ignore
+    assert move == -1
+    assert sorted(symbols[stop[0]] for stop in stops) == [" ", " ", "+", "c"]
+    assert translation is not None
+    assert bytes([symbols.index("O")]).translate(translation) == bytes(
+        [symbols.index("0")]
+    )
+
+    assert compile_machine(DOUBLE_1).has_sweeps
+
+
+def test_run_turing_machine_without_sweeps() -> None:
+    # Walks right, alternating between two states, until b reads a 1
+    machine = {
+        "blank": " ",
+        "start state": "a",
+        "final states": ["done"],
+        "table": {"a": {" ": {"R": "b"}}, "b": {" ": {"R": "a"}, "1": {"R": "done"}}},
+    }
+    assert not compile_machine(machine).has_sweeps
+
+    output, _, accepted = run_turing_machine(machine, "", 100, history="none")
+    assert (output, accepted) == ("", False)
+    execution = Execution(compile_machine(machine), "")
+    execution.run(100)
+    assert execution.position == 100
+    assert run_turing_machine(machine, " 1", history="none") == ("1", [], True)
+
+    with pytest.raises(KeyError, match="No transition for state 'a' reading '1'"):
+        run_turing_machine(machine, "11", history="none")
+
+
+@pytest.mark.parametrize(
+    ("machine", "input_"),
+    [
+        (ADD_TWO_BINARY_NUMBERS, "1011+11001"),
+        (BINARY_MULTIPLICATION, "101*11"),
+        (RUN_AWAY, "1"),
+    ],
+)
+def test_sweeps_count_every_step(machine: Dict, input_: str) -> None:
+    _, execution_history, accepted = run_turing_machine(machine, input_, steps=500)
+    memories = [step["memory"] for step in execution_history]
+    if accepted:
+        memories.append(run_turing_machine(machine, input_)[0])
+
+    # Stop in the middle of sweeps, and at the end of the run
+    for steps in range(len(memories)):
+        output, _, _ = run_turing_machine(machine, input_, steps, history="none")
+        assert output == memories[steps]
+
+    execution = Execution(compile_machine(machine), input_)
+    assert execution.run(500) == len(memories) - accepted
+
+
+def test_run_turing_machine_stays_with_s_moves() -> None:
+    machine = {
+        "blank": " ",
+        "start state": "flip",
+        "final states": ["done"],
+        "table": {
+            "flip": {"1": {"write": "0", "S": "flop"}},
+            "flop": {"0": {"write": "1", "R": "done"}},
+        },
+    }
+    output, execution_history, accepted = run_turing_machine(machine, "1")
+    assert output == "1"
+    assert [step["position"] for step in execution_history] == [0, 0]
+    assert accepted
@@ -0,0 +1,215 @@
+import sys
+from pathlib import (
+    Path,
+)
+from typing import (
+    Dict,
+)
+
+import pytest
+
+from tests.machines import (
+    ADD_TWO_BINARY_NUMBERS,
+    BINARY_MULTIPLICATION,
+    DOUBLE_1,
+)
+from tests.utils import (
+    regression_test,
+    to_json_str,
+)
+from turingtoy import (
+    DeltaHistory,
+    iter_turing_machine,
+    run_machine,
+    run_machine_slices,
+    run_turing_machine,
+)
+
+
+@pytest.mark.parametrize(
+    ("machine", "input_"),
+    [
+        (DOUBLE_1, "111"),
+        (ADD_TWO_BINARY_NUMBERS, "1011+11001"),
+        (BINARY_MULTIPLICATION, "11*101"),
+    ],
+)
+def test_delta_history_rebuilds_full_history(machine: dict, input_: str) -> None:
+    output, full_history, accepted = run_turing_machine(machine, input_)
+    delta_output, delta_history, delta_accepted = run_turing_machine(
+        machine, input_, history="deltas"
+    )
+
+    assert isinstance(delta_history, DeltaHistory)
+    assert (delta_output, delta_accepted) == (output, accepted)
+    assert len(delta_history) == len(full_history)
+    assert delta_history.to_list() == full_history
+    assert delta_history[5] == full_history[5]
+    assert delta_history[-1] == full_history[-1]
+    assert delta_history[2:4] == full_history[2:4]
+    assert delta_history.memory(len(full_history) // 2) == (
+        full_history[len(full_history) // 2]["memory"]
+    )
+
+
+def test_delta_history_steps() -> None:
+    _, full_history, _ = run_turing_machine(BINARY_MULTIPLICATION, "11*101")
+    _, delta_history, _ = run_turing_machine(
+        BINARY_MULTIPLICATION, "11*101", history="deltas"
+    )
+    assert isinstance(delta_history, DeltaHistory)
+
+    step = delta_history[10]
+    assert step.state == full_history[10]["state"]
+    assert step["reading"] == full_history[10]["reading"]
+    assert dict(step) == full_history[10]
+    assert list(step) == list(full_history[10])
+    assert len(step) == 5
+    assert repr(step).startswith("Step(10, {'state'")
+    with pytest.raises(KeyError):
+        step["writing"]
+
+    # Going back in the history replays the tape from the start again
+    assert delta_history[100].memory == full_history[100]["memory"]
+    assert delta_history[3].memory == full_history[3]["memory"]
+    tape = delta_history.tape(3)
+    tape.write(0, 0)
+    assert delta_history[3].memory == full_history[3]["memory"]
+
+
+def test_delta_history_is_compact() -> None:
+    _, full_history, _ = run_turing_machine(BINARY_MULTIPLICATION, "1101*1011")
+    _, delta_history, _ = run_turing_machine(
+        BINARY_MULTIPLICATION, "1101*1011", history="deltas"
+    )
+    assert isinstance(delta_history, DeltaHistory)
+
+    full_size = sum(
+        sys.getsizeof(step) + sys.getsizeof(step["memory"]) for step in full_history
+    )
+    delta_size = sum(
+        sys.getsizeof(column)
+        for column in [
+            delta_history.states,
+            delta_history.readings,
+            delta_history.positions,
+            delta_history.writes,
+        ]
+    )
+    assert delta_size * 10 < full_size
+
+
+def test_delta_history_serializes_like_full_history(
+    request: pytest.FixtureRequest, global_datadir: Path
+) -> None:
+    input_ = "111"
+    output, execution_history, accepted = run_turing_machine(
+        DOUBLE_1, input_, history="deltas"
+    )
+    assert isinstance(execution_history, DeltaHistory)
+    regression_test(
+        {
+            "machine": DOUBLE_1,
+            "input": input_,
+            "output": output,
+            "execution_history": execution_history,
+        },
+        global_datadir / "double_1" / f"{input_}.json",
+        request.config.getoption("force_regen"),
+    )
+    assert to_json_str(execution_history[0]) == to_json_str(
+        execution_history.to_list()[0]
+    )
+    with pytest.raises(TypeError, match="not JSON serializable"):
+        to_json_str(object())
+
+
+def test_iter_turing_machine_yields_history() -> None:
+    _, execution_history, _ = run_turing_machine(BINARY_MULTIPLICATION, "11*101")
+
+    assert list(iter_turing_machine(BINARY_MULTIPLICATION, "11*101")) == (
+        execution_history
+    )
+    assert list(iter_turing_machine(BINARY_MULTIPLICATION, "11*101", steps=300)) == (
+        execution_history[:300]
+    )
+
+
+def test_run_turing_machine_history_modes() -> None:
+    output, full_history, accepted = run_turing_machine(BINARY_MULTIPLICATION, "11*101")
+
+    assert run_turing_machine(BINARY_MULTIPLICATION, "11*101", history="none") == (
+        output,
+        [],
+        accepted,
+    )
+
+    sampled_output, sampled_history, sampled_accepted = run_turing_machine(
+        BINARY_MULTIPLICATION, "11*101", history="sampled", sample_every=100
+    )
+    assert (sampled_output, sampled_accepted) == (output, accepted)
+    assert sampled_history == full_history[::100]
+
+    _, sampled_history, accepted = run_turing_machine(
+        BINARY_MULTIPLICATION,
+        "11*101",
+        steps=50,
+        timeout=60,
+        history="sampled",
+        sample_every=20,
+    )
+    assert sampled_history == full_history[:50:20]
+    assert not accepted
+
+    with pytest.raises(ValueError, match="sample_every"):
+        run_turing_machine(BINARY_MULTIPLICATION, "11*101", sample_every=0)
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {"timeout": 60.0},
+        {"detect_loops": True},
+        {"progress": lambda *args: None, "progress_every": 7},
+    ],
+)
+def test_sampled_history_keeps_its_steps_across_slices(
+    options: Dict, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # Slices of all these options are shorter than sample_every
+    monkeypatch.setattr("turingtoy.engine.SLICE_STEPS", 7)
+    monkeypatch.setattr("turingtoy.engine.LOOP_CHECK_STEPS", 7)
+    _, full_history, _ = run_turing_machine(BINARY_MULTIPLICATION, "11*101")
+    result = run_machine(
+        BINARY_MULTIPLICATION, "11*101", history="sampled", sample_every=50, **options
+    )
+    assert result.execution_history == full_history[::50]
+
+    slices = run_machine_slices(
+        BINARY_MULTIPLICATION,
+        "11*101",
+        history="sampled",
+        sample_every=50,
+        slice_steps=7,
+        **options,
+    )
+    with pytest.raises(StopIteration) as stop:
+        while True:
+            next(slices)
+    assert stop.value.value.execution_history == full_history[::50]
+
+
+def test_run_turing_machine_without_history() -> None:
+    assert run_turing_machine(DOUBLE_1, "1" * 40, history="none") == (
+        "1" * 40 + "0" + "1" * 40,
+        [],
+        True,
+    )
+    assert run_turing_machine(DOUBLE_1, "1" * 40, steps=10, history="none") == (
+        "0" + "1" * 39,
+        [],
+        False,
+    )
+
+    with pytest.raises(KeyError, match="No transition for state 'readB' reading '\\*'"):
+        run_turing_machine(BINARY_MULTIPLICATION, "11*", history="none")
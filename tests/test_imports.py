@@ -0,0 +1,43 @@
+import subprocess
+import sys
+
+import pytest
+
+import turingtoy
+
+HEAVY_MODULES = [
+    "asyncio",
+    "concurrent.futures",
+    "hashlib",
+    "multiprocessing",
+    "poetry_version",
+    "sqlite3",
+    "tempfile",
+]
+
+
+def test_import_does_not_load_heavy_modules() -> None:
+    code = (
+        "import sys, turingtoy; "
+        f"print([name for name in {HEAVY_MODULES!r} if name in sys.modules])"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    ).stdout
+    assert output.strip() == "[]"
+
+
+def test_lazy_exports() -> None:
+    from turingtoy.batch import (
+        run_many,
+    )
+    from turingtoy.cache import (
+        ResultCache,
+    )
+
+    assert turingtoy.run_many is run_many
+    assert turingtoy.ResultCache is ResultCache
+    assert isinstance(turingtoy.__version__, str)
+    assert set(turingtoy.__all__) <= set(dir(turingtoy)) | set(turingtoy.LAZY_EXPORTS)
+    with pytest.raises(AttributeError, match="run_everything"):
+        turingtoy.run_everything  # type: ignore
@@ -0,0 +1,49 @@
+import pytest
+
+from tests.machines import (
+    ADD_TWO_BINARY_NUMBERS,
+    BINARY_MULTIPLICATION,
+    RUN_AWAY,
+)
+from turingtoy import (
+    run_turing_machine,
+)
+
+pytest.importorskip("numpy")
+
+from turingtoy.lockstep import (  # noqa: E402
+    run_lockstep,
+)
+
+
+@pytest.mark.parametrize("padding", [1, 16])
+def test_run_lockstep_matches_run_turing_machine(padding: int) -> None:
+    inputs = [f"{a:b}*{b:b}" for a in range(1, 9) for b in range(1, 9)]
+
+    assert run_lockstep(BINARY_MULTIPLICATION, inputs, padding=padding) == [
+        run_turing_machine(BINARY_MULTIPLICATION, input_, history="none")[::2]
+        for input_ in inputs
+    ]
+
+
+def test_run_lockstep_limits() -> None:
+    inputs = ["1+1", "1011+11001"]
+
+    assert run_lockstep(ADD_TWO_BINARY_NUMBERS, inputs, steps=20) == [
+        run_turing_machine(ADD_TWO_BINARY_NUMBERS, input_, 20, history="none")[::2]
+        for input_ in inputs
+    ]
+    assert run_lockstep(RUN_AWAY, ["1", "11"], steps=3, padding=0) == [
+        ("0", False),
+        ("00", False),
+    ]
+    assert run_lockstep(RUN_AWAY, []) == []
+    # Empty tapes without padding grow when the heads leave them
+    assert run_lockstep(RUN_AWAY, ["", ""], steps=3, padding=0) == [
+        run_turing_machine(RUN_AWAY, "", 3, history="none")[::2]
+    ] * 2
+
+
+def test_run_lockstep_reports_missing_transition() -> None:
+    with pytest.raises(KeyError, match="'readB' reading '\\*' \\(input 1\\)"):
+        run_lockstep(BINARY_MULTIPLICATION, ["1*1", "11*"])
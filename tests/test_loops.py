@@ -0,0 +1,97 @@
+from typing import (
+    Dict,
+)
+
+import pytest
+
+from tests.machines import (
+    BINARY_MULTIPLICATION,
+    BUSY_BEAVER_5,
+    RUN_AWAY,
+)
+from turingtoy import (
+    compile_machine,
+    run_machine,
+)
+from turingtoy.engine import (
+    HALTED,
+    STEP_LIMIT,
+)
+from turingtoy.loops import (
+    CYCLE,
+    DRIFT,
+)
+
+# Goes back and forth between two cells, flipping the first one
+FLIP_FLOP = {
+    "blank": " ",
+    "start state": "a",
+    "final states": ["done"],
+    "table": {
+        "a": {"x": {"write": "y", "R": "b"}, "y": {"write": "x", "R": "b"}},
+        "b": {" ": {"L": "a"}},
+    },
+}
+
+# Writes 1s leftwards forever, alternating between two states
+LEFT_WRITER = {
+    "blank": "0",
+    "start state": "a",
+    "final states": ["done"],
+    "table": {
+        "a": {"0": {"write": "1", "L": "b"}},
+        "b": {"0": {"L": "a"}, "1": {"R": "done"}},
+    },
+}
+
+
+def test_compiled_machine_drifts() -> None:
+    assert compile_machine(RUN_AWAY).drifts == (1, 0)
+    assert compile_machine(LEFT_WRITER).drifts == (-1, -1, 0)
+    assert compile_machine(FLIP_FLOP).drifts == (0, 0, 0)
+    assert not any(compile_machine(BUSY_BEAVER_5).drifts)
+    assert not any(compile_machine(BINARY_MULTIPLICATION).drifts)
+
+
+@pytest.mark.parametrize(
+    ("machine", "input_", "reason"),
+    [
+        (FLIP_FLOP, "x", CYCLE),
+        (FLIP_FLOP, "y  x", CYCLE),
+        (RUN_AWAY, "101", DRIFT),
+        (LEFT_WRITER, "", DRIFT),
+        (LEFT_WRITER, "011", DRIFT),
+    ],
+)
+def test_run_machine_detects_loops(machine: Dict, input_: str, reason: str) -> None:
+    result = run_machine(machine, input_, history="none", detect_loops=True)
+    assert result.reason == reason
+    assert not result.accepted
+    assert 0 < result.steps < 10_000
+
+
+def test_run_machine_detects_blank_cycles() -> None:
+    # Steps over its own marks, so it never drifts over blanks only
+    machine = {
+        "blank": " ",
+        "start state": "a",
+        "final states": ["done"],
+        "table": {"a": {" ": {"R": "b"}}, "b": {" ": {"L": "a"}}},
+    }
+    result = run_machine(machine, "", history="sampled", detect_loops=True)
+    assert result.reason == CYCLE
+    assert len(result.execution_history) == result.steps
+
+
+def test_run_machine_without_loops() -> None:
+    result = run_machine(BINARY_MULTIPLICATION, "1101*101", detect_loops=True)
+    assert result.reason == HALTED
+    assert result.accepted
+    assert result.output == "1000001"
+
+    result = run_machine(BUSY_BEAVER_5, "", 5000, history="none", detect_loops=True)
+    assert result.reason == STEP_LIMIT
+    assert result.steps == 5000
+
+    with pytest.raises(ValueError, match="no detect_loops"):
+        run_machine(RUN_AWAY, "", history="none", block_size=4, detect_loops=True)
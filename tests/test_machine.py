@@ -0,0 +1,165 @@
+from typing import (
+    Any,
+    Dict,
+)
+
+import pytest
+
+from tests.machines import (
+    ADD_TWO_BINARY_NUMBERS,
+    DOUBLE_1,
+    RUN_AWAY,
+)
+from turingtoy import (
+    compile_machine,
+    run_turing_machine,
+)
+from turingtoy.machine import (
+    UNWRITTEN,
+    MachineAnalysis,
+    validate_machine,
+)
+
+
+def test_compile_machine_encodes_states_and_symbols() -> None:
+    compiled = compile_machine(DOUBLE_1)
+
+    assert compiled.states == ("e1", "e2", "e3", "e4", "e5", "done")
+    assert compiled.symbols == ("0", "0", "1")
+    assert compiled.final == (False, False, False, False, False, True)
+    assert compiled.encode("101") == bytes([2, 1, 2])
+
+    # Unwritten cells read as blank but keep their own symbol id
+    e2 = compiled.states.index("e2")
+    assert compiled.table[e2 * 3 + UNWRITTEN] == (1, 1, 2)
+    assert compiled.table[e2 * 3 + 1] == (1, 1, 2)
+
+
+def test_compile_machine_shorthand_moves_keep_state() -> None:
+    compiled = compile_machine(ADD_TWO_BINARY_NUMBERS)
+
+    right = compiled.states.index("right")
+    plus = compiled.symbols.index("+")
+    assert compiled.table[right * compiled.n_symbols + plus] == (plus, 1, right)
+    assert compiled.instructions[right * compiled.n_symbols + plus] == "R"
+
+
+def test_compiled_machine_is_reusable() -> None:
+    compiled = compile_machine(ADD_TWO_BINARY_NUMBERS)
+
+    assert run_turing_machine(compiled, "11+1")[0] == "100 1"
+    assert run_turing_machine(compiled, "1011+11001")[0] == "100100 11001"
+    assert run_turing_machine(compiled, "11+1") == run_turing_machine(
+        ADD_TWO_BINARY_NUMBERS, "11+1"
+    )
+
+
+def test_instruction_without_move_stays_in_place() -> None:
+    machine = {
+        "blank": " ",
+        "start state": "a",
+        "final states": ["done"],
+        "table": {
+            "a": {"x": {"write": "y"}, "y": {"L": "done"}},
+        },
+    }
+
+    output, execution_history, accepted = run_turing_machine(machine, "x")
+    assert output == "y"
+    assert [step["position"] for step in execution_history] == [0, 0]
+    assert accepted
+
+    with pytest.raises(KeyError, match="No transition for state 'a' reading ' '"):
+        run_turing_machine(machine, "")
+
+
+def test_run_turing_machine_rejects_unknown_input_symbols() -> None:
+    with pytest.raises(ValueError, match="not in the machine alphabet"):
+        run_turing_machine(DOUBLE_1, "12")
+
+
+def test_run_turing_machine_renders_any_symbol() -> None:
+    machine: Dict[str, Any] = {
+        "blank": " ",
+        "start state": "a",
+        "final states": ["done"],
+        "table": {"a": {"x": {"write": "█", "R": "a"}, " ": {"L": "done"}}},
+    }
+    assert run_turing_machine(machine, "xx")[0] == "██"
+
+    machine["table"]["a"]["x"] = {"write": "ab", "R": "a"}
+    assert run_turing_machine(machine, "xx")[0] == "abab"
+
+
+def test_compile_machine_limits_alphabet_size() -> None:
+    machine = {
+        "blank": " ",
+        "start state": "a",
+        "final states": ["done"],
+        "table": {"a": {chr(256 + i): "R" for i in range(255)}},
+    }
+    with pytest.raises(ValueError, match="limited to 255 symbols"):
+        compile_machine(machine)
+
+
+def test_machine_analysis() -> None:
+    assert compile_machine(DOUBLE_1).analysis == MachineAnalysis(
+        unreachable_states=(),
+        dead_states=(),
+        undefined_states=(),
+        missing_transitions=(),
+        invalid_symbols=(),
+    )
+
+    analysis = compile_machine(RUN_AWAY).analysis
+    assert analysis.unreachable_states == ("done",)
+    assert analysis.dead_states == ("right",)
+    assert analysis.errors == []
+    assert analysis.warnings == []
+
+    analysis = compile_machine(ADD_TWO_BINARY_NUMBERS).analysis
+    assert ("read", "c") in analysis.missing_transitions
+    assert not any(state == "done" for state, _ in analysis.missing_transitions)
+
+    machine = {
+        "blank": " ",
+        "start state": "a",
+        "final states": ["done"],
+        "table": {
+            "a": {"x": {"write": "ab", "R": "b"}, " ": {"L": "done"}},
+            "b": {},
+            "c": {" ": "R"},
+        },
+    }
+    analysis = compile_machine(machine).analysis
+    assert analysis.unreachable_states == ("c",)
+    assert analysis.dead_states == ("b",)
+    assert analysis.undefined_states == ("b",)
+    assert analysis.missing_transitions == (("a", "ab"),)
+    assert analysis.invalid_symbols == ("ab",)
+    assert analysis.warnings == ["Missing transitions: [('a', 'ab')]"]
+    with pytest.raises(ValueError, match="Undefined states: \\['b'\\]; Symbols"):
+        validate_machine(machine)
+    assert validate_machine(DOUBLE_1) is not None
+
+
+def test_run_table_stops_on_final_states() -> None:
+    compiled = compile_machine(DOUBLE_1)
+    done = compiled.states.index("done")
+    n_symbols = compiled.n_symbols
+    assert compiled.run_table[: done * n_symbols] == compiled.table[: done * n_symbols]
+    assert compiled.run_table[done * n_symbols :] == (None,) * n_symbols
+
+    # Transitions of final states are never run
+    machine = {
+        "blank": " ",
+        "start state": "a",
+        "final states": ["done"],
+        "table": {"a": {" ": {"R": "done"}}, "done": {" ": {"write": "x", "R": "a"}}},
+    }
+    for history in ["none", "full"]:
+        assert run_turing_machine(machine, "", history=history) == (
+            "",
+            [] if history == "none" else [run_turing_machine(machine, "")[1][0]],
+            True,
+        )
@@ -0,0 +1,99 @@
+from typing import (
+    Dict,
+)
+
+import pytest
+
+from tests.machines import (
+    ADD_TWO_BINARY_NUMBERS,
+    BINARY_MULTIPLICATION,
+    BUSY_BEAVER_5,
+    DOUBLE_1,
+    RUN_AWAY,
+)
+from turingtoy import (
+    MacroMachine,
+    run_machine,
+    run_turing_machine,
+)
+from turingtoy.engine import (
+    TIMEOUT,
+)
+
+# Goes back and forth between its first two cells forever, which are in the
+# same block
+FLIP_FLOP = {
+    "blank": " ",
+    "start state": "a",
+    "final states": ["done"],
+    "table": {
+        "a": {"x": {"write": "y", "R": "b"}, "y": {"write": "x", "R": "b"}},
+        "b": {" ": {"L": "a"}},
+    },
+}
+
+
+@pytest.mark.parametrize("block_size", [1, 3, 8])
+@pytest.mark.parametrize(
+    ("machine", "input_"),
+    [
+        (DOUBLE_1, "1111"),
+        (ADD_TWO_BINARY_NUMBERS, "1011+11001"),
+        (BINARY_MULTIPLICATION, "101*11"),
+        (RUN_AWAY, "1101"),
+    ],
+)
+def test_macro_machine_matches_run_turing_machine(
+    machine: Dict, input_: str, block_size: int
+) -> None:
+    macro_machine = MacroMachine(machine, block_size)
+    for steps in [0, 1, 2, 5, 17, 40, 100, 1000]:
+        expected = run_turing_machine(machine, input_, steps, history="none")
+        output, accepted, done = macro_machine.run(input_, steps)
+        assert (output, accepted) == expected[::2]
+        assert done == steps or accepted
+
+
+def test_macro_machine_runs_busy_beaver() -> None:
+    macro_machine = MacroMachine(BUSY_BEAVER_5, 16)
+    output, accepted, steps = macro_machine.run("")
+    assert accepted
+    assert steps == 47_176_870
+    assert output.count("1") == 4098
+    assert len(macro_machine.cache) < 200
+
+    output, accepted, steps = macro_machine.run("", timeout=0)
+    assert not accepted
+    assert 0 < steps < 47_176_870
+
+
+def test_run_turing_machine_with_block_size() -> None:
+    assert run_turing_machine(
+        BINARY_MULTIPLICATION, "11*101", history="none", block_size=4
+    ) == ("1111", [], True)
+
+    assert run_machine(BUSY_BEAVER_5, "", 10, history="none", block_size=4).reason == (
+        "steps"
+    )
+    result = run_machine(BUSY_BEAVER_5, "", history="none", timeout=0, block_size=4)
+    assert (result.accepted, result.reason) == (False, "timeout")
+
+    with pytest.raises(ValueError, match="requires history='none'"):
+        run_turing_machine(BINARY_MULTIPLICATION, "11*101", block_size=4)
+    with pytest.raises(ValueError, match="block_size must be at least 1"):
+        MacroMachine(BINARY_MULTIPLICATION, 0)
+    with pytest.raises(KeyError, match="No transition for state 'readB' reading '\\*'"):
+        MacroMachine(BINARY_MULTIPLICATION, 4).run("11*")
+
+
+def test_macro_machine_times_out_in_a_block() -> None:
+    macro_machine = MacroMachine(FLIP_FLOP, 4)
+    output, accepted, steps = macro_machine.run("x", timeout=0.05)
+    assert output in ("x", "y")
+    assert not accepted
+    assert steps > 0
+    # The result depends on the deadline
+    assert not macro_machine.cache
+
+    result = run_machine(FLIP_FLOP, "x", timeout=0.05, history="none", block_size=4)
+    assert (result.accepted, result.reason) == (False, TIMEOUT)
@@ -0,0 +1,203 @@
+import json
+from pathlib import (
+    Path,
+)
+from typing import (
+    Dict,
+    List,
+)
+
+import pytest
+import yaml
+from typer.testing import (
+    CliRunner,
+)
+
+from tests.machines import (
+    ADD_TWO_BINARY_NUMBERS,
+    BINARY_MULTIPLICATION,
+    DOUBLE_1,
+)
+from turingtoy import (
+    compile_machine,
+    run_machine,
+    run_turing_machine,
+)
+from turingtoy.__main__ import (
+    app,
+)
+from turingtoy.trace import (
+    TraceReader,
+)
+
+INPUTS = ["1011+11001", "1+1", "11+101"]
+
+
+def _write_machine(tmp_path: Path, machine: Dict, name: str = "machine.json") -> Path:
+    path = tmp_path / name
+    if path.suffix == ".json":
+        path.write_text(json.dumps(machine))
+    else:
+        path.write_text(yaml.safe_dump(machine))
+    return path
+
+
+def _run(*args: str, input_: str = "") -> List[Dict]:
+    result = CliRunner().invoke(app, list(args), input=input_)
+    assert result.exit_code == 0, result.output
+    return [json.loads(line) for line in result.output.splitlines()]
+
+
+@pytest.mark.parametrize("name", ["machine.json", "machine.yaml"])
+def test_main_runs_inputs_from_stdin(tmp_path: Path, name: str) -> None:
+    machine = _write_machine(tmp_path, ADD_TWO_BINARY_NUMBERS, name)
+    records = _run(str(machine), "--workers", "1", input_="\n".join(INPUTS) + "\n")
+
+    assert records == [
+        {
+            "index": index,
+            "input": input_,
+            "output": run_machine(ADD_TWO_BINARY_NUMBERS, input_).output,
+            "accepted": True,
+            "reason": "halted",
+            "steps": run_machine(ADD_TWO_BINARY_NUMBERS, input_).steps,
+        }
+        for index, input_ in enumerate(INPUTS)
+    ]
+
+
+def test_main_runs_inputs_from_file(tmp_path: Path) -> None:
+    machine = _write_machine(tmp_path, ADD_TWO_BINARY_NUMBERS)
+    inputs = tmp_path / "inputs.txt"
+    inputs.write_text("\r\n".join(INPUTS))
+    args = [str(machine), "--inputs", str(inputs), "--chunksize", "1"]
+
+    records = _run(*args, "--workers", "2", "--no-ordered")
+    assert sorted(record["index"] for record in records) == [0, 1, 2]
+    assert _run(*args, "--workers", "2") == _run(*args, "--workers", "1")
+
+
+def test_main_options(tmp_path: Path) -> None:
+    machine = _write_machine(tmp_path, BINARY_MULTIPLICATION)
+
+    record = _run(str(machine), "--workers", "1", "--steps", "10", input_="11*101")[0]
+    assert (record["accepted"], record["reason"], record["steps"]) == (
+        False,
+        "steps",
+        10,
+    )
+
+    _, full_history, _ = run_turing_machine(BINARY_MULTIPLICATION, "11*101")
+    for history, expected in [
+        ("full", full_history),
+        ("deltas", full_history),
+        ("sampled", full_history[::50]),
+    ]:
+        (record,) = _run(
+            str(machine),
+            "--workers",
+            "1",
+            "--history",
+            history,
+            "--sample-every",
+            "50",
+            input_="11*101",
+        )
+        assert record["execution_history"] == expected
+
+    (record,) = _run(str(machine), "--workers", "1", input_="11*")
+    assert record == {
+        "index": 0,
+        "input": "11*",
+        "error": "No transition for state 'readB' reading '*'",
+    }
+
+
+def test_main_reports_invalid_inputs(tmp_path: Path) -> None:
+    machine = _write_machine(tmp_path, DOUBLE_1)
+    records = _run(str(machine), "--workers", "1", input_="1\n1x1\n11\n")
+    assert records == [
+        {
+            "index": 0,
+            "input": "1",
+            "output": run_machine(DOUBLE_1, "1").output,
+            "accepted": True,
+            "reason": "halted",
+            "steps": run_machine(DOUBLE_1, "1").steps,
+        },
+        {
+            "index": 1,
+            "input": "1x1",
+            "error": "Input symbol 'x' is not in the machine alphabet",
+        },
+        {
+            "index": 2,
+            "input": "11",
+            "output": run_machine(DOUBLE_1, "11").output,
+            "accepted": True,
+            "reason": "halted",
+            "steps": run_machine(DOUBLE_1, "11").steps,
+        },
+    ]
+
+    result = CliRunner().invoke(app, [str(machine), "--sample-every", "0"])
+    assert result.exit_code != 0
+
+
+@pytest.mark.parametrize("trace_format", ["ndjson", "binary"])
+def test_main_writes_traces(tmp_path: Path, trace_format: str) -> None:
+    machine = _write_machine(tmp_path, DOUBLE_1)
+    traces = tmp_path / "traces"
+    _run(
+        str(machine),
+        "--workers",
+        "1",
+        "--trace",
+        str(traces),
+        "--trace-format",
+        trace_format,
+        input_="1\n111\n",
+    )
+
+    _, execution_history, _ = run_turing_machine(DOUBLE_1, "111")
+    if trace_format == "ndjson":
+        lines = (traces / "1.ndjson").read_text().splitlines()
+        assert [json.loads(line) for line in lines] == execution_history
+    else:
+        with TraceReader(str(traces / "1.trace")) as reader:
+            history = reader.to_history(compile_machine(DOUBLE_1))
+        assert history.to_list() == execution_history
+    assert len(list(traces.iterdir())) == 2
+
+    result = CliRunner().invoke(
+        app, [str(machine), "--trace", str(traces), "--history", "sampled"]
+    )
+    assert result.exit_code != 0
+    assert "sampled" in result.output
+
+
+def test_main_validates_machine(tmp_path: Path) -> None:
+    machine = _write_machine(
+        tmp_path,
+        {
+            "blank": " ",
+            "start state": "a",
+            "final states": ["done"],
+            "table": {"a": {" ": {"R": "b"}}},
+        },
+    )
+    assert _run(str(machine), "--workers", "1", input_="\n") == [
+        {"index": 0, "input": "", "error": "No transition for state 'b' reading ' '"}
+    ]
+
+    result = CliRunner().invoke(app, [str(machine), "--validate"], input="\n")
+    assert result.exit_code != 0
+    assert "Undefined states: ['b']" in result.output
+
+    machine = _write_machine(tmp_path, BINARY_MULTIPLICATION)
+    result = CliRunner(mix_stderr=False).invoke(
+        app, [str(machine), "--validate", "--workers", "1"], input="11*\n"
+    )
+    assert result.exit_code == 0
+    assert "('readB', '*')" in result.stderr.splitlines()[0]
+    assert "No transition for state 'readB'" in result.stdout
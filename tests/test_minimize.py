@@ -0,0 +1,99 @@
+from typing import (
+    Dict,
+)
+
+import pytest
+
+from tests.machines import (
+    ADD_TWO_BINARY_NUMBERS,
+    BINARY_MULTIPLICATION,
+    DOUBLE_1,
+    RUN_AWAY,
+)
+from turingtoy import (
+    compile_machine,
+    minimize_machine,
+    run_machine,
+)
+
+
+def _doubled(machine: Dict) -> Dict:
+    """
+    Two copies of `machine`, each of them going to the states of the other,
+    plus an unreachable state.
+    """
+    final_states = set(machine["final states"])
+
+    def rename(state: str, copy: str) -> str:
+        return state if state in final_states else f"{state}_{copy}"
+
+    table = {}
+    for copy, other in [("a", "b"), ("b", "a")]:
+        for state, transitions in machine["table"].items():
+            table[rename(state, copy)] = {
+                symbol: (
+                    instruction
+                    if isinstance(instruction, str)
+                    else {
+                        key: rename(value, other) if key in ("L", "R") else value
+                        for key, value in instruction.items()
+                    }
+                )
+                for symbol, instruction in transitions.items()
+            }
+    table["unreachable"] = {machine["blank"]: "R"}
+    return {
+        **machine,
+        "start state": rename(machine["start state"], "a"),
+        "table": table,
+    }
+
+
+def _original(state: str) -> str:
+    return state[:-2] if state.endswith(("_a", "_b")) else state
+
+
+@pytest.mark.parametrize(
+    ("machine", "inputs"),
+    [
+        (DOUBLE_1, ["", "1", "111", "1" * 20]),
+        (ADD_TWO_BINARY_NUMBERS, ["1+1", "1011+11001", "111+1"]),
+        (BINARY_MULTIPLICATION, ["11*101", "1101*1011"]),
+    ],
+)
+def test_minimize_machine_merges_equivalent_states(machine: Dict, inputs: list) -> None:
+    doubled = _doubled(machine)
+    minimized = minimize_machine(doubled)
+    assert len(minimized.states) == len(compile_machine(machine).states)
+    assert len(minimized.table) == len(compile_machine(machine).table)
+
+    for input_ in inputs:
+        expected = run_machine(doubled, input_)
+        result = run_machine(minimized, input_)
+        assert (result.output, result.accepted, result.steps) == (
+            expected.output,
+            expected.accepted,
+            expected.steps,
+        )
+        # States are named after one of their copies
+        assert [_original(step["state"]) for step in result.execution_history] == [
+            _original(step["state"]) for step in expected.execution_history
+        ]
+        for step in result.execution_history:
+            transition = step["transition"]
+            if isinstance(transition, dict):
+                for key in ("L", "R"):
+                    assert transition.get(key, "done") in minimized.states
+
+
+def test_minimize_machine_keeps_minimal_machines() -> None:
+    compiled = compile_machine(DOUBLE_1)
+    minimized = minimize_machine(DOUBLE_1)
+    assert minimized.states == compiled.states
+    assert minimized.table == compiled.run_table
+    assert minimized.instructions[:-3] == compiled.instructions[:-3]
+
+    minimized = minimize_machine(RUN_AWAY)
+    assert minimized.states == ("right",)
+    result = run_machine(minimized, "11", steps=10)
+    assert (result.output, result.steps) == ("00", 10)
@@ -0,0 +1,172 @@
+import pytest
+
+from tests.machines import (
+    ADD_TWO_BINARY_NUMBERS,
+    ADD_TWO_BINARY_NUMBERS_2_TAPES,
+)
+from turingtoy import (
+    compile_multitape_machine,
+    run_machine,
+    run_multitape_machine,
+)
+from turingtoy.engine import (
+    HALTED,
+    STEP_LIMIT,
+    TIMEOUT,
+)
+
+# Copies the first tape to the second one, stopping at the first blank
+COPY = {
+    "tapes": 2,
+    "blank": " ",
+    "start state": "copy",
+    "final states": ["done"],
+    "table": {
+        "copy": {
+            ("0", " "): {"write": (None, "0"), "RR": "copy"},
+            ("1", " "): {"write": (None, "1"), "RR": "copy"},
+            (" ", " "): {"SS": "done"},
+        },
+    },
+}
+
+
+@pytest.mark.parametrize(
+    ("a", "b"), [("1", "1"), ("1011", "11001"), ("111", "1"), ("1", "1111111")]
+)
+def test_run_multitape_machine_adds(a: str, b: str) -> None:
+    input_ = f"{a}+{b}"
+    result = run_multitape_machine(ADD_TWO_BINARY_NUMBERS_2_TAPES, input_)
+    assert result.outputs == (bin(int(a, 2) + int(b, 2))[2:], "")
+    assert result.output == result.outputs[0]
+    assert result.accepted
+    assert result.reason == HALTED
+    assert len(result.execution_history) == result.steps
+
+
+def test_multitape_machine_takes_fewer_steps() -> None:
+    input_ = "10110111+11001011"
+    single = run_machine(ADD_TWO_BINARY_NUMBERS, input_, history="none")
+    multi = run_multitape_machine(
+        ADD_TWO_BINARY_NUMBERS_2_TAPES, input_, history="none"
+    )
+    # The single-tape machine leaves the second number on its tape
+    assert multi.output == single.output.split()[0]
+    assert multi.execution_history == []
+    assert multi.steps * 4 < single.steps
+
+
+def test_multitape_history_covers_all_tapes() -> None:
+    result = run_multitape_machine(ADD_TWO_BINARY_NUMBERS_2_TAPES, "1+1")
+    assert result.execution_history[0] == {
+        "state": "right",
+        "reading": ("1", " "),
+        "position": [0, 0],
+        "memory": ["1+1", ""],
+        "transition": "RS",
+    }
+    assert result.execution_history[3] == {
+        "state": "copy",
+        "reading": (" ", " "),
+        "position": [3, 1],
+        "memory": ["1", "1"],
+        "transition": {"LL": "back"},
+    }
+    assert result.execution_history[-1]["transition"] == {
+        "write": "1 ",
+        "SS": "done",
+    }
+
+
+def test_run_multitape_machine_inputs() -> None:
+    assert run_multitape_machine(COPY, "101").outputs == ("101", "101")
+    assert run_multitape_machine(COPY, ["10", "   1"]).outputs == ("10", "10 1")
+    assert run_multitape_machine(COPY, "10", tape="mmap").outputs == ("10", "10")
+    with pytest.raises(ValueError, match="3 inputs given for 2 tapes"):
+        run_multitape_machine(COPY, ["1", "1", "1"])
+
+
+def test_run_multitape_machine_stops() -> None:
+    result = run_multitape_machine(COPY, "101", steps=2)
+    assert result.outputs == ("101", "10")
+    assert len(result.execution_history) == 2
+    assert not result.accepted
+    assert result.reason == STEP_LIMIT
+
+    run_away = {
+        "tapes": 2,
+        "blank": " ",
+        "start state": "right",
+        "final states": [],
+        "table": {"right": {"  ": {"write": "11", "RL": "right"}}},
+    }
+    result = run_multitape_machine(run_away, "", timeout=0.01, history="none")
+    assert not result.accepted
+    assert result.reason == TIMEOUT
+    assert result.outputs == ("1" * result.steps,) * 2
+
+    with pytest.raises(KeyError, match=r"state 'copy' reading \('0', '1'\)"):
+        run_multitape_machine(COPY, ["0", "1"])
+
+
+def test_compile_multitape_machine() -> None:
+    compiled = compile_multitape_machine(COPY)
+    assert compile_multitape_machine(compiled) is compiled
+    assert compiled.symbols == (" ", " ", "0", "1")
+    assert compiled.weights == (4, 1)
+    index = compiled.start * compiled.stride + 2 * 4 + 0
+    assert compiled.table[index] == ((2, 2), (1, 1), compiled.start)
+    # Unwritten cells read as blanks
+    assert compiled.table[index + 1] == ((2, 2), (1, 1), compiled.start)
+    assert compiled.reading(index) == ("0", " ")
+
+    # Instructions without moves stay in place
+    compiled = compile_multitape_machine(
+        {**COPY, "table": {"copy": {"  ": {"write": ["1", None]}}}}
+    )
+    assert compiled.table[compiled.start * compiled.stride + sum(compiled.weights)] == (
+        (2, 1),
+        (0, 0),
+        compiled.start,
+    )
+
+
+@pytest.mark.parametrize(
+    ("table", "message"),
+    [
+        ({"a": {"1": "RS"}}, "Read symbols '1' are not one per tape"),
+        ({"a": {"11": "RSR"}}, "Moves 'RSR' are not one per tape"),
+        ({"a": {"11": "RX"}}, "Unknown move 'X' in 'RX'"),
+        ({"a": {"11": {"write": "1"}}}, "Written symbols '1' are not one per tape"),
+    ],
+)
+def test_compile_multitape_machine_errors(table: dict, message: str) -> None:
+    machine = {
+        "tapes": 2,
+        "blank": " ",
+        "start state": "a",
+        "final states": [],
+        "table": table,
+    }
+    with pytest.raises(ValueError, match=message):
+        compile_multitape_machine(machine)
+
+
+def test_compile_multitape_machine_limits() -> None:
+    with pytest.raises(ValueError, match="at least one tape"):
+        compile_multitape_machine({**COPY, "tapes": 0})
+
+    machine = {**COPY, "tapes": 1, "table": {"a": {chr(n): "S" for n in range(300)}}}
+    with pytest.raises(ValueError, match="limited to 255 symbols"):
+        compile_multitape_machine(machine)
+
+    symbols = [chr(ord("A") + symbol) for symbol in range(50)]
+    machine = {
+        "tapes": 4,
+        "blank": " ",
+        "start state": "a",
+        "final states": [],
+        "table": {"a": {(symbol,) * 4: "SSSS" for symbol in symbols}},
+    }
+    with pytest.raises(ValueError, match="exceed the 4194304 transitions"):
+        compile_multitape_machine(machine)
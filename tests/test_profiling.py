@@ -0,0 +1,142 @@
+import time
+from typing import (
+    List,
+    Tuple,
+)
+
+import pytest
+
+from tests.machines import (
+    BINARY_MULTIPLICATION,
+    DOUBLE_1,
+    RUN_AWAY,
+)
+from turingtoy import (
+    Profile,
+    resume_machine,
+    run_machine,
+    run_machine_slices,
+)
+
+
+def test_profile_counts_steps() -> None:
+    result = run_machine(BINARY_MULTIPLICATION, "11*101", history="none", profile=True)
+    profile = result.profile
+    assert isinstance(profile, Profile)
+
+    full_history = run_machine(BINARY_MULTIPLICATION, "11*101").execution_history
+    assert profile.steps == result.steps == len(full_history)
+    visits = profile.state_visits()
+    assert sum(visits.values()) == result.steps
+    assert list(visits.values()) == sorted(visits.values(), reverse=True)
+    assert visits == {
+        state: sum(step["state"] == state for step in full_history) for state in visits
+    }
+    hits = profile.transition_hits()
+    assert sum(hits.values()) == result.steps
+    assert hits[("init", " ")] == sum(
+        (step["state"], step["reading"]) == ("init", " ") for step in full_history
+    )
+
+    positions = [step["position"] for step in full_history]
+    assert profile.head_range == (min(positions), max(positions))
+    assert profile.high_water >= max(positions) - min(positions)
+    assert set(profile.timings) == {"compile", "run", "render"}
+    assert all(timing >= 0 for timing in profile.timings.values())
+
+
+@pytest.mark.parametrize("history", ["full", "deltas", "sampled"])
+def test_profile_with_history(history: str) -> None:
+    result = run_machine(
+        BINARY_MULTIPLICATION,
+        "11*101",
+        history=history,  # type: ignore
+        sample_every=7,
+        profile=True,
+    )
+    assert result.profile is not None
+    assert result.profile.steps == result.steps
+    assert result.output == run_machine(BINARY_MULTIPLICATION, "11*101").output
+
+
+def test_profile_head_range_and_high_water() -> None:
+    result = run_machine(RUN_AWAY, "11", steps=100, history="none", profile=True)
+    assert result.profile is not None
+    # The head ends after the last recorded step
+    assert result.profile.head_range == (0, 100)
+    assert result.profile.high_water > 100
+
+    result = run_machine(
+        RUN_AWAY, "11", steps=100000, history="none", tape="sparse", profile=True
+    )
+    assert result.profile is not None
+    assert result.profile.head_range == (0, 100000)
+    assert result.profile.high_water < 100000
+
+
+def test_profile_of_resumed_run() -> None:
+    checkpoint = run_machine(DOUBLE_1, "1111", steps=5, snapshot=True).checkpoint
+    assert checkpoint is not None
+    result = resume_machine(DOUBLE_1, checkpoint, history="none", profile=True)
+    assert result.profile is not None
+    assert result.profile.steps == result.steps - 5
+
+
+def test_profile_times_slices_only() -> None:
+    slices = run_machine_slices(
+        RUN_AWAY, "1", steps=20, history="none", profile=True, slice_steps=5
+    )
+    with pytest.raises(StopIteration) as stop:
+        while True:
+            next(slices)
+            time.sleep(0.05)
+    profile = stop.value.value.profile
+    assert profile is not None
+    assert profile.steps == 20
+    # The caller slept 0.2 s between the slices
+    assert profile.timings["run"] < 0.05
+
+
+def test_profile_must_be_started() -> None:
+    assert run_machine(DOUBLE_1, "1").profile is None
+    with pytest.raises(ValueError, match="not started"):
+        Profile().state_visits()
+
+
+def test_progress_callback() -> None:
+    calls: List[Tuple[int, str, int]] = []
+    result = run_machine(
+        BINARY_MULTIPLICATION,
+        "11*101",
+        history="none",
+        progress=lambda *args: calls.append(args),
+        progress_every=20,
+    )
+    assert [steps for steps, _, _ in calls] == list(range(20, result.steps + 1, 20))
+
+    full_history = run_machine(BINARY_MULTIPLICATION, "11*101").execution_history
+    steps, state, position = calls[2]
+    assert (state, position) == (
+        full_history[steps]["state"],
+        full_history[steps]["position"],
+    )
+
+    # Steps are counted from the start of the run, checkpoint included
+    checkpoint = run_machine(
+        BINARY_MULTIPLICATION, "11*101", steps=30, snapshot=True
+    ).checkpoint
+    assert checkpoint is not None
+    resumed: List[Tuple[int, str, int]] = []
+    resume_machine(
+        BINARY_MULTIPLICATION,
+        checkpoint,
+        history="none",
+        progress=lambda *args: resumed.append(args),
+        progress_every=20,
+    )
+    assert resumed == calls[1:]
+
+    with pytest.raises(ValueError, match="progress_every"):
+        run_machine(DOUBLE_1, "1", progress=print, progress_every=0)
+    with pytest.raises(ValueError, match="profile or progress"):
+        run_machine(DOUBLE_1, "1", history="none", block_size=4, profile=True)
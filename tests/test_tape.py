@@ -0,0 +1,266 @@
+from pathlib import (
+    Path,
+)
+from typing import (
+    Dict,
+)
+
+import pytest
+
+from tests.machines import (
+    ADD_TWO_BINARY_NUMBERS,
+    BINARY_MULTIPLICATION,
+    DOUBLE_1,
+    RUN_AWAY,
+)
+from turingtoy import (
+    compile_machine,
+    resume_machine,
+    run_machine,
+    run_turing_machine,
+)
+from turingtoy.engine import (
+    Execution,
+)
+from turingtoy.machine import (
+    UNWRITTEN,
+)
+from turingtoy.tape import (
+    MmapTape,
+    SparseTape,
+    Tape,
+)
+
+
+def test_tape_grows_on_both_sides() -> None:
+    tape = Tape(bytes([1, 2]), padding=1)
+    assert tape.cells == bytearray([0, 1, 2, 0])
+
+    tape.write(-3, 5)
+    assert tape.origin == 5
+    assert tape.read(-3) == 5
+    assert tape.read(0) == 1
+
+    tape.write(40, 7)
+    tape.write(39, 6)
+    assert tape.read(40) == 7
+    assert tape.read(1) == 2
+    assert tape.read(-100) == UNWRITTEN
+    assert tape.read(100) == UNWRITTEN
+
+
+def test_run_turing_machine_walks_far_from_input() -> None:
+    # The copy is written well beyond the initial padding of the tape
+    output, execution_history, accepted = run_turing_machine(DOUBLE_1, "1" * 40)
+    assert output == "1" * 40 + "0" + "1" * 40
+    assert accepted
+    assert max(step["position"] for step in execution_history) == 80
+
+
+def test_tape_bounds() -> None:
+    tape = Tape(bytes([0, 1, 2, 0]), padding=2, start=-1)
+    assert tape.read(-1) == 0
+    assert tape.read(0) == 1
+    assert tape.bounds() == (3, 5)
+    assert bytes(tape.written()) == bytes([1, 2])
+    assert Tape(padding=4).bounds() == (0, 0)
+
+    tape = Tape(bytes([3]), start=5)
+    assert tape.read(5) == 3
+    assert tape.read(0) == UNWRITTEN
+
+
+def test_tape_bounds_of_large_tapes(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr("turingtoy.tape.SCAN_CHUNK", 4)
+    tape = Tape(padding=10)
+    tape.write(3, 1)
+    tape.write(-2, 1)
+    assert tape.bounds() == (8, 14)
+
+
+def test_mmap_tape_grows_on_both_sides(tmp_path: Path) -> None:
+    path = tmp_path / "tape"
+    tape = MmapTape(bytes([1, 2]), padding=1, path=str(path), chunk=8)
+    assert len(tape.cells) == 8
+    assert bytes(tape.written()) == bytes([1, 2])
+
+    tape.write(-20, 5)
+    tape.write(30, 7)
+    assert len(tape.cells) == path.stat().st_size
+    assert [tape.read(position) for position in [-20, -19, 0, 1, 29, 30]] == [
+        5,
+        UNWRITTEN,
+        1,
+        2,
+        UNWRITTEN,
+        7,
+    ]
+    assert tape.bounds()[1] - tape.bounds()[0] == 51
+    tape.close()
+
+
+def test_mmap_tape_tracks_the_visited_cells(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr("turingtoy.tape.MMAP_TRACKED", 4)
+    tape = MmapTape(bytes([1, 2]), padding=1, chunk=64)
+    assert tape.span() == (31, 33)
+    tape.write(5, 3)
+    assert tape.span() == (31, 41)
+    tape.write(-3, 4)
+    assert tape.span() == (24, 41)
+    assert tape.bounds() == (28, 37)
+    # Cells outside the span are not scanned
+    tape.cells[60] = 5
+    assert tape.bounds() == (28, 37)
+    tape.close()
+
+    # Position 0 is outside the file until the head reaches it
+    tape = MmapTape(bytes([1]), padding=1, start=-100, chunk=8)
+    assert tape.span() == (3, 4)
+    tape.close()
+
+
+@pytest.mark.parametrize(
+    ("machine", "input_"),
+    [
+        (DOUBLE_1, "1111"),
+        (ADD_TWO_BINARY_NUMBERS, "1011+11001"),
+        (BINARY_MULTIPLICATION, "101*11"),
+    ],
+)
+@pytest.mark.parametrize("history", ["full", "deltas", "none"])
+def test_mmap_tape_runs(
+    machine: Dict, input_: str, history: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # Small chunks make the tape and its span grow during the runs
+    monkeypatch.setattr("turingtoy.tape.MMAP_CHUNK", 16)
+    monkeypatch.setattr("turingtoy.tape.MMAP_TRACKED", 2)
+    reference = run_machine(machine, input_, history=history)  # type: ignore
+    result = run_machine(machine, input_, history=history, tape="mmap")  # type: ignore
+    assert result.output == reference.output
+    assert list(result.execution_history) == list(reference.execution_history)
+
+
+def test_mmap_tape_with_loops_and_checkpoints(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr("turingtoy.tape.MMAP_CHUNK", 16)
+    result = run_machine(
+        RUN_AWAY, "11", detect_loops=True, history="none", tape="mmap", snapshot=True
+    )
+    assert result.reason == "drift"
+    assert result.checkpoint is not None
+
+    reference = run_machine(BINARY_MULTIPLICATION, "11*11")
+    partial = run_machine(BINARY_MULTIPLICATION, "11*11", 20, snapshot=True)
+    assert partial.checkpoint is not None
+    resumed = resume_machine(BINARY_MULTIPLICATION, partial.checkpoint, tape="mmap")
+    assert resumed.output == reference.output
+
+
+def test_mmap_tape_directory(tmp_path: Path) -> None:
+    result = run_machine(DOUBLE_1, "11", tape="mmap", tape_dir=str(tmp_path))
+    assert result.output == run_machine(DOUBLE_1, "11").output
+    partial = run_machine(DOUBLE_1, "11", 3, snapshot=True)
+    assert partial.checkpoint is not None
+    resumed = resume_machine(
+        DOUBLE_1, partial.checkpoint, tape="mmap", tape_dir=str(tmp_path)
+    )
+    assert resumed.output == result.output
+
+    with pytest.raises(FileNotFoundError):
+        run_machine(DOUBLE_1, "11", tape="mmap", tape_dir=str(tmp_path / "missing"))
+    with pytest.raises(ValueError, match="tape_dir"):
+        run_machine(DOUBLE_1, "11", tape_dir=str(tmp_path))
+
+
+# Writes "x", walks 12 cells right without writing and writes "y"
+FAR_MARKERS = {
+    "blank": "0",
+    "start state": "start",
+    "final states": ["done"],
+    "table": {
+        "start": {"0": {"write": "x", "R": "walk0"}},
+        **{f"walk{i}": {"0": {"R": f"walk{i + 1}"}} for i in range(11)},
+        "walk11": {"0": {"write": "y", "L": "done"}},
+    },
+}
+
+
+@pytest.mark.parametrize(
+    ("machine", "input_"),
+    [
+        (DOUBLE_1, "1" * 20),
+        (ADD_TWO_BINARY_NUMBERS, "1011+11001"),
+        (BINARY_MULTIPLICATION, "101*11"),
+        (FAR_MARKERS, ""),
+    ],
+)
+@pytest.mark.parametrize("history", ["full", "deltas", "none"])
+def test_sparse_tape_runs(
+    machine: Dict, input_: str, history: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr("turingtoy.tape.SPARSE_CHUNK", 4)
+    reference = run_machine(machine, input_, history=history)  # type: ignore
+    result = run_machine(
+        machine, input_, history=history, tape="sparse"  # type: ignore
+    )
+    assert result.output == reference.output
+    assert result.steps == reference.steps
+    assert list(result.execution_history) == list(reference.execution_history)
+
+
+def test_sparse_tape_frees_unwritten_chunks(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr("turingtoy.tape.SPARSE_CHUNK", 4)
+    execution = Execution(compile_machine(FAR_MARKERS), "", "sparse")
+    execution.run(100)
+    assert execution.halted
+    assert execution.output() == "x" + " " * 11 + "y"
+    assert isinstance(execution.tape, SparseTape)
+    # The chunks of "x" and "y", and the one left last
+    assert sorted(execution.tape.chunks) == [0, 2, 3]
+    assert execution.tape.content() == (0, b"\x02" + bytes(11) + b"\x03")
+
+    execution = Execution(compile_machine(RUN_AWAY), "1", "sparse")
+    execution.run(1000)
+    assert execution.position == 1000
+    assert len(execution.tape.chunks) <= 3  # type: ignore
+    assert execution.output() == "0"
+
+
+def test_sparse_tape_reads_and_writes(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr("turingtoy.tape.SPARSE_CHUNK", 4)
+    tape = SparseTape(bytes([1, 2, 3, 4, 5]), start=-2)
+    assert [tape.read(position) for position in range(-3, 4)] == [0, 1, 2, 3, 4, 5, 0]
+    assert sorted(tape.chunks) == [-1, 0]
+    assert tape.extend(3) == 3
+    assert tape.extend(-1) == 3
+    assert tape.cells[2:] == bytes([1, 2])
+    tape.write(-30, 7)
+    assert tape.read(-30) == 7
+    assert tape.read(-31) == UNWRITTEN
+    assert tape.content() == (-30, bytes([7]) + bytes(27) + bytes([1, 2, 3, 4, 5]))
+    # The head is in chunk -1, so position 0 is at cell index 4
+    assert tape.bounds() == (-26, 7)
+    assert bytes(tape.written()) == tape.content()[1]
+    tape.close()
+    assert SparseTape().content() == (0, b"")
+
+
+def test_sparse_tape_with_loops_and_checkpoints(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr("turingtoy.tape.SPARSE_CHUNK", 4)
+    result = run_machine(
+        RUN_AWAY, "11", detect_loops=True, history="none", tape="sparse", snapshot=True
+    )
+    assert result.reason == "drift"
+    assert result.checkpoint is not None
+
+    reference = run_machine(BINARY_MULTIPLICATION, "11*11", snapshot=True)
+    partial = run_machine(
+        BINARY_MULTIPLICATION, "11*11", 20, tape="sparse", snapshot=True
+    )
+    assert partial.checkpoint is not None
+    resumed = resume_machine(
+        BINARY_MULTIPLICATION, partial.checkpoint, tape="sparse", snapshot=True
+    )
+    assert resumed.output == reference.output
+    assert resumed.checkpoint == reference.checkpoint
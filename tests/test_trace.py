@@ -0,0 +1,136 @@
+import io
+import json
+from pathlib import (
+    Path,
+)
+
+import pytest
+
+from tests.machines import (
+    ADD_TWO_BINARY_NUMBERS,
+    BINARY_MULTIPLICATION,
+    DOUBLE_1,
+    RUN_AWAY,
+)
+from turingtoy import (
+    compile_machine,
+    resume_machine,
+    run_machine,
+)
+from turingtoy.tape import (
+    Tape,
+)
+from turingtoy.trace import (
+    TraceReader,
+    TraceWriter,
+)
+
+
+@pytest.mark.parametrize("history", ["full", "none"])
+def test_ndjson_trace(history: str) -> None:
+    reference = run_machine(ADD_TWO_BINARY_NUMBERS, "1011+11001")
+    sink = io.StringIO()
+    result = run_machine(
+        ADD_TWO_BINARY_NUMBERS,
+        "1011+11001",
+        history=history,  # type: ignore
+        trace=sink,
+    )
+    assert result.output == reference.output
+    steps = [json.loads(line) for line in sink.getvalue().splitlines()]
+    assert steps == reference.execution_history
+
+
+@pytest.mark.parametrize(
+    ("machine", "input_"),
+    [
+        (DOUBLE_1, "111"),
+        (BINARY_MULTIPLICATION, "11*101"),
+    ],
+)
+def test_binary_trace(machine: dict, input_: str, tmp_path: Path) -> None:
+    reference = run_machine(machine, input_).execution_history
+    path = tmp_path / "trace.bin"
+    with open(path, "wb") as sink:
+        run_machine(
+            machine, input_, history="deltas", trace=sink, trace_format="binary"
+        )
+
+    with TraceReader(str(path)) as reader:
+        assert len(reader) == len(reference)
+        without_memory = [
+            {key: value for key, value in step.items() if key != "memory"}
+            for step in reference
+        ]
+        assert reader[len(reader) // 2] == without_memory[len(reader) // 2]
+        assert reader[-1] == without_memory[-1]
+        assert reader[:] == without_memory
+        assert reader.to_history(compile_machine(machine)).to_list() == reference
+
+
+def test_binary_trace_of_resumed_runs(tmp_path: Path) -> None:
+    reference = run_machine(BINARY_MULTIPLICATION, "11*11").execution_history
+    partial = run_machine(BINARY_MULTIPLICATION, "11*11", 30, snapshot=True)
+    assert partial.checkpoint is not None
+    path = tmp_path / "trace.bin"
+    with open(path, "wb") as sink:
+        resume_machine(
+            BINARY_MULTIPLICATION,
+            partial.checkpoint,
+            history="none",
+            trace=sink,
+            trace_format="binary",
+        )
+    with TraceReader(str(path)) as reader:
+        history = reader.to_history(compile_machine(BINARY_MULTIPLICATION))
+        assert history.to_list() == reference[30:]
+
+
+def test_binary_trace_is_written_in_chunks(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr("turingtoy.trace.BUFFER_SIZE", 20)
+    path = tmp_path / "trace.bin"
+    with open(path, "wb") as sink:
+        # The trace is flushed even when the run fails
+        with pytest.raises(KeyError):
+            run_machine(
+                BINARY_MULTIPLICATION,
+                "11*",
+                history="none",
+                trace=sink,
+                trace_format="binary",
+            )
+    with TraceReader(str(path)) as reader:
+        assert len(reader) == 6
+        assert reader[0]["position"] == 0
+
+
+def test_invalid_traces(tmp_path: Path) -> None:
+    path = tmp_path / "trace.bin"
+    path.write_bytes(b"TTTR")
+    with pytest.raises(ValueError, match="Not a turingtoy binary trace"):
+        TraceReader(str(path))
+
+    with open(path, "wb") as sink:
+        run_machine(RUN_AWAY, "1", 5, trace=sink, trace_format="binary")
+    with TraceReader(str(path)) as reader:
+        with pytest.raises(ValueError, match="another machine"):
+            reader.to_history(compile_machine(DOUBLE_1))
+        reordered = dict(RUN_AWAY)
+        reordered["blank"] = RUN_AWAY["blank"]
+        reordered["table"] = {
+            "right": dict(reversed(list(RUN_AWAY["table"]["right"].items())))
+        }
+        with pytest.raises(ValueError, match="symbol ids"):
+            reader.to_history(compile_machine(reordered))
+
+    with pytest.raises(ValueError, match="sampled"):
+        run_machine(RUN_AWAY, "1", 5, history="sampled", trace=io.StringIO())
+    with pytest.raises(ValueError, match="trace"):
+        run_machine(RUN_AWAY, "1", 5, history="none", block_size=2, trace=io.StringIO())
+
+
+def test_trace_writers_record_steps() -> None:
+    with pytest.raises(TypeError, match="record"):
+        TraceWriter(compile_machine(RUN_AWAY), Tape(), io.StringIO())  # type: ignore
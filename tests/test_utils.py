@@ -0,0 +1,65 @@
+from pathlib import (
+    Path,
+)
+
+import pytest
+
+from tests.machines import (
+    DOUBLE_1,
+)
+from tests.utils import (
+    load_json,
+    regression_test,
+)
+from turingtoy import (
+    run_turing_machine,
+)
+
+
+def golden_data(input_: str) -> dict:
+    output, execution_history, _ = run_turing_machine(DOUBLE_1, input_)
+    return {
+        "machine": DOUBLE_1,
+        "input": input_,
+        "output": output,
+        "execution_history": execution_history,
+    }
+
+
+@pytest.mark.parametrize("name", ["11.json", "11.json.gz"])
+def test_regression_test_reports_first_differing_step(
+    tmp_path: Path, name: str
+) -> None:
+    path = tmp_path / name
+    data = golden_data("11")
+    regression_test(data, path, force_regen=False)
+    assert load_json(path)["output"] == data["output"]
+    regression_test(data, path, force_regen=False)
+
+    changed = golden_data("11")
+    changed["execution_history"][3]["position"] += 1
+    with pytest.raises(AssertionError, match="Step 3 differs"):
+        regression_test(changed, path, force_regen=False)
+    # The reference is kept next to the new data
+    old_path = tmp_path / name.replace("11.", "11.old.")
+    assert load_json(old_path)["execution_history"] == data["execution_history"]
+    regression_test(changed, path, force_regen=False)
+
+    regression_test(data, path, force_regen=True)
+    with pytest.raises(AssertionError, match="'output' differs"):
+        regression_test(dict(data, output="1"), path, force_regen=False)
+    regression_test(data, path, force_regen=True)
+    with pytest.raises(AssertionError, match="3 steps instead of"):
+        regression_test(
+            dict(data, execution_history=data["execution_history"][:3]),
+            path,
+            force_regen=False,
+        )
+
+
+def test_regression_test_ignores_formatting(tmp_path: Path) -> None:
+    path = tmp_path / "data.json"
+    path.write_text('{"a": [1, 2]}')
+    regression_test({"a": [1, 2]}, path, force_regen=False)
+    with pytest.raises(AssertionError, match="values_changed"):
+        regression_test({"a": [1, 3]}, path, force_regen=False)
@@ -1,3 +1,4 @@
+import gzip
 import shutil
 from decimal import (
     Decimal,
@@ -7,6 +8,7 @@ from pathlib import (
 )
 from typing import (
     Any,
+    Optional,
 )
 
 import simplejson as json
@@ -17,45 +19,49 @@ from deepdiff import (
 
 def write_text(path: Path, text: str) -> None:
     """
-    Write text in file with consistend encoding and newline endings.
-    Ensure parent directories exist.
+    Write text in file with consistend encoding and newline endings, gzipped
+    if the file name ends with ".gz". Ensure parent directories exist.
     """
     path.parent.mkdir(exist_ok=True)
+    text = text if text[-1] == "\n" else f"{text}\n"
+    if path.suffix == ".gz":
+        with gzip.open(path, "wt", encoding="utf-8", newline="\n") as io:
+            io.write(text)
+        return
     with open(path, "w", encoding="utf-8", newline="\n") as io:
-        io.write(text if text[-1] == "\n" else f"{text}\n")
+        io.write(text)
 
 
-def write_json(path: Path, obj: Any, **dumps_kwargs: Any) -> None:
-    return write_text(
-        path,
-        to_json_str(
-            obj,
-            **dumps_kwargs,
-        ),
-    )
+def read_text(path: Path) -> str:
+    if path.suffix == ".gz":
+        with gzip.open(path, "rt", encoding="utf-8") as io:
+            return io.read()
+    return path.read_text(encoding="utf-8")
 
 
 def to_json_str(obj: Any, **dumps_kwargs: Any) -> str:
     return json.dumps(
         obj,
         indent=2,
-        **dumps_kwargs,
+        **{"default": to_builtin, **dumps_kwargs},
     )
 
 
-def to_json_obj(obj: Any, **dumps_kwargs: Any) -> Any:
-    return json.loads(
-        to_json_str(
-            obj,
-            **dumps_kwargs,
-        ),
-        parse_float=Decimal,
-    )
+def to_builtin(obj: Any) -> Any:
+    """
+    Convert compact execution histories (and their steps) to the lists and
+    dicts they stand for, only when serializing them.
+    """
+    if hasattr(obj, "to_list"):
+        return obj.to_list()
+    if hasattr(obj, "to_dict"):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
 
 
 def load_json(path: Path) -> Any:
     return json.loads(
-        path.read_text(encoding="utf-8"),
+        read_text(path),
         parse_float=Decimal,
     )
 
@@ -66,26 +72,67 @@ def regression_test(
     force_regen: bool,
     **dumps_kwargs: Any,
 ) -> None:
+    """
+    Compare `data` with the reference file, which may be gzipped (see
+    write_text()), or write it if it does not exist or `force_regen`.
+
+    The serialized data is first compared with the file text, which is fast
+    and enough when nothing changed. Otherwise the parsed data are compared
+    and, for execution histories, the assertion reports the first differing
+    step only.
+    """
+    text = to_json_str(data, **dumps_kwargs)
+
     def _write() -> None:
         regression_test_ref_file.parent.mkdir(parents=True, exist_ok=True)
-        write_json(
-            regression_test_ref_file,
-            data,
-            **dumps_kwargs,
-        )
+        write_text(regression_test_ref_file, text)
 
     if not regression_test_ref_file.is_file() or force_regen:
         _write()
-    else:
-        diff = DeepDiff(
-            to_json_obj(data, **dumps_kwargs),
-            load_json(regression_test_ref_file),
+        return
+
+    reference_text = read_text(regression_test_ref_file)
+    if reference_text.rstrip("\n") == text.rstrip("\n"):
+        return
+
+    difference = first_difference(
+        json.loads(text, parse_float=Decimal),
+        json.loads(reference_text, parse_float=Decimal),
+    )
+    if difference:
+        old_file = (
+            regression_test_ref_file.with_suffix("").with_suffix(".old.json.gz")
+            if regression_test_ref_file.suffix == ".gz"
+            else regression_test_ref_file.with_suffix(".old.json")
         )
-        if diff:
-            shutil.copy(
-                regression_test_ref_file,
-                regression_test_ref_file.with_suffix(".old.json"),
-            )
-            # If a diff is detected write the file to enable git manual comparison
-            _write()
-        assert not diff
+        shutil.copy(regression_test_ref_file, old_file)
+        # If a diff is detected write the file to enable git manual comparison
+        _write()
+    assert not difference, difference
+
+
+def first_difference(actual: Any, expected: Any) -> Optional[str]:
+    """
+    Describe the first difference between `actual` and `expected`, comparing
+    execution histories step by step, or return None if they are equal.
+    """
+    if actual == expected:
+        return None
+    if not (
+        isinstance(actual, dict)
+        and isinstance(expected, dict)
+        and "execution_history" in actual
+        and "execution_history" in expected
+    ):
+        return str(DeepDiff(actual, expected))
+
+    for key in sorted(set(actual) | set(expected)):
+        if key != "execution_history" and actual.get(key) != expected.get(key):
+            return f"{key!r} differs: {DeepDiff(actual.get(key), expected.get(key))}"
+
+    history = actual["execution_history"]
+    expected_history = expected["execution_history"]
+    for step, (actual_step, expected_step) in enumerate(zip(history, expected_history)):
+        if actual_step != expected_step:
+            return f"Step {step} differs: {DeepDiff(actual_step, expected_step)}"
+    return f"{len(history)} steps instead of {len(expected_history)}"